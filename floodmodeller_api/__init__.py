@@ -8,5 +8,8 @@ from .dat import DAT
 from .inp import INP
 from .logs import LF1, LF2
 from .xml2d import XML2D
+from .unit_index import UnitIndex
+from .network import Network
+from .spatial import SpatialIndex
 
-from .util import open_docs
+from .util import open_docs, load_many
@@ -16,12 +16,41 @@ address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London
 
 """ Holds the base file class for API file classes """
 
+from contextlib import contextmanager
 from pathlib import Path
 from .version import __version__
-from .diff import check_item_with_dataframe_equal
+from . import cache
+from .diff import (
+    _diff_options,
+    check_item_with_dataframe_equal,
+    get_item_hash,
+    get_tree_hash,
+)
 from .units._base import Unit
+from .units._lazy import LazyUnitGroup
 from .units.iic import IIC
 from .urban1d._base import UrbanSubsection, UrbanUnit
+from .validation import _collect_validation_errors
+
+# Attributes which are not compared when checking whether two files are equivalent
+_NON_COMPARED_ATTRIBUTES = (
+    "_filepath",
+    "_raw_data",
+    "_gxy_filepath",
+    "_gxy_data",
+    "_xmltree",
+    "_xsd",
+    "_xsdschema",
+    "_section_store",
+    "_section_properties",
+    "_spatial_indexes",
+    "_network",
+    "_chain",
+    "_batch_targets",
+    "_shared_memory",
+    "_node_index",
+    "_time_index",
+)
 
 
 class FMFile:
@@ -29,6 +58,7 @@ class FMFile:
 
     _filetype = None
     _suffix = None
+    _batch_targets = None  # List of (filepath, saved) to write to once a batch of edits is complete
 
     def __init__(self):
         if self._filepath != None:
@@ -50,6 +80,18 @@ class FMFile:
     def __repr__(self):
         return f"<floodmodeller_api Class: {self._filetype}(filepath={self._filepath})>"
 
+    def __getstate__(self):
+        # Network, spatial indexes and section store are rebuilt when next used, so are not sent to other processes
+        state = self.__dict__.copy()
+        if "_network" in state:
+            state["_network"] = None
+        if "_section_store" in state:
+            state["_section_store"] = None
+        if "_spatial_indexes" in state:
+            state["_spatial_indexes"] = {}
+        state.pop("_batch_targets", None)
+        return state
+
     def _write(self):
         raise NotImplementedError
 
@@ -63,6 +105,11 @@ class FMFile:
                 f"{self._filetype} must be saved to a specific filepath before update() can be called."
             )
 
+        if self._batch_targets is not None:
+            # File is written once the batch of edits is complete
+            self._batch_targets.append((self._filepath, False))
+            return
+
         string = self._write()
         with open(self._filepath, "w") as _file:
             _file.write(string)
@@ -78,18 +125,112 @@ class FMFile:
         if not filepath.parent.exists():
             Path.mkdir(filepath.parent)
 
+        if self._batch_targets is not None:
+            # File is written once the batch of edits is complete
+            self._batch_targets.append((filepath, True))
+            self._filepath = filepath
+            return
+
         string = self._write()
         with open(filepath, "w") as _file:
             _file.write(string)
         self._filepath = filepath  # Updates the filepath attribute to the given path
+        self._after_save(filepath)
 
         print(f"{self._filetype} File Saved to: {filepath}")
 
-    def _diff(self, other, force_print=False):
+    def _after_save(self, filepath):
+        """Used by file classes which save other files alongside the main file"""
+        pass
+
+    @contextmanager
+    def batch(self):
+        """Context manager used to apply many edits to the file at once. Within the block, calls to ``update()``
+        and ``save()`` are deferred, along with the checks and restructuring that happen whenever the file is written.
+        These are run once when the block exits, then the file is written to each location requested. Any invalid
+        units are reported together in a single error, in which case no files are written. No files are written if
+        an error is raised within the block either.
+
+        .. code:: python
+
+            with dat.batch():
+                for section in dat.sections.values():
+                    section.dist_to_next *= 1.1
+                    dat.update()  # File is only written once, when the block exits
+        """
+        if self._batch_targets is not None:
+            # Already within a batch, so edits are applied when the outer batch exits
+            yield self
+            return
+
+        self._batch_targets = []
+        try:
+            yield self
+            targets = self._batch_targets
+        finally:
+            del self._batch_targets  # Reverts to class default
+
+        string = self._write_batch()
+        saved_files = {}
+        for filepath, saved in targets:
+            saved_files[filepath] = saved_files.get(filepath, False) or saved
+        for filepath, saved in saved_files.items():
+            with open(filepath, "w") as _file:
+                _file.write(string)
+            if saved:
+                self._after_save(filepath)
+                print(f"{self._filetype} File Saved to: {filepath}")
+            else:
+                print(f"{self._filetype} File Updated!")
+
+    def _write_batch(self):
+        """Writes the file once after a batch of edits, first checking every unit so that all invalid units are
+        reported together"""
+        with _collect_validation_errors() as errors:
+            errors.extend(self._validate_units())
+        if errors:
+            raise ValueError(
+                f"{len(errors)} error(s) found in batch of edits to {self._filetype}:\n"
+                + "\n".join(errors)
+            )
+        return self._write()
+
+    def _validate_units(self) -> list:
+        """Checks the parameters of each unit are valid, as done when the file is written. Invalid units are
+        recorded when errors are being collected, and a list of any other errors found is returned"""
+        return []
+
+    def _load_from_cache(self, **options) -> bool:
+        """Restores the parsed state of the file from the cache, returning False if there is no valid cache entry"""
+        state = cache.load(
+            self._filepath, self._filetype, options, self._get_cache_related_files()
+        )
+        if state is None:
+            return False
+        self.__dict__.update(state)
+        return True
+
+    def _save_to_cache(self, **options):
+        """Saves the parsed state of the file to the cache"""
+        cache.save(
+            self._filepath,
+            self._filetype,
+            self.__getstate__(),
+            options,
+            self._get_cache_related_files(),
+        )
+
+    def _get_cache_related_files(self) -> list:
+        """Returns any other files read into the parsed state, so that changes to them invalidate the cache"""
+        return []
+
+    def _diff(self, other, force_print=False, tolerance=0.0):
         try:
             if self._filetype != other._filetype:
                 raise TypeError("Cannot compare objects of different filetypes")
-            diff = self._get_diff(other)
+            # Only the differing values which are printed are listed for each dataframe
+            with _diff_options(tolerance, None if force_print else 25):
+                diff = self._get_diff(other)
             if diff[0]:
                 print("No difference, files are equivalent")
             else:
@@ -130,26 +271,68 @@ class FMFile:
             "\n\nFor additional support, go to: https://github.com/People-Places-Solutions/floodmodeller-api"
         )
 
+    def _unit_groups(self):
+        """Returns a list of (name, group) pairs for each group of units in the file"""
+        return []
+
+    def _get_hash_tree(self):
+        """Returns the content hashes of the file as a tree, containing the hash of each unit in each unit group,
+        the hash of each group and of each other compared attribute, and a single hash of the whole file"""
+        groups = {}
+        for name, group in self._unit_groups():
+            unit_hashes = _get_unit_hashes(group)
+            groups[name] = {"hash": get_tree_hash(unit_hashes), "units": unit_hashes}
+        attributes = {
+            key: item.content_hash if isinstance(item, IIC) else get_item_hash(item)
+            for key, item in self.__dict__.items()
+            if key not in _NON_COMPARED_ATTRIBUTES and key not in groups
+        }
+        group_hashes = {name: group["hash"] for name, group in groups.items()}
+        return {
+            "hash": get_tree_hash({**attributes, **group_hashes}),
+            "attributes": attributes,
+            "groups": groups,
+        }
+
+    def _get_compared_states(self, other):
+        """Returns the attributes of this file and the other file to be compared. Units which have the same
+        content hash in both files are identical, so are left out of the groups to be compared in detail."""
+        state = self.__dict__.copy()
+        other_state = getattr(other, "__dict__", {}).copy()
+        for name, group in self._unit_groups():
+            if name not in other_state:
+                continue
+            other_group = other_state[name]
+            try:
+                hashes = _get_unit_hashes(group)
+                other_hashes = _get_unit_hashes(other_group)
+            except Exception:
+                continue  # Units which cannot be written are compared in detail to report why
+            state[name] = {
+                label: group[label]
+                for label, unit_hash in hashes.items()
+                if other_hashes.get(label) != unit_hash
+            }
+            other_state[name] = {
+                label: other_group[label]
+                for label, unit_hash in other_hashes.items()
+                if hashes.get(label) != unit_hash
+            }
+        return state, other_state
+
     def __eq__(self, other, return_diff=False):
         result = True
         diff = []
         try:
-            for key, item in self.__dict__.items():
+            state, other_state = self._get_compared_states(other)
+            for key, item in state.items():
                 try:
-                    if key in (
-                        "_filepath",
-                        "_raw_data",
-                        "_gxy_filepath",
-                        "_gxy_data",
-                        "_xmltree",
-                        "_xsd",
-                        "_xsdschema",
-                    ):
+                    if key in _NON_COMPARED_ATTRIBUTES:
                         continue
                     else:
                         _result, diff = check_item_with_dataframe_equal(
                             item,
-                            other.__dict__[key],
+                            other_state[key],
                             name=f"{self._filetype}->{key}",
                             diff=diff,
                             special_types=(Unit, IIC, UrbanUnit, UrbanSubsection),
@@ -171,3 +354,10 @@ class FMFile:
             diff.append((f"{self._filetype}->{key}", f"Error encountered: {e.args[0]}"))
 
         return (result, diff) if return_diff else result
+
+
+def _get_unit_hashes(group):
+    """Returns the content hash of each unit in a group, keyed by unit label"""
+    if isinstance(group, LazyUnitGroup):
+        return group._content_hashes()
+    return {name: unit.content_hash for name, unit in group.items()}
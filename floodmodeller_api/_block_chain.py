@@ -0,0 +1,83 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the linked chain of blocks used to insert and remove units in DAT files """
+
+
+class _Link:
+    """Link in the block chain, holding either an existing block of the file or a unit which has been inserted"""
+
+    __slots__ = ("block", "unit", "prev", "next")
+
+    def __init__(self, block=None, unit=None):
+        self.block = block
+        self.unit = unit
+        self.prev = None
+        self.next = None
+
+
+class BlockChain:
+    """Doubly linked list of the blocks in a file. Blocks can be inserted next to, or removed from, any link in O(1)
+    without shifting the line numbers of the blocks which follow, so many units can be added or removed before the
+    raw data of the file is rebuilt once.
+
+    Args:
+        blocks (list): Blocks of the file, each a dictionary containing the 'Type', 'start' and 'end' of the block
+    """
+
+    def __init__(self, blocks):
+        self._head = _Link()
+        self._tail = _Link()
+        self._head.next = self._tail
+        self._tail.prev = self._head
+        self._length = 0
+        self.links = [self.insert_before(self._tail, block=block) for block in blocks]
+        # Links can be looked up by a key chosen by the owner of the chain, e.g. the unit label
+        self.index = {}
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        link = self._head.next
+        while link is not self._tail:
+            yield link
+            link = link.next
+
+    def insert_before(self, link, block=None, unit=None) -> _Link:
+        """Inserts a new link before the given link, returning the new link"""
+        new_link = _Link(block, unit)
+        new_link.prev = link.prev
+        new_link.next = link
+        link.prev.next = new_link
+        link.prev = new_link
+        self._length += 1
+        return new_link
+
+    def insert_after(self, link, block=None, unit=None) -> _Link:
+        """Inserts a new link after the given link, returning the new link"""
+        return self.insert_before(link.next, block, unit)
+
+    def append(self, block=None, unit=None) -> _Link:
+        """Adds a new link to the end of the chain, returning the new link"""
+        return self.insert_before(self._tail, block, unit)
+
+    def remove(self, link):
+        """Removes a link from the chain"""
+        link.prev.next = link.next
+        link.next.prev = link.prev
+        link.prev = link.next = None
+        self._length -= 1
@@ -0,0 +1,194 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the block tokenizer used to find the structure of DAT and IED files """
+
+import re
+
+import numpy as np
+
+from .units import ALL_UNIT_TYPES, SUPPORTED_UNIT_TYPES
+
+# All block types which can be returned by the tokenizer, the index is used as the type code
+BLOCK_TYPES = ("GENERAL", "GISINFO", *sorted(ALL_UNIT_TYPES))
+BLOCK_CODES = {block_type: code for code, block_type in enumerate(BLOCK_TYPES)}
+BLOCK_DTYPE = np.dtype([("type", np.uint8), ("start", np.int64), ("end", np.int64)])
+
+
+def _keyword_trie(keywords):
+    """Returns a regex matching any of the keywords, arranged as a trie so that matching a line
+    costs the same however many keywords there are. Spaces within keywords match any whitespace"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def _build(node):
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + _build(child)
+            for char, child in sorted(node.items())
+            if char != ""
+        ]
+        if not branches:
+            return ""
+        if "" in node:
+            return f"(?:{'|'.join(branches)})?"
+        if len(branches) == 1:
+            return branches[0]
+        return f"(?:{'|'.join(branches)})"
+
+    return _build(trie)
+
+
+def _compile_pattern():
+    """Compiles a single pattern which matches any line starting a new block. A single word keyword
+    must be followed by a space or the end of the line (or be the only text on the line), whereas the
+    words of a two word keyword can be separated by any whitespace"""
+    one_word = _keyword_trie(
+        [kw for kw in ALL_UNIT_TYPES if " " not in kw] + ["GISINFO"]
+    )
+    two_word = _keyword_trie([kw for kw in ALL_UNIT_TYPES if " " in kw])
+    # Lines which cannot start with a keyword (i.e. most data lines) are rejected by the lookahead
+    first_chars = re.escape("".join(sorted({kw[0] for kw in ALL_UNIT_TYPES} | {"G"})))
+    return re.compile(
+        rf"(?=\s*[{first_chars}])"
+        rf"(?:(?P<one>{one_word})(?: |$)|\s*(?P<alone>{one_word})\s*$|\s*(?P<two>{two_word})(?:\s|$))"
+    )
+
+
+_BLOCK_PATTERN = _compile_pattern()
+
+
+def iter_blocks(lines, has_general=False):
+    """Scans the lines of a DAT or IED file once, yielding the type, start and end index of each block
+    as soon as the block is complete. COMMENT blocks are skipped using the line count given after the
+    keyword, and everything following GISINFO is treated as a single block.
+
+    Args:
+        lines (iterable): Lines of the file, without line endings. This can be any iterable, so that
+            files can be streamed rather than read into memory.
+        has_general (bool, optional): Whether the lines begin with a general header which is closed
+            by an 'END GENERAL' line, as in a DAT file. Defaults to False.
+
+    Yields:
+        tuple: (block type, start index, end index) of each block
+    """
+    lines = enumerate(lines)
+    match = _BLOCK_PATTERN.match
+    block_type = None
+    block_start = None
+    idx = -1
+
+    if has_general:
+        for idx, line in lines:
+            if line == "END GENERAL":
+                yield "GENERAL", 0, idx
+                break
+        else:
+            return
+
+    for idx, line in lines:
+        found = match(line)
+        if found is None:
+            continue
+
+        new_type = found["one"] or found["alone"] or " ".join(found["two"].split())
+        if new_type == "GISINFO" and line != "GISINFO":
+            continue
+
+        if block_type is not None:
+            yield block_type, block_start, idx - 1
+        block_type = new_type
+        block_start = idx
+
+        if line == "COMMENT":
+            # Comments could contain unit keywords so skip over them using the line count
+            for idx, line in lines:
+                comment_n = int(line.strip())
+                break
+            for _ in range(comment_n):
+                idx, line = next(lines)
+            yield "COMMENT", block_start, idx
+            block_type = None
+
+        elif line == "GISINFO":
+            # GISINFO is always the final block in the file
+            for idx, line in lines:
+                pass
+            break
+
+    if block_type is not None:
+        # Only adds end block if there is a block present (i.e. an empty file stays empty)
+        yield block_type, block_start, idx
+
+
+def tokenize(lines, has_general=False):
+    """Returns the structure of a DAT or IED file as a compact array of (type, start, end) records,
+    where the type is the index of the block type in BLOCK_TYPES
+
+    Args:
+        lines (iterable): Lines of the file, without line endings
+        has_general (bool, optional): Whether the lines begin with a general header. Defaults to False.
+
+    Returns:
+        numpy.ndarray: Structured array with fields 'type', 'start' and 'end'
+    """
+    return np.array(
+        [
+            (BLOCK_CODES[block_type], start, end)
+            for block_type, start, end in iter_blocks(lines, has_general)
+        ],
+        dtype=BLOCK_DTYPE,
+    )
+
+
+def iter_block_lines(lines, has_general=False):
+    """Streams the blocks of a DAT or IED file, yielding the type and lines of each block. Only the
+    lines of the current block are held in memory, so files of any size can be read.
+
+    Args:
+        lines (iterable): Lines of the file, without line endings
+        has_general (bool, optional): Whether the lines begin with a general header. Defaults to False.
+
+    Yields:
+        tuple: (block type, list of lines in block)
+    """
+    buffer = []
+
+    def _buffered_lines():
+        for line in lines:
+            buffer.append(line)
+            yield line
+
+    offset = 0  # Index of the first line held in the buffer
+    for block_type, start, end in iter_blocks(_buffered_lines(), has_general):
+        block = buffer[start - offset : end + 1 - offset]
+        del buffer[: end + 1 - offset]
+        offset = end + 1
+        yield block_type, block
+
+
+def _get_unit_types(types):
+    """Returns the set of unit types to be read, checking that each is supported"""
+    if types is None:
+        return set(SUPPORTED_UNIT_TYPES)
+    types = {types} if isinstance(types, str) else set(types)
+    unsupported = types.difference(SUPPORTED_UNIT_TYPES)
+    if unsupported:
+        raise ValueError(f"Unit type(s) not supported: {sorted(unsupported)}")
+    return types
@@ -0,0 +1,393 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Reads the metadata of Flood Modeller '.zzl' files and the results of '.zzn' files """
+
+import math
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+# The zzl file is made of 128 byte records. The first record holds the model title, the third and fourth records
+# hold the timestep, save interval, number of nodes and start time of the results, and the sixth record onwards
+# hold the node labels, ten 12 character labels or sixteen 8 character labels to a record.
+_RECORD_LENGTH = 128
+_TITLE_LENGTH = 120
+_HEADER_LENGTH = 5 * _RECORD_LENGTH
+
+# Position of each header value, as the index of the 4 byte word holding it
+_DT = 64
+_TIMESTEP0 = 65
+_LTIMESTEP = 96
+_SAVE_STEPS = 97
+_NNODES = 98
+_LABEL_LENGTH = 99
+_TZERO = slice(100, 105)
+
+# Each saved timestep of the zzn file holds the results of every variable at each node, ordered by node
+VARIABLES = ["Flow", "Stage", "Froude", "Velocity", "Mode", "State"]
+NVARS = len(VARIABLES)
+
+# Names of the arrays holding the maximum and minimum results, and the times at which they occur
+EXTREMES = ("max_results", "min_results", "max_times", "min_times")
+
+# Size of the blocks of results read at a time when finding the maximum and minimum results
+_CHUNK_BYTES = 2**24
+
+
+def read_zzl(zzl_filepath: Union[str, Path]) -> dict:
+    """Reads the metadata and node labels of a zzl file
+
+    Args:
+        zzl_filepath (str): Full filepath to the zzl file
+
+    Returns:
+        dict: Metadata of the results, with the same keys and values as the 'meta' attribute of ZZN
+    """
+    header = np.fromfile(zzl_filepath, dtype=np.uint8, count=_HEADER_LENGTH)
+    if len(header) < _HEADER_LENGTH:
+        raise ValueError("ZZL file is too short to hold the header of the results")
+    words = header.view("<i4")
+    dt = float(header.view("<f4")[_DT])
+    timestep0 = int(words[_TIMESTEP0])
+    ltimestep = int(words[_LTIMESTEP])
+    save_steps = int(words[_SAVE_STEPS])
+    nnodes = int(words[_NNODES])
+    label_length = 12 if words[_LABEL_LENGTH] == 12 else 8
+
+    meta = {
+        "zzl_name": str(zzl_filepath),
+        # Model title is padded with blanks to the length of the title buffer used by Flood Modeller
+        "model_title": header[:_TITLE_LENGTH].tobytes().decode().ljust(128),
+        "nnodes": nnodes,
+        "label_length": label_length,
+        "dt": dt,
+        "timestep0": timestep0,
+        "ltimestep": ltimestep,
+        "save_int": float(np.float32(save_steps) * np.float32(dt)),
+        "is_quality": False,
+        "nvars": NVARS,
+        "variables": list(VARIABLES),
+        "tzero": words[_TZERO].tolist(),
+        "errstat": 0,
+        "labels": _read_labels(zzl_filepath, nnodes, label_length),
+    }
+    last_hr = (ltimestep - timestep0) * dt / 3600
+    meta["output_hrs"] = [0.0, float(np.float32(last_hr))]
+    meta["aitimestep"] = [timestep0, ltimestep]
+    meta["isavint"] = _save_range(meta["output_hrs"], dt, timestep0, ltimestep, meta["save_int"])
+    meta["node_ID"] = -1
+    meta["savint_skip"] = 1
+    meta["savint_range"] = int((meta["isavint"][1] - meta["isavint"][0]) / meta["savint_skip"])
+    return meta
+
+
+def select_results(
+    meta: dict,
+    nodes: Optional[list] = None,
+    variables: Optional[list] = None,
+    time_window: Optional[tuple] = None,
+    stride: int = 1,
+) -> tuple:
+    """Limits the results to a subset of the nodes, variables and saved timesteps
+
+    Args:
+        meta (dict): Metadata of the results, as returned by ``read_zzl()``
+        nodes (list, optional): Labels of the nodes to read. Defaults to None, to read all nodes.
+        variables (list, optional): Names of the variables to read. Defaults to None, to read all variables.
+        time_window (tuple, optional): First and last hour of the results to read. Defaults to None, to read the
+            results of the whole simulation.
+        stride (int, optional): Interval between the saved timesteps read. Defaults to 1, to read every saved
+            timestep.
+
+    Returns:
+        tuple: Metadata of the subset of the results, and a dictionary of the position of the selected nodes and
+            variables in the results file
+    """
+    meta = dict(meta)
+    selection = {"file_nnodes": meta["nnodes"], "nodes": None, "variables": None}
+
+    if nodes is not None:
+        positions = {}
+        for idx, label in enumerate(meta["labels"]):
+            positions.setdefault(label, idx)
+        nodes = [nodes] if isinstance(nodes, str) else list(nodes)
+        missing = [label for label in nodes if label not in positions]
+        if missing:
+            raise ValueError(f"Node(s) not found in results: {missing}")
+        selection["nodes"] = [positions[label] for label in nodes]
+        meta["labels"] = nodes
+        meta["nnodes"] = len(nodes)
+
+    if variables is not None:
+        variables = [variables] if isinstance(variables, str) else list(variables)
+        variables = [variable.strip().capitalize() for variable in variables]
+        invalid = [variable for variable in variables if variable not in VARIABLES]
+        if invalid:
+            raise ValueError(f"Variable(s) not recognised: {invalid}. Valid variables are: {VARIABLES}")
+        selection["variables"] = [VARIABLES.index(variable) for variable in variables]
+        meta["variables"] = variables
+        meta["nvars"] = len(variables)
+
+    if time_window is not None:
+        meta["output_hrs"] = [float(np.float32(hrs)) for hrs in time_window]
+    if int(stride) < 1:
+        raise ValueError("Stride must be a positive whole number of saved timesteps")
+    meta["savint_skip"] = int(stride)
+    meta["isavint"] = _save_range(
+        meta["output_hrs"], meta["dt"], meta["timestep0"], meta["ltimestep"], meta["save_int"]
+    )
+    meta["savint_range"] = int((meta["isavint"][1] - meta["isavint"][0]) / meta["savint_skip"])
+    if meta["savint_range"] < 0:
+        raise ValueError(f"Time window {time_window} does not contain any saved timesteps")
+    return meta, selection
+
+
+class LazyResults(MutableMapping):
+    """Dictionary-like set of the results arrays of a zzn file, with the same keys as the 'data' attribute of ZZN.
+    Each array is only read from the file the first time it is accessed, so results which are never used are never
+    read. The maximum and minimum results and their times are found together in a single pass over the file.
+
+    Args:
+        zzn_filepath (str): Full filepath to the zzn file
+        meta (dict): Metadata of the results, as returned by ``read_zzl()`` or ``select_results()``
+        selection (dict, optional): Position of the selected nodes and variables, as returned by
+            ``select_results()``. Defaults to None, to read all nodes and variables.
+    """
+
+    def __init__(self, zzn_filepath: Union[str, Path], meta: dict, selection: Optional[dict] = None):
+        self._filepath = zzn_filepath
+        self._meta = meta
+        self._selection = selection
+        self._keys = ["all_results", *EXTREMES]
+        self._arrays = {}
+
+    def _is_loaded(self, key):
+        """Returns True if the array has been read from the file"""
+        return key in self._arrays
+
+    def _loaded_items(self):
+        """Returns a list of (key, array) pairs for arrays which have already been read"""
+        return list(self._arrays.items())
+
+    def __getitem__(self, key):
+        if key not in self._arrays:
+            if key not in self._keys:
+                raise KeyError(key)
+            if key == "all_results":
+                self._arrays[key] = read_results(self._filepath, self._meta, self._selection)
+            else:
+                if "all_results" in self._arrays:
+                    extremes = get_extremes(self._arrays["all_results"])
+                else:
+                    extremes = read_extremes(self._filepath, self._meta, self._selection)
+                for name in EXTREMES:
+                    if name in self._keys:
+                        self._arrays.setdefault(name, extremes[name])
+        return self._arrays[key]
+
+    def __setitem__(self, key, values):
+        if key not in self._keys:
+            self._keys.append(key)
+        self._arrays[key] = values
+
+    def __delitem__(self, key):
+        self._keys.remove(key)
+        self._arrays.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._arrays.clear()
+
+    def __repr__(self):
+        loaded = ", ".join(self._arrays)
+        return f"<floodmodeller_api LazyResults: {len(self)} arrays, loaded: [{loaded}]>"
+
+
+def read_results(
+    zzn_filepath: Union[str, Path], meta: dict, selection: Optional[dict] = None
+) -> np.ndarray:
+    """Reads the results of a zzn file
+
+    Args:
+        zzn_filepath (str): Full filepath to the zzn file
+        meta (dict): Metadata of the results, as returned by ``read_zzl()`` or ``select_results()``
+        selection (dict, optional): Position of the selected nodes and variables. Defaults to None.
+
+    Returns:
+        numpy.ndarray: Results of each variable at each node, with shape (saved timesteps, variables, nodes)
+    """
+    # Results are read a few saved timesteps at a time into their final layout, so they are only held once
+    nz = meta["savint_range"] + 1
+    step = _chunk_timesteps(meta)
+    results = np.empty((nz, meta["nvars"], meta["nnodes"]), dtype=np.float32)
+    for start in range(0, nz, step):
+        stop = min(start + step, nz)
+        chunk = _read_timesteps(zzn_filepath, meta, selection, start, stop)
+        results[start:stop] = chunk.transpose(0, 2, 1)
+    return results
+
+
+def read_extremes(
+    zzn_filepath: Union[str, Path], meta: dict, selection: Optional[dict] = None
+) -> dict:
+    """Reads the maximum and minimum of each variable at each node of a zzn file, and the saved timestep at which
+    they first occur. The file is read a few saved timesteps at a time, so the full results are never held in memory.
+
+    Args:
+        zzn_filepath (str): Full filepath to the zzn file
+        meta (dict): Metadata of the results, as returned by ``read_zzl()`` or ``select_results()``
+        selection (dict, optional): Position of the selected nodes and variables. Defaults to None.
+
+    Returns:
+        dict: 'max_results', 'min_results', 'max_times' and 'min_times' arrays, with shape (variables, nodes)
+    """
+    nz = meta["savint_range"] + 1
+    step = _chunk_timesteps(meta)
+    chunks = (
+        _read_timesteps(zzn_filepath, meta, selection, start, min(start + step, nz)).transpose(
+            0, 2, 1
+        )
+        for start in range(0, nz, step)
+    )
+    return _get_extremes(chunks, step)
+
+
+def get_extremes(all_results: np.ndarray) -> dict:
+    """Returns the maximum and minimum of each variable at each node of the results, and the saved timestep at which
+    they first occur
+
+    Args:
+        all_results (numpy.ndarray): Results with shape (saved timesteps, variables, nodes)
+
+    Returns:
+        dict: 'max_results', 'min_results', 'max_times' and 'min_times' arrays, with shape (variables, nodes)
+    """
+    step = max(1, _CHUNK_BYTES // max(all_results[0].nbytes, 1))
+    chunks = (all_results[start : start + step] for start in range(0, len(all_results), step))
+    return _get_extremes(chunks, step)
+
+
+def _get_extremes(chunks, step):
+    # Times are the position of the first saved timestep holding the maximum or minimum, counted from 1
+    extremes = None
+    for idx, chunk in enumerate(chunks):
+        chunk_extremes = {
+            "max_results": chunk.max(axis=0),
+            "min_results": chunk.min(axis=0),
+            "max_times": chunk.argmax(axis=0) + idx * step + 1,
+            "min_times": chunk.argmin(axis=0) + idx * step + 1,
+        }
+        if extremes is None:
+            extremes = chunk_extremes
+            continue
+        for result, times, later in (
+            ("max_results", "max_times", chunk_extremes["max_results"] > extremes["max_results"]),
+            ("min_results", "min_times", chunk_extremes["min_results"] < extremes["min_results"]),
+        ):
+            extremes[result] = np.where(later, chunk_extremes[result], extremes[result])
+            extremes[times] = np.where(later, chunk_extremes[times], extremes[times])
+
+    return {
+        "max_results": np.ascontiguousarray(extremes["max_results"], dtype=np.float32),
+        "min_results": np.ascontiguousarray(extremes["min_results"], dtype=np.float32),
+        "max_times": np.ascontiguousarray(extremes["max_times"], dtype=np.int32),
+        "min_times": np.ascontiguousarray(extremes["min_times"], dtype=np.int32),
+    }
+
+
+def _chunk_timesteps(meta):
+    """Returns the number of saved timesteps read at a time when reading through the file"""
+    timestep_bytes = meta["nnodes"] * meta["nvars"] * 4 * meta["savint_skip"]
+    return max(1, _CHUNK_BYTES // max(timestep_bytes, 1))
+
+
+def _read_timesteps(zzn_filepath, meta, selection, start, stop):
+    """Reads saved timesteps start to stop of the results, counted from the first saved timestep in the output hours,
+    returning an array with shape (saved timesteps, nodes, variables)"""
+    if selection is None:
+        selection = {"file_nnodes": meta["nnodes"], "nodes": None, "variables": None}
+    file_nnodes = selection["file_nnodes"]
+    skip = meta["savint_skip"]
+    first = meta["isavint"][0] + start * skip
+    nsaved = (stop - start - 1) * skip + 1
+
+    offset = first * file_nnodes * NVARS * 4
+    count = nsaved * file_nnodes * NVARS
+    if Path(zzn_filepath).stat().st_size < offset + count * 4:
+        raise ValueError("ZZN file ends before the last saved timestep of the results")
+
+    if skip == 1 and selection["nodes"] is None and selection["variables"] is None:
+        values = np.fromfile(zzn_filepath, dtype="<f4", count=count, offset=offset)
+        return values.reshape(nsaved, file_nnodes, NVARS).astype(np.float32, copy=False)
+
+    # Only the parts of the file holding the selected nodes and saved timesteps are read
+    mapped = np.memmap(
+        zzn_filepath, dtype="<f4", mode="r", offset=offset, shape=(nsaved, file_nnodes, NVARS)
+    )
+    values = mapped[::skip]
+    if selection["nodes"] is not None:
+        values = values[:, selection["nodes"]]
+    if selection["variables"] is not None:
+        values = values[:, :, selection["variables"]]
+    values = np.array(values, dtype=np.float32)
+    del mapped
+    return values
+
+
+def _read_labels(zzl_filepath, nnodes, label_length):
+    per_record = 16 if label_length == 8 else 10
+    nrecords = math.ceil(nnodes / per_record)
+    records = np.fromfile(
+        zzl_filepath,
+        dtype=np.uint8,
+        count=nrecords * _RECORD_LENGTH,
+        offset=_HEADER_LENGTH,
+    )
+    if len(records) < nrecords * _RECORD_LENGTH:
+        raise ValueError("ZZL file ends before the last node label")
+    labels = records.reshape(nrecords, _RECORD_LENGTH)[:, : per_record * label_length]
+    labels = labels.reshape(-1, label_length)[:nnodes]
+    return [label.tobytes().split(b"\0", 1)[0].decode().strip() for label in labels]
+
+
+def _save_range(output_hrs, dt, timestep0, ltimestep, save_int):
+    """Returns the first and last saved timestep within the output hours, counted from 0"""
+    dt = np.float32(dt)
+    save_steps = _nint(np.float32(save_int) / dt)
+    save_range = [0, 0]
+    for idx, hrs in enumerate(output_hrs):
+        timestep = _nint(np.float32(3600) * np.float32(hrs) / dt + np.float32(1))
+        timestep = max(timestep, timestep0) if idx == 0 else min(timestep, ltimestep)
+        if save_steps > 0:
+            save_range[idx] = int((timestep - timestep0) / save_steps)
+    return save_range
+
+
+def _nint(value):
+    """Rounds to the nearest integer, with halves rounded away from zero"""
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
@@ -0,0 +1,175 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the parse cache used when API file classes are initiated with cache=True
+
+The parsed state of each file is stored as a binary entry in a shared cache directory. An entry is only used
+if the path, size, modified time and content hash of the file all match those recorded when it was cached, along
+with those of any related files read with it (e.g. the .gxy of a DAT).
+Once the total size of the cache directory exceeds MAX_CACHE_SIZE, the least recently used entries are removed.
+"""
+
+import gc
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+from .version import __version__
+
+# Directory used to store cache entries, can be set with the 'FLOODMODELLER_API_CACHE' environment variable
+CACHE_DIR = Path(
+    os.environ.get(
+        "FLOODMODELLER_API_CACHE", Path.home() / ".cache" / "floodmodeller_api"
+    )
+)
+# Maximum total size of the cache directory in bytes
+MAX_CACHE_SIZE = 1024**3
+
+_SUFFIX = ".fmcache"
+
+
+def _entry_path(filepath, filetype, options):
+    name = hashlib.blake2b(
+        f"{filetype}|{filepath}|{sorted((options or {}).items())}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    return Path(CACHE_DIR) / f"{name}{_SUFFIX}"
+
+
+def _file_state(filepath):
+    """Returns the size, modified time and content hash of the file"""
+    stat = os.stat(filepath)
+    with open(filepath, "rb") as _file:
+        content_hash = hashlib.blake2b(_file.read(), digest_size=16).hexdigest()
+    return stat.st_size, stat.st_mtime_ns, content_hash
+
+
+def _file_key(filepath, filetype, options, related_files=()):
+    """Returns the key used to check that a cache entry is still valid for the file. Each related file is recorded
+    as None if it does not exist, so that creating, editing or removing it invalidates the entry"""
+    size, mtime, content_hash = _file_state(filepath)
+    related = {}
+    for related_path in related_files:
+        related[str(related_path)] = (
+            _file_state(related_path) if os.path.exists(related_path) else None
+        )
+    return {
+        "version": __version__,
+        "filetype": filetype,
+        "path": str(filepath),
+        "size": size,
+        "mtime": mtime,
+        "content_hash": content_hash,
+        "related_files": related,
+        "options": options,
+    }
+
+
+def load(filepath, filetype, options=None, related_files=()):
+    """Returns the cached state for the file, or None if there is no valid cache entry
+
+    Args:
+        filepath (Path): Full filepath to the file
+        filetype (str): Type of file class, e.g. 'DAT'
+        options (dict, optional): Options used when reading the file which affect the parsed state. Defaults to None.
+        related_files (list, optional): Other files read into the parsed state, which must also be unchanged.
+
+    Returns:
+        dict: Cached state, or None
+    """
+    entry_path = _entry_path(filepath, filetype, options)
+    try:
+        with open(entry_path, "rb") as entry_file:
+            key = pickle.load(entry_file)
+            if key != _file_key(filepath, filetype, options, related_files):
+                return None
+            # Unpickling creates many objects at once, which would otherwise trigger repeated garbage collection
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                state = pickle.load(entry_file)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+        os.utime(entry_path)  # Marks entry as recently used
+    except Exception:
+        # A missing, unreadable or outdated entry is treated as a cache miss
+        return None
+    return state
+
+
+def save(filepath, filetype, state, options=None, related_files=()):
+    """Saves the parsed state of the file to the cache, then removes the least recently used entries if the
+    cache is larger than MAX_CACHE_SIZE. Failing to save to the cache does not raise an error.
+
+    Args:
+        filepath (Path): Full filepath to the file
+        filetype (str): Type of file class, e.g. 'DAT'
+        state (dict): Parsed state to save
+        options (dict, optional): Options used when reading the file which affect the parsed state. Defaults to None.
+        related_files (list, optional): Other files read into the parsed state, which must also be unchanged.
+    """
+    entry_path = _entry_path(filepath, filetype, options)
+    temp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as entry_file:
+            pickle.dump(
+                _file_key(filepath, filetype, options, related_files),
+                entry_file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            pickle.dump(state, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, entry_path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return
+
+    _evict()
+
+
+def _evict():
+    """Removes the least recently used entries until the cache is no larger than MAX_CACHE_SIZE"""
+    entries = []
+    for entry_path in Path(CACHE_DIR).glob(f"*{_SUFFIX}"):
+        try:
+            stat = entry_path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, entry_path in sorted(entries, key=lambda entry: entry[0]):
+        if total_size <= MAX_CACHE_SIZE:
+            break
+        try:
+            os.remove(entry_path)
+            total_size -= size
+        except OSError:
+            pass
+
+
+def clear():
+    """Removes all entries from the cache"""
+    for entry_path in Path(CACHE_DIR).glob(f"*{_SUFFIX}"):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
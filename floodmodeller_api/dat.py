@@ -14,11 +14,25 @@ If you have any query about this program or this License, please contact us at s
 address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
 """
 
+import hashlib
+import re
 from pathlib import Path
 from typing import Optional, Union
 
+import numpy as np
+import pandas as pd
+
 from . import units  # Import for using as package
 from ._base import FMFile
+from ._block_chain import BlockChain
+from .network import Network
+from .spatial import SpatialIndex
+from ._tokenizer import iter_blocks, iter_block_lines, _get_unit_types
+from floodmodeller_api.units._base import Unit
+from floodmodeller_api.units._section_store import (
+    PROPERTY_COLUMNS,
+    section_properties,
+)
 from floodmodeller_api.units.helpers import _to_str, _to_float, _to_int, _to_data_list
 
 
@@ -27,6 +41,10 @@ class DAT(FMFile):
 
     Args:
         dat_filepath (str, optional): Full filepath to dat file. If not specified, a new DAT class will be created. Defaults to None.
+        lazy (bool, optional): If True, units are only read from the dat file the first time they are accessed and any units
+            which are never accessed are written back exactly as they were read. Defaults to False.
+        cache (bool, optional): If True, the parsed DAT is stored in the parse cache (see ``floodmodeller_api.cache``) and
+            later reads of the same unchanged file are loaded from the cache. Defaults to False.
 
     Output:
         Initiates 'DAT' class object
@@ -39,18 +57,27 @@ class DAT(FMFile):
     _filetype: str = "DAT"
     _suffix: str = ".dat"
 
-    def __init__(self, dat_filepath: Optional[Union[str, Path]] = None):
+    def __init__(
+        self,
+        dat_filepath: Optional[Union[str, Path]] = None,
+        lazy: bool = False,
+        cache: bool = False,
+    ):
         try:
             self._filepath = dat_filepath
             if self._filepath != None:
                 FMFile.__init__(self)
+                if cache and self._load_from_cache(lazy=lazy):
+                    return
                 self._read()
 
             else:
                 self._create_from_blank()
 
             self._get_general_parameters()
-            self._get_unit_definitions()
+            self._get_unit_definitions(lazy)
+            if cache and self._filepath != None:
+                self._save_to_cache(lazy=lazy)
         except Exception as e:
             self._handle_exception(e, when="read")
 
@@ -71,6 +98,33 @@ class DAT(FMFile):
         """
         filepath = Path(filepath).absolute()
         self._save(filepath)
+
+    def clone(self) -> "DAT":
+        """Returns a copy of the DAT for creating variants of a model, e.g. with different roughness values. The copy
+        shares the lines of the dat file with this DAT rather than copying every unit. Each unit is only read into the
+        copy the first time it is accessed, and units which are never accessed are written back as they are, so the
+        time taken to create, edit and save a copy depends on the number of units edited rather than the size of the
+        model. Changes made to the copy do not affect this DAT, and vice versa.
+
+        Returns:
+            DAT: Copy of the DAT, in its current state
+        """
+        # Lines of the dat file are updated with any changes so that units can be read from them
+        self._update_raw_data()
+        self._update_general_parameters()
+        self._update_unit_names()
+
+        new_dat = DAT.__new__(DAT)
+        new_dat._filepath = self._filepath
+        new_dat._raw_data = self._raw_data.copy()  # Only copies references to the lines
+        new_dat._dat_struct = [block.copy() for block in self._dat_struct]
+        new_dat._gxy_filepath = self._gxy_filepath
+        new_dat._gxy_data = self._gxy_data
+        new_dat._get_general_parameters()
+        new_dat._get_unit_definitions(lazy=True)
+        return new_dat
+
+    def _after_save(self, filepath):
         if not self._gxy_data == None:
             gxy_string = self._gxy_data
             new_gxy_path = filepath.with_suffix(".gxy")
@@ -78,7 +132,9 @@ class DAT(FMFile):
                 gxy_file.write(gxy_string)
             self._gxy_filepath = new_gxy_path
 
-    def diff(self, other: "DAT", force_print: bool = False) -> None:
+    def diff(
+        self, other: "DAT", force_print: bool = False, tolerance: float = 0.0
+    ) -> None:
         """Compares the DAT class against another DAT class to check whether they are
         equivalent, or if not, what the differences are. Two instances of a DAT class are
         deemed equivalent if all of their attributes are equal except for the filepath and
@@ -94,8 +150,26 @@ class DAT(FMFile):
             other (floodmodeller_api.DAT): Other instance of a DAT class
             force_print (bool): Forces the API to print every difference found, rather than
                 just the first 25 differences. Defaults to False.
+            tolerance (float): Numeric values which differ by no more than the tolerance are treated as equal,
+                e.g. 0.001 to ignore differences from values being rounded to 3 decimal places. Defaults to 0.0.
+        """
+        self._diff(other, force_print=force_print, tolerance=tolerance)
+
+    def hash_tree(self) -> dict:
+        """Returns the content hashes of the DAT as a tree. Each unit has a stable hash of its block as it would
+        be written, each unit group has a hash combining the hashes of its units, and the DAT has a single hash
+        combining the hashes of every group and of the other attributes compared by ``DAT.diff()``. Two DATs
+        with the same hash are equivalent, and units with the same hash are skipped when comparing DATs.
+
+        Returns:
+            dict: Dictionary containing the 'hash' of the DAT, the hash of each of its other 'attributes', and for
+                each unit group in 'groups', the 'hash' of the group and the hash of each of its 'units'
         """
-        self._diff(other, force_print=force_print)
+        return self._get_hash_tree()
+
+    def _get_cache_related_files(self) -> list:
+        # The .gxy data is stored with the parsed DAT
+        return [self._filepath.with_suffix(".gxy")]
 
     def _read(self):
         # Read DAT data
@@ -124,14 +198,9 @@ class DAT(FMFile):
         try:
             self._update_raw_data()
             self._update_general_parameters()
-            self._update_dat_struct()
             self._update_unit_names()
 
-            dat_string = ""
-            for line in self._raw_data:
-                dat_string += line + "\n"
-
-            return dat_string
+            return "".join(f"{line}\n" for line in self._raw_data)
 
         except Exception as e:
             self._handle_exception(e, when="write")
@@ -155,6 +224,7 @@ class DAT(FMFile):
             " label   ?      flow     stage froude no  velocity     umode    ustate         z",
         ]
         self._gxy_filepath = None
+        self._gxy_data = None
 
     def _get_general_parameters(self):
         # ** Get general parameters here
@@ -207,40 +277,112 @@ class DAT(FMFile):
         )
         self._raw_data[3] = general_params_2
 
+    def rename_units(self, mapping: dict) -> None:
+        """Renames many units at once, updating the labels in the GISINFO block, the .gxy data and the initial
+        conditions in a single pass over each rather than once per unit. Every unit with a given label is renamed,
+        e.g. both the river section and the boundary at a node.
+
+        Args:
+            mapping (dict): Dictionary of current label to new label
+
+        Raises:
+            KeyError: Raised if no unit has one of the current labels
+            Exception: Raised if a new label is already used by another unit in the same group
+        """
+        for old_name in mapping:
+            if not any(old_name in unit_group for _, unit_group in self._unit_groups()):
+                raise KeyError(f"No unit labelled '{old_name}' in the DAT")
+
+        # Check all new labels before renaming any units, allowing labels to be swapped
+        errors = []
+        for unit_group_name, unit_group in self._unit_groups():
+            group_renames = {
+                old_name: new_name
+                for old_name, new_name in mapping.items()
+                if old_name in unit_group
+            }
+            errors.extend(_check_new_labels(unit_group_name, unit_group, group_renames))
+        if errors:
+            raise Exception("\n".join(errors))
+
+        for old_name, new_name in mapping.items():
+            for _, unit_group in self._unit_groups():
+                if old_name in unit_group:
+                    unit_group[old_name].name = new_name
+        if self._batch_targets is None:
+            # Within a batch of edits, labels are updated once the batch is complete
+            self._update_raw_data()
+            self._update_unit_names()
+
+    def _unit_groups(self):
+        return [
+            ("boundaries", self.boundaries),
+            ("sections", self.sections),
+            ("structures", self.structures),
+            ("conduits", self.conduits),
+            ("losses", self.losses),
+        ]
+
+    def _get_renames(self):
+        """Returns the renamed units of each unit group, along with an error for each new label that already exists"""
+        renames = {}
+        errors = []
+        for unit_group_name, unit_group in self._unit_groups():
+            group_renames = {
+                name: unit.name
+                for name, unit in self._loaded_units(unit_group)
+                if name != unit.name
+            }
+            if group_renames:
+                renames[unit_group_name] = group_renames
+                errors.extend(_check_new_labels(unit_group_name, unit_group, group_renames))
+        return renames, errors
+
+    def _validate_units(self):
+        for _, unit_group in self._unit_groups():
+            for _, unit in self._loaded_units(unit_group):
+                unit._validate()
+        return self._get_renames()[1]
+
     def _update_unit_names(self):
-        for unit_group, unit_group_name in [
-            (self.boundaries, "boundaries"),
-            (self.sections, "sections"),
-            (self.structures, "structures"),
-            (self.conduits, "conduits"),
-            (self.losses, "losses"),
-        ]:
-            for name, unit in unit_group.copy().items():
-                if name != unit.name:
-                    # Check if new name already exists as a label
-                    if unit.name in unit_group:
-                        raise Exception(
-                            f'Error: Cannot update label "{name}" to "{unit.name}" because "{unit.name}" already exists in the Network {unit_group_name} group'
-                        )
-                    unit_group[unit.name] = unit
-                    del unit_group[name]
-                    # Update label in ICs
-                    if unit_group_name not in ["boundaries", "losses"]:
-                        # TODO: Need to do a more thorough check for whether a unit is one in the ICs
-                        # e.g. Culvert inlet and river section may have same label, but only river
-                        # section label should update in ICs
-                        self.initial_conditions.update_label(name, unit.name)
-
-                    # Update label in GISINFO and GXY data
-                    self._update_gisinfo_label(
-                        unit._unit,
-                        unit._subtype,
-                        name,
-                        unit.name,
-                        unit_group_name
-                        in ["boundaries", "losses"],  # if True it ignores second lbl
-                    )
-                    self._update_gxy_label(unit._unit, unit._subtype, name, unit.name)
+        """Updates the keys of each unit group, along with the labels in the GISINFO block, .gxy data and initial
+        conditions, for any units which have been renamed. All renames are applied together in a single pass."""
+        renames, errors = self._get_renames()
+        if errors:
+            raise Exception("\n".join(errors))
+
+        renamed = []  # (group name, previous label, unit)
+        for unit_group_name, group_renames in renames.items():
+            unit_group = getattr(self, unit_group_name)
+            _rename_group_keys(unit_group, group_renames)
+            renamed.extend(
+                (unit_group_name, name, unit_group[new_name])
+                for name, new_name in group_renames.items()
+            )
+
+        if renamed:
+            # Update label in ICs
+            # TODO: Need to do a more thorough check for whether a unit is one in the ICs
+            # e.g. Culvert inlet and river section may have same label, but only river
+            # section label should update in ICs
+            self.initial_conditions.update_labels(
+                {
+                    name: unit.name
+                    for group_name, name, unit in renamed
+                    if group_name not in ["boundaries", "losses"]
+                }
+            )
+
+            # Update label in GISINFO and GXY data
+            self._update_gisinfo_labels(renamed)
+            self._update_gxy_labels(renamed)
+
+            # Rename node in network, which is rebuilt if the label is shared with other units
+            for _, name, unit in renamed:
+                if self._network is not None and not self._network.rename(
+                    name, unit.name
+                ):
+                    self._network = None
 
         # Update IC table names in raw_data if any name changes
         ic_start, ic_end = next(
@@ -248,63 +390,135 @@ class DAT(FMFile):
             for unit in self._dat_struct
             if unit["Type"] == "INITIAL CONDITIONS"
         )
-        self._raw_data[ic_start : ic_end + 1] = self.initial_conditions._write()
+        ic_block = self.initial_conditions._get_block()
+        if ic_block != self._raw_data[ic_start : ic_end + 1]:
+            self._raw_data[ic_start : ic_end + 1] = ic_block
+            if len(ic_block) != ic_end + 1 - ic_start:
+                self._update_dat_struct()
 
     def _update_raw_data(self):
+        """Internal method used to update self._raw_data with any changes to the units. Only units which have changed
+        since they were last read or written are written again and spliced into the existing raw data. The start and
+        end of each block in self._dat_struct are shifted to match, so the full structure doesn't need regenerating.
+        If units have been inserted or removed, the raw data is instead rebuilt once from the block chain.
+        """
+        self._check_section_store_columns()
+        if self._chain is not None:
+            self._rebuild_raw_data()
+            return
+
         block_shift = 0
-        existing_units = {
-            "boundaries": [],
-            "structures": [],
-            "sections": [],
-            "conduits": [],
-            "losses": [],
-        }
+        dat_struct = []
 
         for block in self._dat_struct:
+            start = block["start"] + block_shift
+            end = block["end"] + block_shift
             # Check for all supported boundary types
             if block["Type"] in units.SUPPORTED_UNIT_TYPES:
-                unit_data = self._raw_data[
-                    block["start"] + block_shift : block["end"] + 1 + block_shift
-                ]
-                prev_block_len = len(unit_data)
+                unit_data = self._raw_data[start : end + 1]
+                new_unit_data = self._get_new_unit_data(block["Type"], unit_data)
+
+                if new_unit_data != unit_data:
+                    self._raw_data[start : end + 1] = new_unit_data
+                    # adjust block shift for change in number of lines in bdy block
+                    block_shift += len(new_unit_data) - len(unit_data)
+                    end = start + len(new_unit_data) - 1
+                    if len(new_unit_data) == 0:
+                        self._network = None  # Network is rebuilt without the unit
+                        continue  # Block removed from structure
+
+            block["start"] = start
+            block["end"] = end
+            dat_struct.append(block)
 
-                if block["Type"] == "INITIAL CONDITIONS":
-                    new_unit_data = self.initial_conditions._write()
+        self._dat_struct = dat_struct
 
-                else:
-                    if units.SUPPORTED_UNIT_TYPES[block["Type"]]["has_subtype"]:
-                        unit_name = unit_data[2][: self._label_len].strip()
-                    else:
-                        unit_name = unit_data[1][: self._label_len].strip()
-
-                    # Get unit object
-                    unit_group = getattr(
-                        self, units.SUPPORTED_UNIT_TYPES[block["Type"]]["group"]
+    def _rebuild_raw_data(self):
+        """Internal method used to build self._raw_data and self._dat_struct again from the block chain once units
+        have been inserted or removed, so that the lines of the file are only rebuilt once however many units changed.
+        """
+        self._apply_ic_changes()
+        inserted_units = {id(link.unit) for link in self._chain if link.unit is not None}
+        raw_data = []
+        dat_struct = []
+
+        for link in self._chain:
+            if link.unit is not None:
+                # Inserted unit
+                block_type = link.unit._unit
+                new_unit_data = link.unit._get_block()
+            else:
+                block_type = link.block["Type"]
+                new_unit_data = self._raw_data[link.block["start"] : link.block["end"] + 1]
+                if block_type in units.SUPPORTED_UNIT_TYPES:
+                    new_unit_data = self._get_new_unit_data(
+                        block_type, new_unit_data, inserted_units
                     )
-                    if unit_name in unit_group:
-                        # block still exists
-                        new_unit_data = unit_group[unit_name]._write()
-                        existing_units[
-                            units.SUPPORTED_UNIT_TYPES[block["Type"]]["group"]
-                        ].append(unit_name)
-                    else:
-                        # Bdy block has been deleted
-                        new_unit_data = []
-
-                new_block_len = len(new_unit_data)
-                self._raw_data[
-                    block["start"] + block_shift : block["end"] + 1 + block_shift
-                ] = new_unit_data
-                # adjust block shift for change in number of lines in bdy block
-                block_shift += new_block_len - prev_block_len
-
-    def _get_unit_definitions(self):
+                if len(new_unit_data) == 0:
+                    continue  # Block removed from structure
+
+            dat_struct.append(
+                {
+                    "Type": block_type,
+                    "start": len(raw_data),
+                    "end": len(raw_data) + len(new_unit_data) - 1,
+                }
+            )
+            raw_data.extend(new_unit_data)
+
+        self._raw_data = raw_data
+        self._dat_struct = dat_struct
+        self._chain = None
+        self._network = None  # Network is rebuilt with the new units
+
+    def _get_new_unit_data(self, block_type, unit_data, inserted_units=()):
+        """Returns the current lines of a unit block, or an empty list if the unit has been removed"""
+        if block_type == "INITIAL CONDITIONS":
+            return self.initial_conditions._get_block()
+
+        if units.SUPPORTED_UNIT_TYPES[block_type]["has_subtype"]:
+            unit_name = unit_data[2][: self._label_len].strip()
+        else:
+            unit_name = unit_data[1][: self._label_len].strip()
+
+        # Get unit object
+        unit_group = getattr(self, units.SUPPORTED_UNIT_TYPES[block_type]["group"])
+        if unit_name not in unit_group:
+            # Bdy block has been deleted
+            return []
+        if isinstance(unit_group, units.LazyUnitGroup) and not unit_group._is_loaded(
+            unit_name
+        ):
+            # unit never accessed so keep raw block as it is
+            return unit_data
+        unit = unit_group[unit_name]
+        if id(unit) in inserted_units:
+            # Label now belongs to an inserted unit, so this block has been deleted
+            return []
+        return unit._get_block()
+
+    def _loaded_units(self, unit_group):
+        """Returns a list of (name, unit) pairs for all units in a group which have been read"""
+        if isinstance(unit_group, units.LazyUnitGroup):
+            return unit_group._loaded_items()
+        return list(unit_group.items())
+
+    def _get_unit_definitions(self, lazy=False):
         # Get unit definitions
-        self.sections = {}
-        self.boundaries = {}
-        self.structures = {}
-        self.conduits = {}
-        self.losses = {}
+        if lazy:
+            self.sections = units.LazyUnitGroup(self._label_len)
+            self.boundaries = units.LazyUnitGroup(self._label_len)
+            self.structures = units.LazyUnitGroup(self._label_len)
+            self.conduits = units.LazyUnitGroup(self._label_len)
+            self.losses = units.LazyUnitGroup(self._label_len)
+        else:
+            self.sections = {}
+            self.boundaries = {}
+            self.structures = {}
+            self.conduits = {}
+            self.losses = {}
+            # Section data of all river sections is decoded together, rather than one unit at a time
+            section_store, section_idxs = self._read_section_store()
         for block in self._dat_struct:
             # Check for all supported boundary types
             if block["Type"] in units.SUPPORTED_UNIT_TYPES:
@@ -329,152 +543,520 @@ class DAT(FMFile):
                     raise Exception(
                         f'Duplicate label ({unit_name}) encountered within category: {units.SUPPORTED_UNIT_TYPES[block["Type"]]["group"]}'
                     )
+                elif lazy:
+                    # Only store the raw block, unit is read when first accessed
+                    unit_group._add_block(
+                        unit_name, getattr(units, block["Type"]), unit_data
+                    )
+                elif block["start"] in section_idxs:
+                    unit_group[unit_name] = units.RIVER(
+                        unit_data,
+                        self._label_len,
+                        section_store=section_store,
+                        section_idx=section_idxs[block["start"]],
+                    )
                 else:
-                    unit_group[unit_name] = eval(
-                        f'units.{block["Type"]}({unit_data}, {self._label_len})'
+                    unit_group[unit_name] = getattr(units, block["Type"])(
+                        unit_data, self._label_len
                     )
 
-    def _update_dat_struct(self):
-        """Internal method used to update self._dat_struct which details the overall structure of the dat file as a list of blocks, each of which
-        are a dictionary containing the 'start', 'end' and 'type' of the block.
+        # Network topology is built when first accessed
+        self._network = None
+
+        # Block chain is only built once units are inserted or removed
+        self._chain = None
+        self._ic_changes = {}
+
+        # Section data for all river sections is held in a single columnar store
+        self._section_store = None
+        self._section_properties = {}  # Cached results of section_properties() for each section
+        self._spatial_indexes = {}  # Spatial index of each source of coordinates, with the data it was built from
+        if not lazy:
+            self._update_section_store()
+
+    @property
+    def network(self) -> Network:
+        """Topology graph of the nodes in the DAT, giving the nodes upstream and downstream of any node and the
+        reaches they belong to, for example ``dat.network.downstream('CSRD10')``. See ``floodmodeller_api.network.Network``.
 
+        The network is built from the units the first time it is accessed. Unit renames are applied to it when the
+        DAT is updated or saved, and it is rebuilt if units are removed. If other labels of a unit are changed (e.g.
+        ``ds_label``), use ``DAT.rebuild_network()``.
         """
-        # Generate DAT structure
-        dat_struct = []
-        in_block = False
-        in_general = True
-        in_comment = False
-        comment_n = None  # Used as counter for number of lines in a comment block
-        gisinfo_block = False
-        general_block = {"start": 0, "Type": "GENERAL"}
-        unit_block = {}
-        for idx, line in enumerate(self._raw_data):
-            # Deal with 'general' header
-            if in_general == True:
-                if line == "END GENERAL":
-                    general_block["end"] = idx
-                    dat_struct.append(general_block)
-                    in_general = False
-                    continue
-                else:
-                    continue
+        if self._network is None:
+            self.rebuild_network()
+        return self._network
+
+    def rebuild_network(self) -> Network:
+        """Builds the network topology graph again from the current units, returning the new network"""
+        if self._chain is not None:
+            # Network is built from the raw data, so any inserted or removed units are written first
+            self._update_raw_data()
+            self._update_unit_names()
+        self._network = Network(self)
+        return self._network
 
-            # Deal with comment blocks explicitly as they could contain unit keywords
-            if in_comment and comment_n is None:
-                comment_n = int(line.strip())
-                continue
-            elif in_comment:
-                comment_n -= 1
-                if comment_n == 0:
-                    unit_block["end"] = idx  # add ending index
-                    # append existing bdy block to the dat_struct
-                    dat_struct.append(unit_block)
-                    unit_block = {}  # reset bdy block
-                    in_comment = False
-                    in_block = False
-                    comment_n = None
-                    continue
-                else:
-                    continue  # move onto next line as still in comment block
+    def spatial_index(self, source: str = "gxy") -> SpatialIndex:
+        """Spatial index of the node coordinates of the DAT, which can be used to find the nodes nearest to, within a
+        bounding box of, or within a polygon around given points, for example
+        ``dat.spatial_index().nearest(gauge_x, gauge_y)``. See ``floodmodeller_api.spatial.SpatialIndex``.
 
-            if line == "COMMENT":
-                in_comment = True
-                unit_block, in_block = self._close_struct_block(
-                    dat_struct, "COMMENT", unit_block, in_block, idx
-                )
-                continue
+        The index is built the first time it is accessed, and only built again if the coordinates change. Unit
+        renames are applied to the coordinates when the DAT is updated or saved.
 
-            if line == "GISINFO":
-                gisinfo_block = True
-                unit_block, in_block = self._close_struct_block(
-                    dat_struct, "GISINFO", unit_block, in_block, idx
-                )
+        Args:
+            source (str, optional): Either 'gxy' to use the real world coordinates in the .gxy file, or 'gisinfo'
+                to use the coordinates given in the GISINFO block of the DAT. Defaults to 'gxy'.
 
-            if not gisinfo_block:
-                if line.split(" ")[0] in units.ALL_UNIT_TYPES:
-                    # The " " is needed here in case of empty string
-                    unit_type = line.split()[0]
-                elif " ".join(line.split()[:2]) in units.ALL_UNIT_TYPES:
-                    unit_type = " ".join(line.split()[:2])
-                else:
-                    continue
+        Returns:
+            SpatialIndex: Spatial index of the nodes
+        """
+        if source == "gxy":
+            if self._gxy_data is None:
+                raise ValueError("DAT has no .gxy data to build a spatial index from")
+            data = self._gxy_data
+        elif source == "gisinfo":
+            gisinfo = next(
+                (block for block in self._dat_struct if block["Type"] == "GISINFO"),
+                None,
+            )
+            if gisinfo is None:
+                raise ValueError("DAT has no GISINFO block to build a spatial index from")
+            data = self._raw_data[gisinfo["start"] : gisinfo["end"] + 1]
+        else:
+            raise ValueError(f"Spatial index source must be 'gxy' or 'gisinfo', not '{source}'")
+
+        cached = self._spatial_indexes.get(source)
+        if cached is None or cached[0] != data:
+            if source == "gxy":
+                index = SpatialIndex.from_gxy(data)
+            else:
+                index = SpatialIndex.from_gisinfo(data)
+            cached = (data, index)
+            self._spatial_indexes[source] = cached
+        return cached[1]
+
+    def _read_section_store(self):
+        """Decodes the section data of every RIVER section in the file into a single section store, returning the
+        store and the index of each section in the store keyed by the start of its block"""
+        section_blocks = [
+            block
+            for block in self._dat_struct
+            if block["Type"] == "RIVER"
+            and self._raw_data[block["start"] + 1].split(" ")[0].strip() == "SECTION"
+        ]
+        store = units.SectionStore.from_rows(
+            [
+                self._raw_data[block["start"] + 5 : block["end"] + 1]
+                for block in section_blocks
+            ],
+            [
+                self._raw_data[block["start"] + 2][: self._label_len].strip()
+                for block in section_blocks
+            ],
+        )
+        return store, {block["start"]: idx for idx, block in enumerate(section_blocks)}
 
-                unit_block, in_block = self._close_struct_block(
-                    dat_struct, unit_type, unit_block, in_block, idx
+    @property
+    def cross_sections(self) -> units.SectionStore:
+        """Columnar store containing the cross section data of every RIVER section in the DAT, where the ``data``
+        of each RIVER is a view of its rows in the store. This allows operations across all sections to be done
+        in a single vectorised call, for example ``dat.cross_sections.aggregate('Y', 'min')``.
+
+        Any section data which has been replaced or resized is copied into the store before it is returned. If
+        sections have been added, removed or renamed, the store is rebuilt and the ``data`` of each RIVER becomes
+        a view of the new store. For a lazy DAT, all sections are read the first time the store is accessed.
+        """
+        self._update_section_store()
+        return self._section_store
+
+    def section_properties(self, stages=20) -> pd.DataFrame:
+        """Computes the area, wetted perimeter, top width and conveyance of every RIVER section against stage, for
+        all sections at once. Each pair of consecutive points is treated as a segment using the Mannings n of its
+        first point, and sections are divided into panels at the panel markers. The conveyance of each panel uses
+        the wetted perimeter weighted Mannings n of the panel and is divided by the square root of its RPL (where
+        greater than zero), and the conveyance of a section is the sum over its panels.
+
+        Results are cached for each section, so calling this again only computes the sections whose data or
+        stages have changed since the last call.
+
+        Args:
+            stages (int or list, optional): Either the number of stages to use for each section, evenly spaced
+                between its lowest and highest point, or a list of stages to use for every section. Defaults to 20.
+
+        Returns:
+            pandas.DataFrame: Dataframe with columns 'Area', 'Wetted Perimeter', 'Top Width' and 'Conveyance',
+                indexed by the 'Label' of each section and the 'Stage'
+        """
+        store = self.cross_sections
+        offsets = store.offsets
+        columns = {
+            name: store._arrays[name]
+            for name in ("X", "Y", "Mannings n", "Panel", "RPL")
+        }
+        if np.ndim(stages) == 0:
+            stage_values = None
+            stages_key = f"count {int(stages)}".encode()
+        else:
+            stage_values = np.asarray(stages, dtype=np.float64)
+            stages_key = stage_values.tobytes()
+
+        # Sections are computed again if their data, or the stages, differ from the cached result
+        cache = {}
+        keys = []
+        outdated = []
+        for idx, label in enumerate(store.labels):
+            start, end = offsets[idx], offsets[idx + 1]
+            key = hashlib.blake2b(stages_key, digest_size=16)
+            for arr in columns.values():
+                key.update(arr[start:end].tobytes())
+            key = key.digest()
+            keys.append(key)
+            cached = self._section_properties.get(label)
+            if cached is not None and cached[0] == key:
+                cache[label] = cached
+            else:
+                outdated.append(idx)
+
+        if outdated:
+            outdated = np.array(outdated)
+            counts = offsets[outdated + 1] - offsets[outdated]
+            rows = np.concatenate(
+                [np.arange(offsets[idx], offsets[idx + 1]) for idx in outdated]
+            )
+            sub_columns = {name: arr[rows] for name, arr in columns.items()}
+            sub_offsets = np.zeros(len(outdated) + 1, dtype=np.int64)
+            sub_offsets[1:] = np.cumsum(counts)
+            if stage_values is None:
+                # Stages are spread from the lowest to the highest point of each section
+                y = sub_columns["Y"]
+                starts = np.minimum(sub_offsets[:-1], max(len(y) - 1, 0))
+                low = np.minimum.reduceat(y, starts) if len(y) else np.zeros(0)
+                high = np.maximum.reduceat(y, starts) if len(y) else np.zeros(0)
+                low[counts == 0] = high[counts == 0] = np.nan
+                section_stages = np.linspace(low, high, int(stages), axis=-1)
+            else:
+                section_stages = np.broadcast_to(
+                    stage_values, (len(outdated), len(stage_values))
                 )
+            properties = section_properties(sub_columns, sub_offsets, section_stages)
+            for i, idx in enumerate(outdated):
+                label = store.labels[idx]
+                cache[label] = (keys[idx], section_stages[i], properties[i])
+        self._section_properties = cache
+
+        results = [cache[label] for label in store.labels]
+        nstages = [len(stage) for _, stage, _ in results]
+        index = pd.MultiIndex.from_arrays(
+            [
+                np.repeat(np.array(store.labels, dtype=object), nstages),
+                np.concatenate([stage for _, stage, _ in results] or [np.zeros(0)]),
+            ],
+            names=["Label", "Stage"],
+        )
+        return pd.DataFrame(
+            np.concatenate(
+                [props for _, _, props in results]
+                or [np.zeros((0, len(PROPERTY_COLUMNS)))]
+            ),
+            index=index,
+            columns=PROPERTY_COLUMNS,
+        )
 
-        if len(unit_block) != 0:
-            # Only adds end block if there is a block present (i.e. an empty DAT stays empty)
-            # add ending index for final block
-            unit_block["end"] = len(self._raw_data) - 1
-            dat_struct.append(unit_block)  # add final block
+    def _get_river_sections(self):
+        return [
+            unit
+            for unit in self.sections.values()
+            if isinstance(unit, units.RIVER) and unit.subtype == "SECTION"
+        ]
 
-        self._dat_struct = dat_struct
+    def _check_section_store_columns(self):
+        """If any columns of the section store table have been replaced rather than edited in place, the existing
+        views held by the RIVER units are out of date so they are recreated from the store when next accessed"""
+        store = self._section_store
+        if store is not None and store._columns_replaced():
+            for _, unit in self._loaded_units(self.sections):
+                if getattr(unit, "_section_store", None) is store:
+                    unit._data = None
+
+    def _update_section_store(self):
+        """Updates the section store to match the current section data of each RIVER section"""
+        self._check_section_store_columns()
+        store = self._section_store
+        rivers = self._get_river_sections()
+
+        if store is not None and len(store) == len(rivers):
+            in_store = all(
+                unit._section_store is store
+                and unit._section_idx == idx
+                and store.labels[idx] == unit.name
+                for idx, unit in enumerate(rivers)
+            )
+        else:
+            in_store = False
+
+        if in_store:
+            # Copy any data which is no longer a view into the store
+            for idx, unit in enumerate(rivers):
+                if unit._data is not None and not store._is_view(idx, unit._data):
+                    if not store._set_section(idx, unit._data):
+                        in_store = False  # Number of rows has changed
+                        break
+            if in_store:
+                return
+
+        store = units.SectionStore.from_sections(
+            [unit._get_data_columns() for unit in rivers],
+            [unit.name for unit in rivers],
+        )
+        for idx, unit in enumerate(rivers):
+            unit._section_store = store
+            unit._section_idx = idx
+            unit._data = None
+        self._section_store = store
 
-    def _close_struct_block(self, dat_struct, unit_type, unit_block, in_block, idx):
-        """Helper method to close block in dat struct"""
-        if in_block == True:
-            unit_block["end"] = idx - 1  # add ending index
-            # append existing bdy block to the dat_struct
-            dat_struct.append(unit_block)
-            unit_block = {}  # reset bdy block
-        in_block = True
-        unit_block["Type"] = unit_type  # start new bdy block
-        unit_block["start"] = idx  # add starting index
+    def _update_dat_struct(self):
+        """Internal method used to update self._dat_struct which details the overall structure of the dat file as a list of blocks, each of which
+        are a dictionary containing the 'start', 'end' and 'type' of the block.
 
-        return unit_block, in_block
+        """
+        self._dat_struct = [
+            {"Type": block_type, "start": start, "end": end}
+            for block_type, start, end in iter_blocks(self._raw_data, has_general=True)
+        ]
 
-    def insert_unit(unit, prev_block):
-        """Placeholder function for adding in new units to DAT"""
-        # Get block start/end of prev_block
+    def insert_unit(
+        self,
+        unit: Unit,
+        add_before: Optional[Unit] = None,
+        add_after: Optional[Unit] = None,
+    ) -> None:
+        """Inserts a new unit into the DAT, either before or after an existing unit. If neither is given, the unit is
+        added after the last unit. The unit is added to its unit group straight away, and a row is added to the initial
+        conditions for the unit label (unless it is a boundary or loss unit). The raw data of the DAT is only rebuilt
+        when it is next updated or written, so thousands of units can be inserted or removed quickly.
 
-        # Insert new unit directly into _raw_data
+        Args:
+            unit (Unit): New unit to insert, e.g. a copy of an existing RIVER section with a new label
+            add_before (Unit, optional): Existing unit to insert the new unit before. Defaults to None.
+            add_after (Unit, optional): Existing unit to insert the new unit after. Defaults to None.
 
-        # Add unit into relevant list (sections, structures, boundaries)
+        Raises:
+            TypeError: Raised if the unit is not a supported unit type
+            ValueError: Raised if both add_before and add_after are given
+            Exception: Raised if the unit label already exists in its unit group
+        """
+        if (
+            unit._unit not in units.SUPPORTED_UNIT_TYPES
+            or unit._unit == "INITIAL CONDITIONS"
+        ):
+            raise TypeError(f"Cannot insert {unit} as it is not a supported unit type")
+        if add_before is not None and add_after is not None:
+            raise ValueError("Only one of add_before and add_after can be given")
+
+        unit_group_name = units.SUPPORTED_UNIT_TYPES[unit._unit]["group"]
+        unit_group = getattr(self, unit_group_name)
+        if unit.name in unit_group:
+            raise Exception(
+                f'Error: Cannot insert unit "{unit.name}" because "{unit.name}" already exists in the Network {unit_group_name} group'
+            )
+
+        chain = self._get_chain()
+        if add_before is not None:
+            link = chain.insert_before(self._find_link(add_before)[1], unit=unit)
+        elif add_after is not None:
+            link = chain.insert_after(self._find_link(add_after)[1], unit=unit)
+        else:
+            link = chain.insert_before(
+                chain.index[("other", "INITIAL CONDITIONS")], unit=unit
+            )
+        chain.index[(unit_group_name, unit.name)] = link
+        unit_group[unit.name] = unit
 
-        # Update _dat_struct
+        if unit_group_name not in ["boundaries", "losses"]:
+            self._ic_changes[unit.name] = True
+        self._network = None
 
-        pass
+    def remove_unit(self, unit: Unit) -> None:
+        """Removes a unit from the DAT, along with its row in the initial conditions if no other unit has the same label.
+        The raw data of the DAT is only rebuilt when it is next updated or written.
 
-    def _update_gisinfo_label(
-        self, unit_type, unit_subtype, prev_lbl, new_lbl, ignore_second
-    ):
-        """Update labels in GISINFO block if unit is renamed"""
+        Args:
+            unit (Unit): Unit to remove, e.g. ``dat.sections['S3']``
 
-        start, end = next(
-            (block["start"], block["end"])
-            for block in self._dat_struct
-            if block["Type"] == "GISINFO"
+        Raises:
+            Exception: Raised if the unit is not in the DAT
+        """
+        key, link = self._find_link(unit)
+        unit_group_name, name = key
+        chain = self._chain
+        chain.remove(link)
+        del chain.index[key]
+        del getattr(self, unit_group_name)[name]
+
+        if unit_group_name not in ["boundaries", "losses"] and not any(
+            name in unit_group for unit_group in (self.sections, self.structures, self.conduits)
+        ):
+            self._ic_changes[name] = False
+        self._network = None
+
+    def _get_chain(self) -> BlockChain:
+        """Returns the block chain used to insert and remove units, building it from the current structure if needed"""
+        if self._chain is None:
+            self._update_raw_data()
+            self._update_unit_names()
+            chain = BlockChain(self._dat_struct)
+            # Links are indexed by unit group and label
+            for link in chain.links:
+                block_type = link.block["Type"]
+                if block_type not in units.SUPPORTED_UNIT_TYPES:
+                    continue
+                if block_type == "INITIAL CONDITIONS":
+                    name = block_type
+                elif units.SUPPORTED_UNIT_TYPES[block_type]["has_subtype"]:
+                    name = self._raw_data[link.block["start"] + 2][: self._label_len].strip()
+                else:
+                    name = self._raw_data[link.block["start"] + 1][: self._label_len].strip()
+                chain.index[(units.SUPPORTED_UNIT_TYPES[block_type]["group"], name)] = link
+            self._chain = chain
+        return self._chain
+
+    def _find_link(self, unit):
+        """Returns the key and link of a unit in the block chain"""
+        chain = self._get_chain()
+        if unit._unit not in units.SUPPORTED_UNIT_TYPES:
+            raise Exception(f"{unit} is not in the DAT")
+        unit_group_name = units.SUPPORTED_UNIT_TYPES[unit._unit]["group"]
+        unit_group = getattr(self, unit_group_name)
+        # Unit label may have changed since it was added to the group
+        if unit.name in unit_group and unit_group[unit.name] is unit:
+            name = unit.name
+        else:
+            name = next(
+                (name for name, _unit in self._loaded_units(unit_group) if _unit is unit),
+                None,
+            )
+        if (unit_group_name, name) not in chain.index:
+            raise Exception(f"{unit} is not in the DAT")
+        return (unit_group_name, name), chain.index[(unit_group_name, name)]
+
+    def _apply_ic_changes(self):
+        """Adds and removes the rows of the initial conditions for any units which have been inserted or removed"""
+        if not self._ic_changes:
+            return
+        self.initial_conditions.remove_labels(
+            [label for label, added in self._ic_changes.items() if not added]
+        )
+        self.initial_conditions.add_labels(
+            [label for label, added in self._ic_changes.items() if added]
         )
-        gisinfo_block = self._raw_data[start : end + 1]
+        self.general_parameters["Node Count"] = len(self.initial_conditions.data)
+        self._ic_changes = {}
 
-        prefix = unit_type if unit_subtype is None else f"{unit_type} {unit_subtype}"
+    def _update_gisinfo_labels(self, renamed):
+        """Update labels in GISINFO block for renamed units, in a single pass over the block"""
+        gisinfo = next(
+            (block for block in self._dat_struct if block["Type"] == "GISINFO"), None
+        )
+        if gisinfo is None:
+            return
+        start, end = gisinfo["start"], gisinfo["end"]
+
+        # Lines listing units start with the unit type (and subtype) followed by the label, whereas lines listing
+        # nodes start with the label. Boundaries and losses don't have their own node line.
+        unit_labels = {}
+        node_labels = {}
+        for group_name, prev_lbl, unit in renamed:
+            prefix = unit._unit if unit._subtype is None else f"{unit._unit} {unit._subtype}"
+            unit_labels[f"{prefix} {prev_lbl}"] = f"{prefix} {unit.name}"
+            if group_name not in ["boundaries", "losses"]:
+                node_labels[prev_lbl] = unit.name
 
         new_gisinfo_block = []
-        for line in gisinfo_block:
-            # Replace first label
-            if line.startswith(f"{prefix} {prev_lbl} "):
-                # found matching line (space at the end is important to ignore node
-                # lables with similar starting chars)
-                line = line.replace(f"{prefix} {prev_lbl} ", f"{prefix} {new_lbl} ")
-
-            # Replace second label
-            if not ignore_second:
-                if line.startswith(f"{prev_lbl} "):  # space at the end important again
-                    line = line.replace(f"{prev_lbl} ", f"{new_lbl} ", 1)
-
+        for line in self._raw_data[start : end + 1]:
+            words = line.split(" ", 3)
+            # Unit type can be one or two words, the space after the label is needed to ignore labels with
+            # similar starting chars
+            for n_words in (2, 3):
+                key = " ".join(words[:n_words])
+                if len(words) > n_words and key in unit_labels:
+                    line = unit_labels[key] + line[len(key) :]
+                    break
+            if len(words) > 1 and words[0] in node_labels:
+                line = node_labels[words[0]] + line[len(words[0]) :]
             new_gisinfo_block.append(line)
 
         self._raw_data[start : end + 1] = new_gisinfo_block
 
-    def _update_gxy_label(self, unit_type, unit_subtype, prev_lbl, new_lbl):
-        """Update labels in GXY file if unit is renamed"""
+    def _update_gxy_labels(self, renamed):
+        """Update labels in GXY data for renamed units, in a single pass over the data"""
+        if self._gxy_data is None:
+            return
+
+        gxy_labels = {}
+        for _, prev_lbl, unit in renamed:
+            unit_subtype = "" if unit._subtype is None else unit._subtype
+            gxy_labels[f"{unit._unit}_{unit_subtype}_{prev_lbl}"] = (
+                f"{unit._unit}_{unit_subtype}_{unit.name}"
+            )
+
+        # Each node in the gxy data is given either in square brackets or in a comma separated list of connections
+        self._gxy_data = _GXY_NODE.sub(
+            lambda match: gxy_labels.get(match[0], match[0]), self._gxy_data
+        )
+
+
+_GXY_NODE = re.compile(r"(?<=[\[=,])[^\[\]=,\r\n]+(?=[\],]|$)", re.MULTILINE)
+
+
+def _check_new_labels(unit_group_name, unit_group, renames):
+    """Returns an error for each new label which already exists in the unit group, allowing labels to be swapped"""
+    errors = []
+    new_names = set()
+    for name, new_name in renames.items():
+        if new_name in new_names or (new_name in unit_group and new_name not in renames):
+            errors.append(
+                f'Error: Cannot update label "{name}" to "{new_name}" because "{new_name}" already exists in the Network {unit_group_name} group'
+            )
+        new_names.add(new_name)
+    return errors
+
 
-        if self._gxy_data is not None:
-            if unit_subtype is None:
-                unit_subtype = ""
+def _rename_group_keys(unit_group, renames):
+    """Renames the keys of a unit group in place, keeping the order of the units"""
+    if isinstance(unit_group, units.LazyUnitGroup):
+        unit_group._rename(renames)
+        return
+    renamed_group = {renames.get(name, name): unit for name, unit in unit_group.items()}
+    unit_group.clear()
+    unit_group.update(renamed_group)
 
-            old = f"{unit_type}_{unit_subtype}_{prev_lbl}"
-            new = f"{unit_type}_{unit_subtype}_{new_lbl}"
 
-            self._gxy_data = self._gxy_data.replace(old, new)
+def iter_units(dat_filepath: Union[str, Path], types: Optional[list] = None):
+    """Reads the units of a dat file one at a time without loading the whole file. The file is streamed
+    block by block, so memory use stays the same however large the file is.
+
+    Args:
+        dat_filepath (str): Full filepath to dat file
+        types (list, optional): Unit types to read, e.g. ["RIVER", "QTBDY"]. If not specified, all supported
+            units are read. Defaults to None.
+
+    Yields:
+        Unit class for each unit in the file, in the order they appear
+
+    Raises:
+        ValueError: Raised if types includes a unit type which is not supported
+    """
+    types = _get_unit_types(types)
+    label_len = 12
+    with open(dat_filepath, "r") as dat_file:
+        lines = (line.rstrip("\n") for line in dat_file)
+        for block_type, block in iter_block_lines(lines, has_general=True):
+            if block_type == "GENERAL":
+                label_len = int(units.helpers.split_10_char(block[2])[5])
+            elif block_type not in types:
+                continue
+            elif block_type == "INITIAL CONDITIONS":
+                yield units.IIC(block, n=label_len)
+            else:
+                yield getattr(units, block_type)(block, label_len)
@@ -1,10 +1,37 @@
+import hashlib
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from numbers import Real
+
+import numpy as np
 import pandas as pd
 
+# Numeric tolerance and maximum number of differing dataframe values to report, set with _diff_options()
+_options = ContextVar("_diff_options", default=(0.0, None))
+
+
+@contextmanager
+def _diff_options(tolerance=0.0, max_differences=None):
+    """Sets the options used when comparing items within the context
+
+    Args:
+        tolerance (float, optional): Numeric values which differ by no more than the tolerance are treated as
+            equal. Defaults to 0.0.
+        max_differences (int, optional): Maximum number of differing values to report for each dataframe, or
+            None to report all. Defaults to None.
+    """
+    token = _options.set((tolerance, max_differences))
+    try:
+        yield
+    finally:
+        _options.reset(token)
+
 
 def check_item_with_dataframe_equal(item_a, item_b, name, diff, special_types=()):
     result = True
     try:
-        if type(item_a) == dict:
+        if isinstance(item_a, Mapping):
             result, diff = check_dict_with_dataframe_equal(
                 item_a, item_b, name, diff, special_types
             )
@@ -14,24 +41,11 @@ def check_item_with_dataframe_equal(item_a, item_b, name, diff, special_types=()
             )
         elif isinstance(item_a, (pd.DataFrame, pd.Series)):
             if not item_a.equals(item_b):
-                result = False
-                if isinstance(item_a, pd.Series):
-                    item_a = pd.DataFrame(item_a).reset_index()
-                    item_b = pd.DataFrame(item_b).reset_index()
-
-                df_diff = pd.concat([item_a, item_b]).drop_duplicates(keep=False)
-                rows = df_diff.index.unique().to_list()
-                msg = f"{len(rows)} row(s) not equal:\n"
-                row_diffs = []
-                for row in rows:
-                    for col in df_diff.columns:
-                        if True not in df_diff.loc[row, col].duplicated().values:
-                            vals = df_diff.loc[row, col].values
-                            row_diffs.append(
-                                f"    Row: {row}, Col: '{col}' - left: {vals[0]}, right: {vals[1]}"
-                            )
-                msg += "\n".join(row_diffs)
-                diff.append((name, msg))
+                tolerance, max_differences = _options.get()
+                msg = get_dataframe_diff(item_a, item_b, tolerance, max_differences)
+                if msg is not None:
+                    result = False
+                    diff.append((name, msg))
         elif isinstance(item_a, special_types):
             # item is a Unit or other fmapi class
             result, new_diff = item_a._get_diff(item_b)
@@ -40,7 +54,7 @@ def check_item_with_dataframe_equal(item_a, item_b, name, diff, special_types=()
             ]
             diff.extend(new_diff)
         else:
-            if not item_a == item_b:
+            if not item_a == item_b and not _within_tolerance(item_a, item_b):
                 result = False
                 diff.append((name, f"{item_a} != {item_b}"))
     except Exception as e:
@@ -50,6 +64,101 @@ def check_item_with_dataframe_equal(item_a, item_b, name, diff, special_types=()
     return result, diff
 
 
+def _within_tolerance(item_a, item_b):
+    tolerance = _options.get()[0]
+    return (
+        tolerance > 0
+        and isinstance(item_a, Real)
+        and isinstance(item_b, Real)
+        and not isinstance(item_a, bool)
+        and not isinstance(item_b, bool)
+        and abs(item_a - item_b) <= tolerance
+    )
+
+
+def get_dataframe_diff(df_a, df_b, tolerance=0.0, max_differences=None):
+    """Compares two dataframes (or series) value by value, returning a message describing the differences or
+    None if they are equal. Each column is compared in a single vectorised call, and the index is compared as
+    if it were a column.
+
+    Args:
+        df_a, df_b (pandas.DataFrame or pandas.Series): Items to compare
+        tolerance (float, optional): Numeric values which differ by no more than the tolerance are treated as
+            equal. Defaults to 0.0.
+        max_differences (int, optional): Maximum number of differing values to include in the message, or None
+            to include all. Defaults to None.
+
+    Returns:
+        str: Message listing the differing values, or None if there are no differences
+    """
+    if isinstance(df_a, pd.Series):
+        df_a = df_a.to_frame()
+    if isinstance(df_b, pd.Series):
+        df_b = df_b.to_frame()
+    if list(df_a.columns) != list(df_b.columns):
+        return f"Columns not equal - left: {list(df_a.columns)}, right: {list(df_b.columns)}"
+
+    nrows = min(len(df_a), len(df_b))
+    columns = [("Index", df_a.index.to_numpy(), df_b.index.to_numpy())] + [
+        (col, df_a.iloc[:, idx].to_numpy(), df_b.iloc[:, idx].to_numpy())
+        for idx, col in enumerate(df_a.columns)
+    ]
+    mask = np.column_stack(
+        [
+            _differing_values(values_a[:nrows], values_b[:nrows], tolerance)
+            for _, values_a, values_b in columns
+        ]
+    )
+    differing_rows = int(mask.any(axis=1).sum())
+    if differing_rows == 0 and len(df_a) == len(df_b):
+        return None
+
+    rows, cols = np.nonzero(mask)
+    count = len(rows)
+    if max_differences is not None:
+        rows, cols = rows[:max_differences], cols[:max_differences]
+    row_diffs = []
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        label, values_a, values_b = columns[col]
+        row_diffs.append(
+            f"    Row: {df_a.index[row]}, Col: '{label}' - left: {values_a[row]}, right: {values_b[row]}"
+        )
+    if count > len(row_diffs):
+        row_diffs.append(f"    ...{count - len(row_diffs)} more value(s) not equal")
+    if len(df_a) != len(df_b):
+        longer, side = (df_a, "left") if len(df_a) > len(df_b) else (df_b, "right")
+        differing_rows += len(longer) - nrows
+        row_diffs.append(
+            f"    {len(longer) - nrows} row(s) only in {side}, from Row: {longer.index[nrows]}"
+        )
+    msg = f"{differing_rows} row(s) not equal:\n"
+    return msg + "\n".join(row_diffs)
+
+
+def _differing_values(values_a, values_b, tolerance=0.0):
+    """Returns a boolean mask of the values which differ between two arrays of equal length"""
+    if values_a.dtype.kind in "iuf" and values_b.dtype.kind in "iuf":
+        values_a = values_a.astype(np.float64)
+        values_b = values_b.astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            same = (values_a == values_b) | (np.isnan(values_a) & np.isnan(values_b))
+            if tolerance > 0:
+                same |= np.abs(values_a - values_b) <= tolerance
+        return ~same
+    try:
+        same = np.asarray(values_a == values_b, dtype=bool)
+        if same.shape != values_a.shape:
+            raise ValueError
+    except (ValueError, TypeError):
+        same = np.array(
+            [bool(np.all(a == b)) for a, b in zip(values_a, values_b)], dtype=bool
+        )
+    same |= np.asarray(pd.isna(values_a), dtype=bool) & np.asarray(
+        pd.isna(values_b), dtype=bool
+    )
+    return ~same
+
+
 def check_dict_with_dataframe_equal(dict_a, dict_b, name, diff, special_types):
     """Used to recursively check equivalence where there may be dataframe objects"""
     result = True
@@ -103,3 +212,60 @@ def check_list_with_dataframe_equal(list_a, list_b, name, diff, special_types):
         diff.append((name, "Error encountered when comparing"))
 
     return result, diff
+
+
+def get_item_hash(item):
+    """Returns a stable hash of the contents of an item, which may contain dataframe objects"""
+    hasher = hashlib.blake2b(digest_size=16)
+    _update_hash(hasher, item)
+    return hasher.hexdigest()
+
+
+def _update_hash(hasher, item):
+    if type(item) is dict or isinstance(item, Mapping):
+        hasher.update(b"{")
+        for key, value in item.items():
+            hasher.update(repr(key).encode())
+            _update_hash(hasher, value)
+        hasher.update(b"}")
+    elif isinstance(item, (list, tuple)):
+        hasher.update(b"[")
+        for value in item:
+            _update_hash(hasher, value)
+        hasher.update(b"]")
+    elif isinstance(item, pd.DataFrame):
+        hasher.update(f"DataFrame:{item.index.name!r}".encode())
+        _update_hash_with_array(hasher, item.index.to_numpy())
+        for name, column in item.items():
+            hasher.update(repr(name).encode())
+            _update_hash_with_array(hasher, column.to_numpy())
+    elif isinstance(item, np.ndarray):
+        hasher.update(b"ndarray:")
+        _update_hash_with_array(hasher, item)
+    elif isinstance(item, pd.Series):
+        hasher.update(f"Series:{item.name!r}:{item.index.name!r}".encode())
+        _update_hash_with_array(hasher, item.index.to_numpy())
+        _update_hash_with_array(hasher, item.to_numpy())
+    else:
+        hasher.update(f"{type(item).__name__}:{item!r}".encode())
+
+
+def _update_hash_with_array(hasher, arr):
+    hasher.update(arr.dtype.str.encode())
+    if arr.dtype == object:
+        hasher.update("\x1f".join(map(repr, arr)).encode())
+    else:
+        hasher.update(np.ascontiguousarray(arr).tobytes())
+
+
+def get_block_hash(block):
+    """Returns a stable hash of the lines of a unit block, used as the content hash of the unit"""
+    return hashlib.blake2b("\n".join(block).encode(), digest_size=16).hexdigest()
+
+
+def get_tree_hash(hashes):
+    """Returns a hash combining the hashes of the items in a dictionary, independent of the order of the items"""
+    hasher = hashlib.blake2b(digest_size=16)
+    for key in sorted(hashes):
+        hasher.update(f"{key!r}:{hashes[key]};".encode())
+    return hasher.hexdigest()
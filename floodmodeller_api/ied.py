@@ -22,12 +22,15 @@ import pandas as pd
 
 from . import units
 from ._base import FMFile
+from ._tokenizer import iter_blocks, iter_block_lines, _get_unit_types
 
 
 class IED(FMFile):
     """Reads and write Flood Modeller event data format '.ied'
     Args:
         ied_filepath (str, optional): Full filepath to ied file. If not specified, a new IED class will be created.
+        cache (bool, optional): If True, the parsed IED is stored in the parse cache (see ``floodmodeller_api.cache``) and
+            later reads of the same unchanged file are loaded from the cache. Defaults to False.
 
     Output:
         Initiates 'IED' class object
@@ -40,11 +43,15 @@ class IED(FMFile):
     _filetype: str = "IED"
     _suffix: str = ".ied"
 
-    def __init__(self, ied_filepath: Optional[Union[str, Path]] = None):
+    def __init__(
+        self, ied_filepath: Optional[Union[str, Path]] = None, cache: bool = False
+    ):
         try:
             self._filepath = ied_filepath
             if self._filepath != None:
                 FMFile.__init__(self)
+                if cache and self._load_from_cache():
+                    return
 
                 self._read()
 
@@ -54,6 +61,8 @@ class IED(FMFile):
                 self._raw_data = []
 
             self._get_unit_definitions()
+            if cache and self._filepath != None:
+                self._save_to_cache()
 
         except Exception as e:
             self._handle_exception(e, when="read")
@@ -70,6 +79,7 @@ class IED(FMFile):
         """Returns string representation of the current IED data"""
         try:
             block_shift = 0
+            ied_struct = []
             existing_units = {
                 "boundaries": [],
                 "structures": [],
@@ -79,12 +89,11 @@ class IED(FMFile):
             }
 
             for block in self._ied_struct:
+                start = block["start"] + block_shift
+                end = block["end"] + block_shift
                 # Check for all supported boundary types
                 if block["Type"] in units.SUPPORTED_UNIT_TYPES:
-                    unit_data = self._raw_data[
-                        block["start"] + block_shift : block["end"] + 1 + block_shift
-                    ]
-                    prev_block_len = len(unit_data)
+                    unit_data = self._raw_data[start : end + 1]
                     if units.SUPPORTED_UNIT_TYPES[block["Type"]]["has_subtype"]:
                         unit_name = unit_data[2][:12].strip()
                     else:
@@ -95,8 +104,8 @@ class IED(FMFile):
                         self, units.SUPPORTED_UNIT_TYPES[block["Type"]]["group"]
                     )
                     if unit_name in unit_group:
-                        # block still exists
-                        new_unit_data = unit_group[unit_name]._write()
+                        # block still exists, only written again if the unit has changed
+                        new_unit_data = unit_group[unit_name]._get_block()
                         existing_units[
                             units.SUPPORTED_UNIT_TYPES[block["Type"]]["group"]
                         ].append(unit_name)
@@ -104,12 +113,17 @@ class IED(FMFile):
                         # Bdy block has been deleted
                         new_unit_data = []
 
-                    new_block_len = len(new_unit_data)
-                    self._raw_data[
-                        block["start"] + block_shift : block["end"] + 1 + block_shift
-                    ] = new_unit_data
-                    # adjust block shift for change in number of lines in bdy block
-                    block_shift += new_block_len - prev_block_len
+                    if new_unit_data != unit_data:
+                        self._raw_data[start : end + 1] = new_unit_data
+                        # adjust block shift for change in number of lines in bdy block
+                        block_shift += len(new_unit_data) - len(unit_data)
+                        end = start + len(new_unit_data) - 1
+                        if len(new_unit_data) == 0:
+                            continue  # Block removed from structure
+
+                block["start"] = start
+                block["end"] = end
+                ied_struct.append(block)
 
             # Add any new units
             for group_name, _units in existing_units.items():
@@ -117,10 +131,18 @@ class IED(FMFile):
                     if name not in _units:
                         # Newly added unit
                         # Ensure that the 'name' attribute matches name key in boundaries
-                        self._raw_data.extend(unit._write())
+                        new_unit_data = unit._get_block()
+                        ied_struct.append(
+                            {
+                                "Type": unit._unit,
+                                "start": len(self._raw_data),
+                                "end": len(self._raw_data) + len(new_unit_data) - 1,
+                            }
+                        )
+                        self._raw_data.extend(new_unit_data)
 
             # Update ied_struct
-            self._update_ied_struct()
+            self._ied_struct = ied_struct
 
             # Update unit names
             for unit_group, unit_group_name in [
@@ -140,11 +162,7 @@ class IED(FMFile):
                         unit_group[unit.name] = unit
                         del unit_group[name]
 
-            ied_string = ""
-            for line in self._raw_data:
-                ied_string += line + "\n"
-
-            return ied_string
+            return "".join(f"{line}\n" for line in self._raw_data)
 
         except Exception as e:
             self._handle_exception(e, when="write")
@@ -176,93 +194,33 @@ class IED(FMFile):
                         f'Duplicate label ({unit_name}) encountered within category: {units.SUPPORTED_UNIT_TYPES[block["Type"]]["group"]}'
                     )
                 else:
-                    unit_group[unit_name] = eval(f'units.{block["Type"]}({unit_data})')
+                    unit_group[unit_name] = getattr(units, block["Type"])(unit_data)
+
+    def _unit_groups(self):
+        return [
+            ("boundaries", self.boundaries),
+            ("sections", self.sections),
+            ("structures", self.structures),
+            ("conduits", self.conduits),
+            ("losses", self.losses),
+        ]
+
+    def _validate_units(self):
+        for _, unit_group in self._unit_groups():
+            for unit in unit_group.values():
+                unit._validate()
+        return []
 
     def _update_ied_struct(self):
         # Generate IED structure
-        ied_struct = []
-        in_block = False
-        bdy_block = {}
-        comment_n = None
-        in_comment = False
-
-        for idx, line in enumerate(self._raw_data):
-            # Deal with comment blocks explicitly as they could contain unit keywords
-            if in_comment and comment_n is None:
-                comment_n = int(line.strip())
-                continue
-            elif in_comment:
-                comment_n -= 1
-                if comment_n == 0:
-                    bdy_block["end"] = idx  # add ending index
-                    # append existing bdy block to the ied_struct
-                    ied_struct.append(bdy_block)
-                    bdy_block = {}  # reset bdy block
-                    in_comment = False
-                    in_block = False
-                    comment_n = None
-                    continue
-                else:
-                    continue  # move onto next line as still in comment block
-
-            if line == "COMMENT":
-                in_comment = True
-                if in_block == True:
-                    bdy_block["end"] = idx - 1  # add ending index
-                    # append existing bdy block to the ied_struct
-                    ied_struct.append(bdy_block)
-                    bdy_block = {}  # reset bdy block
-                # start new block for COMMENT
-                bdy_block["Type"] = line.split(" ")[0]
-                bdy_block["start"] = idx  # add starting index
-                continue
-
-            if len(line.split(" ")[0]) > 1:
-                if line.split(" ")[0] in units.ALL_UNIT_TYPES:
-                    if in_block == True:
-                        bdy_block["end"] = idx - 1  # add ending index
-                        # append existing bdy block to the ief_struct
-                        ied_struct.append(bdy_block)
-                        bdy_block = {}  # reset bdy block
-                    in_block = True
-                    bdy_block["Type"] = line.split(" ")[0]  # start new bdy block
-                    bdy_block["start"] = idx  # add starting index
-
-                elif " ".join(line.split(" ")[:2]) in units.ALL_UNIT_TYPES:
-                    if in_block == True:
-                        bdy_block["end"] = idx - 1  # add ending index
-                        # append existing bdy block to the ief_struct
-                        ied_struct.append(bdy_block)
-                        bdy_block = {}  # reset bdy block
-                    in_block = True
-                    bdy_block["Type"] = " ".join(
-                        line.split(" ")[:2]
-                    )  # start new bdy block
-                    bdy_block["start"] = idx  # add starting index
-                else:
-                    continue
-            elif line in units.ALL_UNIT_TYPES:
-                if in_block == True:
-                    bdy_block["end"] = idx - 1  # add ending index
-                    # append existing bdy block to the ief_struct
-                    ied_struct.append(bdy_block)
-                    bdy_block = {}  # reset bdy block
-                in_block = True
-                bdy_block["Type"] = line  # start new bdy block
-                bdy_block["start"] = idx  # add starting index
-            else:
-                continue
-
-        if len(bdy_block) != 0:
-            # Only adds end block if there is a bdy block present (i.e. an empty IED stays empty)
-            # add ending index for final block
-            bdy_block["end"] = len(self._raw_data) - 1
-            ied_struct.append(bdy_block)  # add final block
-
-        self._ied_struct = ied_struct
-        pass
-
-    def diff(self, other: "IED", force_print: bool = False) -> None:
+        self._ied_struct = [
+            {"Type": block_type, "start": start, "end": end}
+            for block_type, start, end in iter_blocks(self._raw_data)
+        ]
+
+    def diff(
+        self, other: "IED", force_print: bool = False, tolerance: float = 0.0
+    ) -> None:
         """Compares the IED class against another IED class to check whether they are
         equivalent, or if not, what the differences are. Two instances of an IED class are
         deemed equivalent if all of their attributes are equal except for the filepath and
@@ -278,8 +236,22 @@ class IED(FMFile):
             other (floodmodeller_api.IED): Other instance of an IED class
             force_print (bool): Forces the API to print every difference found, rather than
                 just the first 25 differences. Defaults to False.
+            tolerance (float): Numeric values which differ by no more than the tolerance are treated as equal,
+                e.g. 0.001 to ignore differences from values being rounded to 3 decimal places. Defaults to 0.0.
         """
-        self._diff(other, force_print=force_print)
+        self._diff(other, force_print=force_print, tolerance=tolerance)
+
+    def hash_tree(self) -> dict:
+        """Returns the content hashes of the IED as a tree. Each unit has a stable hash of its block as it would
+        be written, each unit group has a hash combining the hashes of its units, and the IED has a single hash
+        combining the hashes of every group and of the other attributes compared by ``IED.diff()``. Two IEDs
+        with the same hash are equivalent, and units with the same hash are skipped when comparing IEDs.
+
+        Returns:
+            dict: Dictionary containing the 'hash' of the IED, the hash of each of its other 'attributes', and for
+                each unit group in 'groups', the 'hash' of the group and the hash of each of its 'units'
+        """
+        return self._get_hash_tree()
 
     def update(self) -> None:
         """Updates the existing IED based on any altered attributes"""
@@ -292,3 +264,26 @@ class IED(FMFile):
         rather than the original source IED used to construct the class"""
 
         self._save(filepath)
+
+
+def iter_units(ied_filepath: Union[str, Path], types: Optional[list] = None):
+    """Reads the units of an ied file one at a time without loading the whole file. The file is streamed
+    block by block, so memory use stays the same however large the file is.
+
+    Args:
+        ied_filepath (str): Full filepath to ied file
+        types (list, optional): Unit types to read, e.g. ["QTBDY"]. If not specified, all supported units
+            are read. Defaults to None.
+
+    Yields:
+        Unit class for each unit in the file, in the order they appear
+
+    Raises:
+        ValueError: Raised if types includes a unit type which is not supported
+    """
+    types = _get_unit_types(types)
+    with open(ied_filepath, "r") as ied_file:
+        lines = (line.rstrip("\n") for line in ied_file)
+        for block_type, block in iter_block_lines(lines):
+            if block_type in types:
+                yield getattr(units, block_type)(block)
@@ -304,7 +304,9 @@ class IEF(FMFile):
         if not existing_attr_deleted:
             super().__delattr__(name)
 
-    def diff(self, other: "IEF", force_print: bool = False) -> None:
+    def diff(
+        self, other: "IEF", force_print: bool = False, tolerance: float = 0.0
+    ) -> None:
         """Compares the IEF class against another IEF class to check whether they are
         equivalent, or if not, what the differences are. Two instances of an IEF class are
         deemed equivalent if all of their attributes are equal except for the filepath and
@@ -317,8 +319,10 @@ class IEF(FMFile):
             other (floodmodeller_api.IEF): Other instance of an IEF class
             force_print (bool): Forces the API to print every difference found, rather than
                 just the first 25 differences. Defaults to False.
+            tolerance (float): Numeric values which differ by no more than the tolerance are treated as equal,
+                e.g. 0.001 to ignore differences from values being rounded to 3 decimal places. Defaults to 0.0.
         """
-        self._diff(other, force_print=force_print)
+        self._diff(other, force_print=force_print, tolerance=tolerance)
 
     def update(self) -> None:
         """Updates the existing IEF based on any altered attributes"""
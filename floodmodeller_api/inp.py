@@ -28,6 +28,8 @@ class INP(FMFile):
 
     Args:
         inp_filepath (str, optional): Full filepath to inp file. If not specified, a new INP class will be created. Defaults to None.
+        cache (bool, optional): If True, the parsed INP is stored in the parse cache (see ``floodmodeller_api.cache``) and
+            later reads of the same unchanged file are loaded from the cache. Defaults to False.
 
     Output:
         Initiates 'INP' class object
@@ -40,18 +42,24 @@ class INP(FMFile):
     _filetype: str = "INP"
     _suffix: str = ".inp"
 
-    def __init__(self, inp_filepath: Optional[Union[str, Path]] = None):
+    def __init__(
+        self, inp_filepath: Optional[Union[str, Path]] = None, cache: bool = False
+    ):
 
         try:
             self._filepath = inp_filepath
             if self._filepath != None:
                 FMFile.__init__(self)
+                if cache and self._load_from_cache():
+                    return
                 self._read()
 
             else:
                 self._create_from_blank()
 
             self._get_section_definitions()
+            if cache and self._filepath != None:
+                self._save_to_cache()
         except Exception as e:
             self._handle_exception(e, when="read")
 
@@ -207,6 +215,17 @@ class INP(FMFile):
 
                 # No action if subsection not supported. Leave block as raw data
 
+    def _validate_units(self):
+        _validate_unit(self, urban=True)
+        for subsection_info in subsections.SUPPORTED_SUBSECTIONS.values():
+            if subsection_info["group"] == "units" and hasattr(
+                self, subsection_info["attribute"]
+            ):
+                subsection = getattr(self, subsection_info["attribute"])
+                for unit in getattr(subsection, subsection._attribute).values():
+                    unit._validate()
+        return []
+
     def _update_inp_struct(self):
         """Internal method used to update self._inp_struct which details the overall structure of the inp file as a list of blocks, each of which
         are a dictionary containing the 'start', 'end' and 'type' of the block.
@@ -242,7 +261,9 @@ class INP(FMFile):
 
         self._inp_struct = inp_struct
 
-    def diff(self, other: "INP", force_print: bool = False) -> None:
+    def diff(
+        self, other: "INP", force_print: bool = False, tolerance: float = 0.0
+    ) -> None:
         """Compares the INP class against another INP class to check whether they are
         equivalent, or if not, what the differences are. Two instances of an INP class are
         deemed equivalent if all of their attributes are equal except for the filepath and
@@ -258,8 +279,10 @@ class INP(FMFile):
             other (floodmodeller_api.INP): Other instance of an INP class
             force_print (bool): Forces the API to print every difference found, rather than
                 just the first 25 differences. Defaults to False.
+            tolerance (float): Numeric values which differ by no more than the tolerance are treated as equal,
+                e.g. 0.001 to ignore differences from values being rounded to 3 decimal places. Defaults to 0.0.
         """
-        self._diff(other, force_print=force_print)
+        self._diff(other, force_print=force_print, tolerance=tolerance)
 
     def update(self) -> None:
         """Updates the existing INP based on any altered attributes"""
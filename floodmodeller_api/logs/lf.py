@@ -35,6 +35,8 @@ class LF(FMFile):
         lf1_filepath (str): Full filepath to model log file
         data_to_extract (dict): Dictionary defining each line type to parse
         steady (bool): True if for a steady-state simulation
+        cache (bool): If True, the parsed log file is stored in the parse cache and later reads of the same unchanged file are
+            loaded from the cache
 
     Output:
         Initiates 'LF' class object
@@ -45,10 +47,13 @@ class LF(FMFile):
         lf_filepath: Optional[Union[str, Path]],
         data_to_extract: dict,
         steady: bool = False,
+        cache: bool = False,
     ):
         try:
             self._filepath = lf_filepath
             FMFile.__init__(self)
+            if cache and self._load_from_cache(steady=steady):
+                return
 
             self._data_to_extract = data_to_extract
             self._init_counters()
@@ -56,6 +61,8 @@ class LF(FMFile):
             self._state = state_factory(steady, self._extracted_data)
 
             self._read()
+            if cache:
+                self._save_to_cache(steady=steady)
 
         except Exception as e:
             self._handle_exception(e, when="read")
@@ -247,6 +254,8 @@ class LF1(LF):
     Args:
         lf1_filepath (str): Full filepath to model lf1 file
         steady (bool): True for steady-state simulations
+        cache (bool): If True, the parsed lf1 is stored in the parse cache and later reads of the same unchanged file are
+            loaded from the cache
 
     **Attributes (unsteady)**
 
@@ -274,14 +283,19 @@ class LF1(LF):
     _filetype: str = "LF1"
     _suffix: str = ".lf1"
 
-    def __init__(self, lf_filepath: Optional[Union[str, Path]], steady: bool = False):
+    def __init__(
+        self,
+        lf_filepath: Optional[Union[str, Path]],
+        steady: bool = False,
+        cache: bool = False,
+    ):
 
         if steady == False:
             data_to_extract = lf1_unsteady_data_to_extract
         else:
             data_to_extract = lf1_steady_data_to_extract
 
-        super().__init__(lf_filepath, data_to_extract, steady)
+        super().__init__(lf_filepath, data_to_extract, steady, cache)
 
 
 class LF2(LF):
@@ -289,6 +303,8 @@ class LF2(LF):
 
     Args:
         lf2_filepath (str): Full filepath to model lf2 file
+        cache (bool): If True, the parsed lf2 is stored in the parse cache and later reads of the same unchanged file are
+            loaded from the cache
 
     **Attributes**
 
@@ -313,11 +329,11 @@ class LF2(LF):
     _filetype: str = "LF2"
     _suffix: str = ".lf2"
 
-    def __init__(self, lf_filepath: Optional[Union[str, Path]]):
+    def __init__(self, lf_filepath: Optional[Union[str, Path]], cache: bool = False):
 
         data_to_extract = lf2_data_to_extract
 
-        super().__init__(lf_filepath, data_to_extract, steady=False)
+        super().__init__(lf_filepath, data_to_extract, steady=False, cache=cache)
 
 
 def lf_factory(filepath: str, suffix: str, steady: bool) -> LF:
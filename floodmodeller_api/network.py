@@ -0,0 +1,410 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the network topology graph built from the units of a DAT file """
+
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from . import units
+from .units.helpers import split_10_char, split_n_char, _to_float
+
+# Types of link between nodes, the index is used as the link code
+LINK_TYPES = ("reach", "structure", "junction", "spill", "lateral", "remote")
+REACH, STRUCTURE, JUNCTION, SPILL, LATERAL, REMOTE = range(len(LINK_TYPES))
+
+# Link types followed when tracing upstream or downstream, remote labels are only used for control
+TRACE_LINKS = ("reach", "structure", "junction", "spill", "lateral")
+
+# Link type of each label on the label line of supported units, after the unit name
+_UNIT_LABELS = {
+    "RIVER": (SPILL, SPILL, LATERAL, LATERAL, LATERAL, LATERAL),
+    "BRIDGE": (STRUCTURE, REMOTE, REMOTE),
+    "SLUICE": (STRUCTURE, REMOTE),
+    "ORIFICE": (STRUCTURE,),
+    "SPILL": (STRUCTURE,),
+    "RNWEIR": (STRUCTURE,),
+    "CULVERT": (STRUCTURE, REMOTE, REMOTE),
+    "BLOCKAGE": (STRUCTURE, REMOTE, REMOTE, REMOTE),
+}
+_LABEL_ATTRIBUTES = {
+    "RIVER": ("spill1", "spill2", "lat1", "lat2", "lat3", "lat4"),
+    "BRIDGE": ("ds_label", "us_remote_label", "ds_remote_label"),
+    "SLUICE": ("ds_label", "remote_label"),
+    "ORIFICE": ("ds_label",),
+    "SPILL": ("ds_label",),
+    "RNWEIR": ("ds_label",),
+    "CULVERT": ("ds_label", "us_remote_label", "ds_remote_label"),
+    "BLOCKAGE": (
+        "ds_label",
+        "us_reference_label",
+        "ds_reference_label",
+        "constriction_label",
+    ),
+}
+
+# Label line and link type of unsupported units which connect nodes. Labels of a structure link the first label
+# to the second, whereas all labels of a junction are linked together
+_UNSUPPORTED_LABELS = {
+    "JUNCTION": (2, JUNCTION),
+    "RESERVOIR": (1, JUNCTION),
+    "MANHOLE": (1, JUNCTION),
+    "BERNOULLI": (1, STRUCTURE),
+    "WEIR": (1, STRUCTURE),
+    "LOSS": (1, STRUCTURE),
+    "QH CONTROL": (1, STRUCTURE),
+    "OCPUMP": (1, STRUCTURE),
+    "INVERTED SYPHON": (2, STRUCTURE),
+    "FLOODPLAIN": (2, STRUCTURE),
+    "INTERPOLATE": (1, None),
+    "REPLICATE": (1, None),
+}
+
+# Units which form a reach, each is linked to the following unit if it has a distance to the next unit
+_REACH_UNITS = ("RIVER", "CONDUIT", "INTERPOLATE", "REPLICATE")
+
+
+class Network:
+    """Topology graph of the nodes in a DAT file, built from the order of units and the labels that link them.
+    Each node is a unit label, and nodes are linked by:
+
+    - **reach**: A river section, conduit, interpolate or replicate unit to the unit that follows it in the file
+    - **structure**: The upstream label of a structure to its downstream label
+    - **junction**: Every label of a junction to every other label (in both directions)
+    - **spill**: A river section to each of its spill labels (in both directions)
+    - **lateral**: Each lateral inflow label of a river section to the section
+    - **remote**: A remote or reference label of a structure to the structure
+
+    Links are held as compact integer arrays sorted by node, so the neighbours of a node are found in constant
+    time. The network is normally accessed through ``DAT.network``.
+
+    Args:
+        dat (DAT): DAT class object to build the network from
+    """
+
+    def __init__(self, dat):
+        self._label_len = dat._label_len
+        self._labels = []
+        self._index = {}
+        self._refs = []
+        links = []
+
+        blocks = [
+            block
+            for block in dat._dat_struct
+            if block["Type"] not in ("GENERAL", "GISINFO", "COMMENT", "INITIAL CONDITIONS")
+        ]
+        for idx, block in enumerate(blocks):
+            unit_labels, unit_links, distance = self._read_block(dat, block)
+            if not unit_labels:
+                continue
+            nodes = [self._add_node(label) for label in unit_labels]
+            links.extend(
+                (src, dst, link) for src, dst, link in unit_links(nodes) if src != dst
+            )
+
+            # Units within a reach are linked to the next unit in the file
+            if block["Type"] in _REACH_UNITS and distance and idx + 1 < len(blocks):
+                next_block = blocks[idx + 1]
+                if next_block["Type"] in _REACH_UNITS:
+                    next_labels, _, _ = self._read_block(dat, next_block)
+                    if next_labels:
+                        next_node = self._add_node(next_labels[0], count=False)
+                        if next_node != nodes[0]:
+                            links.append((nodes[0], next_node, REACH))
+
+        self._set_links(np.array(links, dtype=np.int64).reshape(-1, 3))
+
+    def __repr__(self):
+        return f"<floodmodeller_api Network: {len(self._labels)} nodes, {len(self._src)} links>"
+
+    def __contains__(self, label):
+        return label in self._index
+
+    def __len__(self):
+        return len(self._labels)
+
+    @property
+    def labels(self) -> list:
+        """Label of each node in the network, in the order the nodes were found"""
+        return list(self._labels)
+
+    @property
+    def links(self) -> np.ndarray:
+        """Array of (source node, target node, link type) for every link, where nodes are given by their index in
+        ``labels`` and link types by their index in ``LINK_TYPES``"""
+        return np.stack([self._src, self._dst, self._link], axis=1)
+
+    def index(self, label: str) -> int:
+        """Returns the index of a node in the network
+
+        Raises:
+            KeyError: Raised if there is no node with the label
+        """
+        try:
+            return self._index[label]
+        except KeyError:
+            raise KeyError(f"No node labelled '{label}' in the network") from None
+
+    def neighbours(
+        self,
+        label: str,
+        direction: str = "downstream",
+        links: Optional[tuple] = None,
+    ) -> list:
+        """Returns the labels of the nodes directly linked to a node
+
+        Args:
+            label (str): Node label
+            direction (str, optional): 'downstream' for nodes linked from the node, or 'upstream' for nodes linked to
+                it. Defaults to 'downstream'.
+            links (tuple, optional): Link types to include, e.g. ('reach', 'structure'). Defaults to all link types.
+
+        Returns:
+            list: Labels of the linked nodes
+        """
+        offsets, targets, link_types = self._adjacency(direction)
+        node = self.index(label)
+        start, end = offsets[node], offsets[node + 1]
+        nodes = targets[start:end]
+        if links is not None:
+            nodes = nodes[np.isin(link_types[start:end], self._link_codes(links))]
+        return [self._labels[idx] for idx in nodes.tolist()]
+
+    def downstream(self, label: str, links: tuple = TRACE_LINKS) -> list:
+        """Returns the labels of all nodes downstream of a node, nearest first
+
+        Args:
+            label (str): Node label
+            links (tuple, optional): Link types to follow. Defaults to all link types except remote labels.
+
+        Returns:
+            list: Labels of every node which can be reached by following links downstream
+        """
+        return self._trace(label, "downstream", links)
+
+    def upstream(self, label: str, links: tuple = TRACE_LINKS) -> list:
+        """Returns the labels of all nodes upstream of a node, nearest first
+
+        Args:
+            label (str): Node label
+            links (tuple, optional): Link types to follow. Defaults to all link types except remote labels.
+
+        Returns:
+            list: Labels of every node which can be reached by following links upstream
+        """
+        return self._trace(label, "upstream", links)
+
+    def reach(self, label: str) -> list:
+        """Returns the labels of the nodes in the reach containing a node, from upstream to downstream. A reach is
+        a run of units linked by their order in the file, e.g. consecutive river sections.
+
+        Args:
+            label (str): Node label
+
+        Returns:
+            list: Labels of the nodes in the reach
+        """
+        node = self.index(label)
+        up_offsets, up_targets, up_links = self._adjacency("upstream")
+        down_offsets, down_targets, down_links = self._adjacency("downstream")
+
+        def _next_in_reach(offsets, targets, link_types, node):
+            start, end = offsets[node], offsets[node + 1]
+            in_reach = targets[start:end][link_types[start:end] == REACH]
+            return int(in_reach[0]) if len(in_reach) else None
+
+        first, seen = node, {node}
+        while True:
+            prev_node = _next_in_reach(up_offsets, up_targets, up_links, first)
+            if prev_node is None or prev_node in seen:
+                break
+            first = prev_node
+            seen.add(first)
+
+        nodes, seen = [first], {first}
+        while True:
+            next_node = _next_in_reach(down_offsets, down_targets, down_links, nodes[-1])
+            if next_node is None or next_node in seen:
+                break
+            nodes.append(next_node)
+            seen.add(next_node)
+        return [self._labels[idx] for idx in nodes]
+
+    def reaches(self) -> list:
+        """Returns every reach in the network, each as a list of labels from upstream to downstream"""
+        is_reach = self._link == REACH
+        has_upstream = np.zeros(len(self._labels), dtype=bool)
+        has_upstream[self._dst[is_reach]] = True
+        starts = np.unique(self._src[is_reach][~has_upstream[self._src[is_reach]]])
+        return [self.reach(self._labels[node]) for node in starts.tolist()]
+
+    def rename(self, old: str, new: str) -> bool:
+        """Renames a node in place, keeping all of its links. This is only possible if the label is used by a
+        single unit in the file, otherwise units which still use the old label would lose their links.
+
+        Args:
+            old (str): Current node label
+            new (str): New node label
+
+        Returns:
+            bool: True if the node was renamed, or False if the network needs to be rebuilt
+        """
+        if old not in self._index:
+            return new in self._index
+        node = self._index[old]
+        if new in self._index or self._refs[node] > 1:
+            return False
+        del self._index[old]
+        self._index[new] = node
+        self._labels[node] = new
+        return True
+
+    def _add_node(self, label, count=True):
+        node = self._index.get(label)
+        if node is None:
+            node = len(self._labels)
+            self._index[label] = node
+            self._labels.append(label)
+            self._refs.append(0)
+        if count:
+            self._refs[node] += 1
+        return node
+
+    def _read_block(self, dat, block):
+        """Returns the labels of a block, a function giving its links and its distance to the next unit"""
+        unit_type = block["Type"]
+        raw = dat._raw_data
+        start = block["start"]
+
+        if unit_type in units.SUPPORTED_UNIT_TYPES:
+            has_subtype = units.SUPPORTED_UNIT_TYPES[unit_type]["has_subtype"]
+            label_line = raw[start + 2] if has_subtype else raw[start + 1]
+            name = label_line[: self._label_len].strip()
+            unit = self._get_loaded_unit(dat, unit_type, name)
+            link_types = _UNIT_LABELS.get(unit_type, ())
+            if unit is not None:
+                name = unit.name
+                other_labels = [
+                    getattr(unit, attribute, "")
+                    for attribute in _LABEL_ATTRIBUTES.get(unit_type, ())
+                ]
+                distance = getattr(unit, "dist_to_next", 0.0)
+            else:
+                other_labels = split_n_char(
+                    f"{label_line:<{(1 + len(link_types)) * self._label_len}}",
+                    self._label_len,
+                )[1 : 1 + len(link_types)]
+                distance = (
+                    _to_float(split_10_char(raw[start + 3])[0])
+                    if unit_type in ("RIVER", "CONDUIT") and start + 3 <= block["end"]
+                    else 0.0
+                )
+            if unit_type == "RIVER" and raw[start + 1].split(" ")[0].strip() != "SECTION":
+                distance = 0.0  # Only river sections are linked in a reach
+            labels = [name] + other_labels
+
+            def _links(nodes):
+                for node, label, link in zip(nodes[1:], other_labels, link_types):
+                    if label == "":
+                        continue
+                    if link in (STRUCTURE, SPILL):
+                        yield nodes[0], node, link
+                    if link in (SPILL, LATERAL, REMOTE):
+                        yield node, nodes[0], link
+
+            return [label for label in labels if label != ""], _links, distance
+
+        if unit_type in _UNSUPPORTED_LABELS:
+            line, link = _UNSUPPORTED_LABELS[unit_type]
+            if start + line > block["end"]:
+                return [], None, 0.0
+            labels = [label for label in split_n_char(raw[start + line], self._label_len) if label != ""]
+            distance = (
+                _to_float(split_10_char(raw[start + 2])[0])
+                if unit_type in _REACH_UNITS and start + 2 <= block["end"]
+                else 0.0
+            )
+
+            def _links(nodes):
+                if link == STRUCTURE and len(nodes) > 1:
+                    yield nodes[0], nodes[1], STRUCTURE
+                elif link == JUNCTION:
+                    for src in nodes:
+                        for dst in nodes:
+                            yield src, dst, JUNCTION
+
+            return labels, _links, distance
+
+        return [], None, 0.0
+
+    @staticmethod
+    def _get_loaded_unit(dat, unit_type, name):
+        group = getattr(dat, units.SUPPORTED_UNIT_TYPES[unit_type]["group"], None)
+        if group is None or name not in group:
+            return None
+        if isinstance(group, units.LazyUnitGroup) and not group._is_loaded(name):
+            return None
+        return group[name]
+
+    def _set_links(self, links):
+        """Stores the links as arrays sorted by source node and by target node, with offsets so that the
+        links of each node are a single slice"""
+        links = np.unique(links, axis=0) if len(links) else links
+        self._src = links[:, 0].astype(np.int32)
+        self._dst = links[:, 1].astype(np.int32)
+        self._link = links[:, 2].astype(np.int8)
+        n_nodes = len(self._labels)
+        self._csr = {}
+        for direction, from_nodes, to_nodes in (
+            ("downstream", self._src, self._dst),
+            ("upstream", self._dst, self._src),
+        ):
+            order = np.argsort(from_nodes, kind="stable")
+            offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum(np.bincount(from_nodes, minlength=n_nodes))
+            self._csr[direction] = (offsets, to_nodes[order], self._link[order])
+
+    def _adjacency(self, direction):
+        if direction not in self._csr:
+            raise ValueError("Direction must be 'downstream' or 'upstream'")
+        return self._csr[direction]
+
+    @staticmethod
+    def _link_codes(links):
+        unknown = set(links).difference(LINK_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown link type(s): {sorted(unknown)}")
+        return [LINK_TYPES.index(link) for link in links]
+
+    def _trace(self, label, direction, links):
+        offsets, targets, link_types = self._adjacency(direction)
+        codes = self._link_codes(links)
+        start_node = self.index(label)
+        seen = {start_node}
+        order = []
+        queue = deque([start_node])
+        while queue:
+            node = queue.popleft()
+            start, end = offsets[node], offsets[node + 1]
+            for next_node, link in zip(targets[start:end].tolist(), link_types[start:end].tolist()):
+                if link in codes and next_node not in seen:
+                    seen.add(next_node)
+                    order.append(next_node)
+                    queue.append(next_node)
+        return [self._labels[idx] for idx in order]
@@ -0,0 +1,286 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the spatial index of node coordinates given in the .gxy file or GISINFO block of a DAT file """
+
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Node in the gxy data, given as a [TYPE_SUBTYPE_LABEL] section followed by its X and Y coordinates
+_GXY_POINT = re.compile(
+    r"^\[([^\]\r\n]+)\][ \t]*\r?\n[ \t]*X=([^\r\n]*)\r?\n[ \t]*Y=([^\r\n]*)$",
+    re.MULTILINE,
+)
+
+
+class SpatialIndex:
+    """Grid based spatial index of node coordinates, used to find the model nodes nearest to, or within an area
+    around, points such as gauge locations or survey points. The nodes are sorted into the cells of a regular grid
+    covering all nodes, so each query only checks the nodes in the grid cells around it.
+
+    The index is normally accessed through ``DAT.spatial_index()``, where each node is one entry of the .gxy file or
+    GISINFO block, with the 'Type' of the unit (e.g. 'RIVER SECTION', which is empty for node entries of GISINFO)
+    and its 'Label'. A label can appear more than once, e.g. for a boundary and the river section it connects to.
+
+    Args:
+        labels (list): Label of each node
+        x, y (list): Coordinates of each node
+        types (list, optional): Unit type of each node. Defaults to None.
+        cell_size (float, optional): Width of each grid cell. Defaults to None, in which case the cell size is
+            chosen to give about one node per cell.
+    """
+
+    def __init__(
+        self,
+        labels: list,
+        x: list,
+        y: list,
+        types: Optional[list] = None,
+        cell_size: Optional[float] = None,
+    ):
+        self._labels = np.array(labels, dtype=object)
+        self._types = np.array(
+            [""] * len(self._labels) if types is None else types, dtype=object
+        )
+        self._x = np.asarray(x, dtype=np.float64)
+        self._y = np.asarray(y, dtype=np.float64)
+        if not len(self._labels) == len(self._types) == len(self._x) == len(self._y):
+            raise ValueError("Labels, types and coordinates must all be the same length")
+
+        if len(self._x) == 0:
+            self._origin = (0.0, 0.0)
+            self._cell_size = 1.0 if cell_size is None else float(cell_size)
+            self._shape = (1, 1)
+            self._order = np.zeros(0, dtype=np.int64)
+            self._cell_starts = np.zeros(2, dtype=np.int64)
+            return
+
+        self._origin = (self._x.min(), self._y.min())
+        extent = max(self._x.max() - self._origin[0], self._y.max() - self._origin[1])
+        if cell_size is None:
+            cell_size = extent / np.sqrt(len(self._x))
+        self._cell_size = float(cell_size) if cell_size > 0 else 1.0
+        cols, rows = self._cells(self._x, self._y)
+        self._shape = (int(rows.max()) + 1, int(cols.max()) + 1)
+
+        # Nodes are ordered by cell, so the nodes of a run of cells along a grid row are a single slice
+        cells = rows * self._shape[1] + cols
+        self._order = np.argsort(cells, kind="stable")
+        self._cell_starts = np.searchsorted(
+            cells[self._order], np.arange(self._shape[0] * self._shape[1] + 1)
+        )
+
+    @classmethod
+    def from_gxy(cls, gxy_data: str, cell_size: Optional[float] = None):
+        """Creates a spatial index of the nodes in the contents of a .gxy file
+
+        Args:
+            gxy_data (str): Contents of the .gxy file
+            cell_size (float, optional): Width of each grid cell. Defaults to None.
+
+        Returns:
+            SpatialIndex: Spatial index of the nodes
+        """
+        labels, types, x, y = [], [], [], []
+        for key, x_coord, y_coord in _GXY_POINT.findall(gxy_data):
+            parts = key.split("_", 2)
+            if len(parts) < 3:
+                continue
+            unit_type, subtype, label = parts
+            labels.append(label)
+            types.append(f"{unit_type} {subtype}" if subtype else unit_type)
+            x.append(x_coord)
+            y.append(y_coord)
+        return cls(*_valid_nodes(labels, x, y, types), cell_size=cell_size)
+
+    @classmethod
+    def from_gisinfo(cls, gisinfo_block: list, cell_size: Optional[float] = None):
+        """Creates a spatial index of the units and nodes listed in a GISINFO block
+
+        Args:
+            gisinfo_block (list): Lines of the GISINFO block, starting with 'GISINFO'
+            cell_size (float, optional): Width of each grid cell. Defaults to None.
+
+        Returns:
+            SpatialIndex: Spatial index of the units and nodes
+        """
+        labels, types, x, y = [], [], [], []
+        for line in gisinfo_block[1:]:
+            # Lines give the unit type (if any) and label, followed by the coordinates and three display settings
+            words = line.split()
+            if len(words) < 6:
+                continue
+            labels.append(words[-6])
+            types.append(" ".join(words[:-6]))
+            x.append(words[-5])
+            y.append(words[-4])
+        return cls(*_valid_nodes(labels, x, y, types), cell_size=cell_size)
+
+    def __repr__(self):
+        return f"<floodmodeller_api SpatialIndex: {len(self)} nodes>"
+
+    def __len__(self):
+        return len(self._labels)
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Dataframe containing the 'Label', 'Type', 'X' and 'Y' of every node"""
+        return self._table(np.arange(len(self)))
+
+    def nearest(self, x, y) -> pd.DataFrame:
+        """Finds the nearest node to each of one or more points
+
+        Args:
+            x, y (float or list): Coordinates of the point(s)
+
+        Returns:
+            pandas.DataFrame: 'Label', 'Type', 'X', 'Y' and 'Distance' of the nearest node to each point, with one
+                row per point in the same order as the points given
+        """
+        points_x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        points_y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        if len(self) == 0:
+            raise ValueError("Cannot find the nearest node as the spatial index is empty")
+
+        nearest = np.empty(len(points_x), dtype=np.int64)
+        distances = np.empty(len(points_x))
+        point_cols, point_rows = self._cells(points_x, points_y)
+        for idx, (point_x, point_y, col, row) in enumerate(
+            zip(points_x, points_y, point_cols.tolist(), point_rows.tolist())
+        ):
+            # Grow the square of cells around the point until it contains a node
+            radius = max(
+                col - (self._shape[1] - 1), -col, row - (self._shape[0] - 1), -row, 0
+            )
+            candidates = self._nodes_in_cells(
+                col - radius, row - radius, col + radius, row + radius
+            )
+            while len(candidates) == 0:
+                radius += 1
+                candidates = self._nodes_in_cells(
+                    col - radius, row - radius, col + radius, row + radius
+                )
+            # A node closer than the nearest candidate may be just outside the square, so all cells within that
+            # distance are checked
+            dist = np.hypot(self._x[candidates] - point_x, self._y[candidates] - point_y)
+            reach = int(np.ceil(dist.min() / self._cell_size))
+            if reach > radius:
+                candidates = self._nodes_in_cells(
+                    col - reach, row - reach, col + reach, row + reach
+                )
+                dist = np.hypot(
+                    self._x[candidates] - point_x, self._y[candidates] - point_y
+                )
+            best = np.argmin(dist)
+            nearest[idx] = candidates[best]
+            distances[idx] = dist[best]
+
+        result = self._table(nearest)
+        result["Distance"] = distances
+        return result
+
+    def within_bbox(self, xmin: float, ymin: float, xmax: float, ymax: float) -> pd.DataFrame:
+        """Finds the nodes within a bounding box, including those on its edges
+
+        Args:
+            xmin, ymin, xmax, ymax (float): Bounds of the box
+
+        Returns:
+            pandas.DataFrame: 'Label', 'Type', 'X' and 'Y' of each node within the box
+        """
+        return self._table(self._within_bbox(xmin, ymin, xmax, ymax))
+
+    def within_polygon(self, polygon) -> pd.DataFrame:
+        """Finds the nodes within a polygon. Nodes exactly on an edge of the polygon may or may not be included.
+
+        Args:
+            polygon (list): (x, y) coordinates of the vertices of the polygon, e.g. ``[(0, 0), (10, 0), (5, 8)]``
+
+        Returns:
+            pandas.DataFrame: 'Label', 'Type', 'X' and 'Y' of each node within the polygon
+        """
+        vertices = np.asarray(polygon, dtype=np.float64)
+        if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+            raise ValueError("Polygon must be given as at least three (x, y) vertices")
+        candidates = self._within_bbox(*vertices.min(axis=0), *vertices.max(axis=0))
+        node_x = self._x[candidates]
+        node_y = self._y[candidates]
+
+        # Even-odd rule, counting the edges crossed by a ray from each node in the +x direction
+        inside = np.zeros(len(candidates), dtype=bool)
+        for (x1, y1), (x2, y2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+            if y1 == y2:
+                continue
+            crosses = (y1 > node_y) != (y2 > node_y)
+            crosses &= node_x < x1 + (node_y - y1) * (x2 - x1) / (y2 - y1)
+            inside ^= crosses
+        return self._table(candidates[inside])
+
+    def _within_bbox(self, xmin, ymin, xmax, ymax):
+        (col_min, col_max), (row_min, row_max) = self._cells(
+            np.array([xmin, xmax]), np.array([ymin, ymax])
+        )
+        candidates = self._nodes_in_cells(col_min, row_min, col_max, row_max)
+        node_x = self._x[candidates]
+        node_y = self._y[candidates]
+        inside = (node_x >= xmin) & (node_x <= xmax) & (node_y >= ymin) & (node_y <= ymax)
+        return candidates[inside]
+
+    def _cells(self, x, y):
+        """Returns the grid column and row of each point, which may be outside the grid"""
+        cols = np.floor((x - self._origin[0]) / self._cell_size).astype(np.int64)
+        rows = np.floor((y - self._origin[1]) / self._cell_size).astype(np.int64)
+        return cols, rows
+
+    def _nodes_in_cells(self, col_min, row_min, col_max, row_max):
+        """Returns the index of each node in the given range of grid cells, which is clipped to the grid"""
+        nrows, ncols = self._shape
+        col_min, col_max = max(col_min, 0), min(col_max, ncols - 1)
+        row_min, row_max = max(row_min, 0), min(row_max, nrows - 1)
+        if col_min > col_max or row_min > row_max:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.arange(row_min, row_max + 1)
+        starts = self._cell_starts[rows * ncols + col_min]
+        ends = self._cell_starts[rows * ncols + col_max + 1]
+        return np.concatenate(
+            [self._order[start:end] for start, end in zip(starts, ends)]
+        )
+
+    def _table(self, idxs):
+        return pd.DataFrame(
+            {
+                "Label": self._labels[idxs],
+                "Type": self._types[idxs],
+                "X": self._x[idxs],
+                "Y": self._y[idxs],
+            }
+        )
+
+
+def _valid_nodes(labels, x, y, types):
+    """Converts the coordinate strings of each node to floats, leaving out any nodes with invalid coordinates"""
+    x = pd.to_numeric(pd.Series(x, dtype=object), errors="coerce").to_numpy(np.float64)
+    y = pd.to_numeric(pd.Series(y, dtype=object), errors="coerce").to_numpy(np.float64)
+    valid = np.isfinite(x) & np.isfinite(y)
+    return (
+        np.array(labels, dtype=object)[valid],
+        x[valid],
+        y[valid],
+        np.array(types, dtype=object)[valid],
+    )
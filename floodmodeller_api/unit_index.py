@@ -0,0 +1,234 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the byte offset index used to read single units from DAT and IED files """
+
+import json
+import locale
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from . import units
+from ._tokenizer import iter_blocks
+
+_INDEX_VERSION = 1
+
+
+class UnitIndex:
+    """Byte offset index of the units in a DAT or IED file, giving the unit type and the byte range of each
+    unit label. This allows a single unit to be read with one seek, without reading the rest of the file.
+
+    The index is saved alongside the file (e.g. 'network.dat.idx') and is reused for as long as the file size
+    and modified time are unchanged, otherwise it is rebuilt. If the index cannot be saved, it is only held in
+    memory.
+
+    Args:
+        filepath (str): Full filepath to a dat or ied file
+        index_filepath (str, optional): Filepath to save the index to. Defaults to the filepath with '.idx' appended.
+
+    Output:
+        Initiates 'UnitIndex' class object
+
+    Raises:
+        TypeError: Raised if filepath does not point to a .dat or .ied file
+        FileNotFoundError: Raised if filepath points to a file which does not exist
+    """
+
+    def __init__(
+        self,
+        filepath: Union[str, Path],
+        index_filepath: Optional[Union[str, Path]] = None,
+    ):
+        self._filepath = Path(filepath).resolve()
+        if self._filepath.suffix.lower() not in (".dat", ".ied"):
+            raise TypeError(
+                "Given filepath does not point to a DAT or IED file. Please point to the full path for a DAT or IED file"
+            )
+        if not self._filepath.exists():
+            raise FileNotFoundError(f"File does not exist: {self._filepath}")
+
+        if index_filepath is None:
+            index_filepath = self._filepath.with_name(self._filepath.name + ".idx")
+        self._index_filepath = Path(index_filepath)
+
+        if not self._load():
+            self._build()
+            self._save()
+
+    def __repr__(self):
+        return f"<floodmodeller_api Class: UnitIndex(filepath={self._filepath})>"
+
+    def __contains__(self, label):
+        return label in self._units
+
+    def __len__(self):
+        return len(self._units)
+
+    @property
+    def labels(self) -> list:
+        """List of all unit labels in the file"""
+        return list(self._units)
+
+    def get(self, label: str) -> dict:
+        """Returns the byte range of each unit with the given label, keyed by unit type. More than one unit
+        can share a label, for example a river section and the boundary at the same node.
+
+        Args:
+            label (str): Unit label
+
+        Returns:
+            dict: Dictionary of unit type to (byte start, byte end)
+        """
+        return {
+            unit_type: tuple(byte_range)
+            for unit_type, byte_range in self._units.get(label, {}).items()
+        }
+
+    def read_unit(self, label: str, unit_type: Optional[str] = None):
+        """Reads a single unit from the file using its byte range
+
+        Args:
+            label (str): Unit label
+            unit_type (str, optional): Unit type, only needed if more than one unit has the given label. Defaults to None.
+
+        Returns:
+            Unit class for the unit
+
+        Raises:
+            KeyError: Raised if no unit with the label (and type) is in the file
+            ValueError: Raised if more than one unit has the label and no unit type is given
+        """
+        return self.read_units([label], unit_type)[0]
+
+    def read_units(self, labels: list, unit_type: Optional[str] = None) -> list:
+        """Reads several units from the file, opening it only once
+
+        Args:
+            labels (list): Unit labels
+            unit_type (str, optional): Unit type, only needed if more than one unit has any of the labels. Defaults to None.
+
+        Returns:
+            list: Unit class for each label
+        """
+        self._check_current()
+        unit_list = []
+        with open(self._filepath, "rb") as _file:
+            for label in labels:
+                unit_type_, (start, end) = self._find(label, unit_type)
+                _file.seek(start)
+                text = _file.read(end - start).decode(self._encoding)
+                block = text.replace("\r\n", "\n").split("\n")
+                if block[-1] == "":
+                    block.pop()
+                if self._is_dat:
+                    unit_list.append(getattr(units, unit_type_)(block, self._label_len))
+                else:
+                    unit_list.append(getattr(units, unit_type_)(block))
+        return unit_list
+
+    def _find(self, label, unit_type):
+        if label not in self._units:
+            raise KeyError(f"No unit labelled '{label}' in {self._filepath.name}")
+        unit_ranges = self._units[label]
+        if unit_type is None:
+            if len(unit_ranges) > 1:
+                raise ValueError(
+                    f"More than one unit labelled '{label}' ({', '.join(unit_ranges)}), please specify the unit type"
+                )
+            unit_type = next(iter(unit_ranges))
+        elif unit_type not in unit_ranges:
+            raise KeyError(f"No {unit_type} unit labelled '{label}' in {self._filepath.name}")
+        return unit_type, unit_ranges[unit_type]
+
+    @property
+    def _is_dat(self):
+        return self._filepath.suffix.lower() == ".dat"
+
+    @property
+    def _encoding(self):
+        # Matches the encoding used when files are opened in text mode
+        return locale.getpreferredencoding(False)
+
+    def _file_key(self):
+        stat = os.stat(self._filepath)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _check_current(self):
+        """Rebuilds the index if the file has changed since it was indexed"""
+        if self._key != self._file_key():
+            self._build()
+            self._save()
+
+    def _load(self):
+        """Loads the saved index, returning False if there is no valid index for the current file"""
+        try:
+            with open(self._index_filepath, "r") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return False
+
+        if index.get("version") != _INDEX_VERSION or index.get("key") != self._file_key():
+            return False
+
+        self._key = index["key"]
+        self._label_len = index["label_len"]
+        self._units = index["units"]
+        return True
+
+    def _save(self):
+        index = {
+            "version": _INDEX_VERSION,
+            "key": self._key,
+            "label_len": self._label_len,
+            "units": self._units,
+        }
+        try:
+            with open(self._index_filepath, "w") as index_file:
+                json.dump(index, index_file)
+        except OSError:
+            pass  # Index is kept in memory only
+
+    def _build(self):
+        """Scans the file once, recording the byte offset of each line and the byte range of each unit"""
+        self._key = self._file_key()
+        self._label_len = 12
+        self._units = {}
+        line_starts = []
+        encoding = self._encoding
+
+        with open(self._filepath, "rb") as _file:
+
+            def _lines():
+                position = 0
+                for line in _file:
+                    line_starts.append(position)
+                    position += len(line)
+                    lines.append(line.decode(encoding).rstrip("\r\n"))
+                    yield lines[-1]
+
+            lines = []
+            for block_type, start, end in iter_blocks(_lines(), has_general=self._is_dat):
+                if block_type == "GENERAL":
+                    self._label_len = int(units.helpers.split_10_char(lines[2])[5])
+                elif block_type in units.SUPPORTED_UNIT_TYPES and block_type != "INITIAL CONDITIONS":
+                    # Check to see whether unit type has associated subtypes so that unit name can be correctly assigned
+                    if units.SUPPORTED_UNIT_TYPES[block_type]["has_subtype"]:
+                        label = lines[start + 2][: self._label_len].strip()
+                    else:
+                        label = lines[start + 1][: self._label_len].strip()
+                    byte_end = line_starts[end + 1] if end + 1 < len(line_starts) else self._key[0]
+                    self._units.setdefault(label, {})[block_type] = [line_starts[start], byte_end]
@@ -16,7 +16,8 @@ address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London
 
 """ Holds the base unit class for all FM Units """
 
-from ..diff import check_item_with_dataframe_equal
+from ..diff import check_item_with_dataframe_equal, get_block_hash, get_item_hash
+from ..validation import _validate_unit
 
 
 class Unit:
@@ -27,9 +28,12 @@ class Unit:
     def __init__(self, unit_block=None, n=12, **kwargs):
         self._label_len = n
         if unit_block != None:
-            self._read(unit_block)
+            self._read(unit_block, **kwargs)
         else:
             self._create_from_blank(**kwargs)
+        # Used to track whether the unit needs writing again (new units always do)
+        self._read_state = (self._get_hash(), unit_block)
+        self._write_state = (None, None)
 
     @property
     def name(self):
@@ -79,6 +83,39 @@ class Unit:
     def _write(self):
         raise NotImplementedError
 
+    def _validate(self):
+        """Checks the parameters of the unit are valid, as done when the unit is written"""
+        _validate_unit(self)
+
+    def _get_state(self):
+        """Returns the unit attributes, excluding those only used to track changes to the unit"""
+        return {
+            key: item
+            for key, item in self.__dict__.items()
+            if key not in ("_read_state", "_write_state")
+        }
+
+    def _get_hash(self):
+        return get_item_hash(self._get_state())
+
+    def _get_block(self):
+        """Returns the unit block, only writing the unit again if it has changed since it was last read
+        or written. If any changes have been reverted, the block the unit was read from is returned."""
+        unit_hash = self._get_hash()
+        for state_hash, block in (self._write_state, self._read_state):
+            if block is not None and state_hash == unit_hash:
+                return block
+
+        block = self._write()
+        self._write_state = (self._get_hash(), block)
+        return block
+
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the unit block as it would be written. Units which are unchanged since they were read
+        keep the hash of the block they were read from."""
+        return get_block_hash(self._get_block())
+
     def _diff(self, other):
         diff = self._get_diff(other)
         if diff[0]:
@@ -93,8 +130,8 @@ class Unit:
         result = True
         diff = []
         result, diff = check_item_with_dataframe_equal(
-            self.__dict__,
-            other.__dict__,
+            self._get_state(),
+            other._get_state(),
             name=f"{self._unit}.{self._subtype or ''}.{self._name}",
             diff=diff,
         )
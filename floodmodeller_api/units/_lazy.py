@@ -0,0 +1,107 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the lazily loaded unit group used by the DAT class """
+
+from collections.abc import MutableMapping
+
+from ..diff import get_block_hash
+
+
+class _RawUnit:
+    """Placeholder for a unit which has not yet been read from its raw block"""
+
+    __slots__ = ("unit_class", "block", "_content_hash")
+
+    def __init__(self, unit_class, block):
+        self.unit_class = unit_class
+        self.block = block
+        self._content_hash = None
+
+    @property
+    def content_hash(self):
+        """Hash of the raw block, which is the same as the content hash of the unit once read"""
+        if self._content_hash is None:
+            self._content_hash = get_block_hash(self.block)
+        return self._content_hash
+
+
+class LazyUnitGroup(MutableMapping):
+    """Dictionary-like group of units keyed by unit label. Units are stored as their raw block of
+    lines and only read into a unit class the first time they are accessed. Units which have never
+    been accessed can be written back exactly as they were read.
+
+    Args:
+        label_len (int, optional): Label length used when reading units. Defaults to 12.
+    """
+
+    def __init__(self, label_len=12):
+        self._label_len = label_len
+        self._units = {}
+
+    def _add_block(self, name, unit_class, block):
+        """Adds a unit to the group as a raw block without reading it"""
+        self._units[name] = _RawUnit(unit_class, block)
+
+    def _is_loaded(self, name):
+        """Returns True if the unit has been read into a unit class"""
+        return not isinstance(self._units[name], _RawUnit)
+
+    def _loaded_items(self):
+        """Returns a list of (name, unit) pairs for units which have already been read"""
+        return [
+            (name, unit)
+            for name, unit in self._units.items()
+            if not isinstance(unit, _RawUnit)
+        ]
+
+    def _content_hashes(self):
+        """Returns the content hash of each unit, without reading units which have not been accessed"""
+        return {name: unit.content_hash for name, unit in self._units.items()}
+
+    def _rename(self, renames):
+        """Renames the keys of the group in place, keeping the order of the units"""
+        self._units = {renames.get(name, name): unit for name, unit in self._units.items()}
+
+    def __getitem__(self, name):
+        unit = self._units[name]
+        if isinstance(unit, _RawUnit):
+            unit = unit.unit_class(unit.block, self._label_len)
+            self._units[name] = unit
+        return unit
+
+    def __setitem__(self, name, unit):
+        self._units[name] = unit
+
+    def __delitem__(self, name):
+        del self._units[name]
+
+    def __contains__(self, name):
+        return name in self._units
+
+    def __iter__(self):
+        return iter(self._units)
+
+    def __len__(self):
+        return len(self._units)
+
+    def copy(self):
+        new_group = LazyUnitGroup(self._label_len)
+        new_group._units = self._units.copy()
+        return new_group
+
+    def __repr__(self):
+        return repr(dict(self.items()))
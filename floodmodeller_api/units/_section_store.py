@@ -0,0 +1,333 @@
+"""
+Flood Modeller Python API
+Copyright (C) 2022 Jacobs U.K. Limited
+
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty 
+of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more details. 
+
+You should have received a copy of the GNU General Public License along with this program.  If not, see https://www.gnu.org/licenses/.
+
+If you have any query about this program or this License, please contact us at support@floodmodeller.com or write to the following 
+address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
+"""
+
+""" Holds the columnar store used for the cross section data of RIVER units """
+
+import numpy as np
+import pandas as pd
+
+from .helpers import decode_fixed_width
+
+# Columns of RIVER section data and their types
+SECTION_COLUMNS = {
+    "X": np.float64,
+    "Y": np.float64,
+    "Mannings n": np.float64,
+    "Panel": np.bool_,
+    "RPL": np.float64,
+    "Marker": object,
+    "Easting": np.float64,
+    "Northing": np.float64,
+    "Deactivation": object,
+    "SP. Marker": np.int64,
+}
+
+
+def _data_address(arr):
+    return arr.__array_interface__["data"][0]
+
+
+def column_arrays(data) -> list:
+    """Returns the values of each column of a dataframe"""
+    return [data[name].to_numpy() for name in data.columns]
+
+
+class SectionStore:
+    """Columnar store holding the cross section data of one or more RIVER sections in a single table. The rows of
+    section i are rows offsets[i] to offsets[i+1] of the table, and the ``data`` attribute of each RIVER unit is a
+    view of its rows. This means that operations across all sections can be done in one vectorised call, e.g.
+
+    .. code:: python
+
+        store.aggregate("Y", "min")  # Minimum bed level of each section
+
+    Args:
+        columns (dict): Dictionary of column name to array containing the rows of all sections
+        offsets (array): Index of the first row of each section, followed by the total number of rows
+        labels (list): Label of each section
+    """
+
+    def __init__(self, columns, offsets, labels):
+        self._arrays = {
+            name: np.asarray(columns[name], dtype=dtype)
+            for name, dtype in SECTION_COLUMNS.items()
+        }
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._labels = list(labels)
+        self._table = None
+
+    @classmethod
+    def from_sections(cls, sections, labels):
+        """Creates a store from the data of each section
+
+        Args:
+            sections (list): Dictionary of column name to array for each section
+            labels (list): Label of each section
+
+        Returns:
+            SectionStore: Store containing the rows of all sections, in order
+        """
+        offsets = np.zeros(len(sections) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(section["X"]) for section in sections])
+        columns = {
+            name: np.concatenate(
+                [np.asarray(section[name]) for section in sections]
+                or [np.array([], dtype=dtype)]
+            )
+            for name, dtype in SECTION_COLUMNS.items()
+        }
+        return cls(columns, offsets, labels)
+
+    @classmethod
+    def from_rows(cls, sections, labels):
+        """Creates a store by decoding the fixed width rows of every section in a single pass
+
+        Args:
+            sections (list): Rows of the RIVER block containing the section data, for each section
+            labels (list): Label of each section
+
+        Returns:
+            SectionStore: Store containing the rows of all sections, in order
+        """
+        offsets = np.zeros(len(sections) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(rows) for rows in sections])
+        rows = [row for section_rows in sections for row in section_rows]
+        x, y, n, rpl, marker, easting, northing, deactivation, sp_marker = (
+            decode_fixed_width(
+                rows, [float, float, float, str, str, float, float, str, int]
+            )
+        )
+        # RPL field begins with '*' if the row is a panel marker
+        panel = np.array([itm.startswith("*") for itm in rpl], dtype=bool)
+        rpl = decode_fixed_width(
+            [itm[1:] if is_panel else itm for itm, is_panel in zip(rpl, panel)],
+            [float],
+        )[0]
+        columns = {
+            "X": x,
+            "Y": y,
+            "Mannings n": n,
+            "Panel": panel,
+            "RPL": rpl,
+            "Marker": marker,
+            "Easting": easting,
+            "Northing": northing,
+            "Deactivation": deactivation,
+            "SP. Marker": sp_marker,
+        }
+        return cls(columns, offsets, labels)
+
+    def __repr__(self):
+        return f"<floodmodeller_api SectionStore: {len(self._labels)} sections, {self._offsets[-1]} rows>"
+
+    def __len__(self):
+        return len(self._labels)
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Dataframe containing the rows of every section. Values edited in place are seen by the ``data`` of each RIVER"""
+        if self._table is None:
+            self._table = pd.DataFrame(self._arrays, columns=list(SECTION_COLUMNS))
+            self._arrays = self._get_table_arrays()
+        return self._table
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Index of the first row of each section in the table, followed by the total number of rows"""
+        return self._offsets
+
+    @property
+    def labels(self) -> list:
+        """Label of each section"""
+        return self._labels
+
+    @property
+    def row_labels(self) -> np.ndarray:
+        """Label of the section that each row of the table belongs to"""
+        return np.repeat(np.array(self._labels, dtype=object), np.diff(self._offsets))
+
+    def aggregate(self, column: str, func) -> pd.Series:
+        """Aggregates a column over the rows of each section
+
+        Args:
+            column (str): Name of column to aggregate, e.g. 'Y'
+            func (str or function): Aggregation passed to pandas, e.g. 'min', 'max', 'mean'
+
+        Returns:
+            pandas.Series: Aggregated value for each section, indexed by section label. Sections without any rows are NaN.
+        """
+        codes = np.repeat(np.arange(len(self._labels)), np.diff(self._offsets))
+        result = self.table[column].groupby(codes).agg(func)
+        result = result.reindex(range(len(self._labels)))
+        result.index = pd.Index(self._labels, name="Label")
+        result.name = column
+        return result
+
+    def section(self, idx) -> "SectionStore":
+        """Returns a store holding only the rows of a section. Its arrays are views of the rows in this store, so
+        pickling or copying it only copies the rows of the section rather than the rows of every section."""
+        nrows = self._offsets[idx + 1] - self._offsets[idx]
+        return SectionStore(self.get_columns(idx), [0, nrows], [self._labels[idx]])
+
+    def get_columns(self, idx):
+        """Returns the rows of a section as a dictionary of column name to array, without creating a dataframe"""
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        return {name: arr[start:end] for name, arr in self._arrays.items()}
+
+    def view(self, idx) -> pd.DataFrame:
+        """Returns the rows of a section as a dataframe which is a view of the table"""
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        self.table  # Columns of the view are taken from the table, so that edits to the view update the table
+        return pd.DataFrame(
+            self.get_columns(idx),
+            index=pd.RangeIndex(end - start),
+            columns=list(SECTION_COLUMNS),
+            copy=False,
+        )
+
+    def _is_view(self, idx, data):
+        """Returns True if the dataframe still shares its values with the rows of the section"""
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        if list(data.columns) != list(SECTION_COLUMNS) or len(data) != end - start:
+            return False
+        if end == start:
+            return True
+        for values, arr in zip(column_arrays(data), self._arrays.values()):
+            if values.dtype != arr.dtype or _data_address(values) != _data_address(
+                arr[start:end]
+            ):
+                return False
+        return True
+
+    def _set_section(self, idx, data):
+        """Copies the values of a dataframe into the rows of the section, returning False if the number of rows differs"""
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        if len(data) != end - start:
+            return False
+        for name, arr in self._arrays.items():
+            arr[start:end] = data[name].to_numpy()
+        return True
+
+    def _columns_replaced(self):
+        """Returns True if any column of the table has been replaced rather than edited in place, in which case
+        existing views no longer share values with the table"""
+        if self._table is None:
+            return False
+        arrays = self._get_table_arrays()
+        replaced = any(
+            _data_address(arrays[name]) != _data_address(arr)
+            for name, arr in self._arrays.items()
+        )
+        self._arrays = arrays
+        return replaced
+
+    def _get_table_arrays(self):
+        return {name: self._table[name].to_numpy() for name in SECTION_COLUMNS}
+
+
+# Hydraulic properties given by section_properties, in order
+PROPERTY_COLUMNS = ["Area", "Wetted Perimeter", "Top Width", "Conveyance"]
+
+
+def _sum_ranges(values, starts, ends):
+    """Sums the rows of values in each range [start, end), including empty ranges"""
+    cumulative = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=cumulative[1:])
+    return cumulative[ends] - cumulative[starts]
+
+
+def section_properties(columns, offsets, stages):
+    """Computes the area, wetted perimeter, top width and conveyance of one or more sections at each stage, for
+    all sections in a single vectorised pass.
+
+    Each pair of consecutive points of a section is a segment, using the Mannings n of its first point. Sections
+    are divided into panels at each panel marker, and the conveyance of each panel is A^(5/3) / (n P^(2/3)), where
+    n is the wetted perimeter weighted mean of the Mannings n of its segments. The conveyance of each panel is
+    divided by the square root of the RPL given at the start of the panel, where it is greater than zero.
+
+    Args:
+        columns (dict): Dictionary containing the 'X', 'Y', 'Mannings n', 'Panel' and 'RPL' arrays of the rows of
+            all sections, as in a SectionStore
+        offsets (array): Index of the first row of each section, followed by the total number of rows
+        stages (array): Stages of each section, with shape (number of sections, number of stages)
+
+    Returns:
+        numpy.ndarray: Properties of each section at each stage, with shape (number of sections, number of stages,
+            4), where the last axis is ordered as PROPERTY_COLUMNS
+    """
+    x = np.asarray(columns["X"], dtype=np.float64)
+    y = np.asarray(columns["Y"], dtype=np.float64)
+    n = np.asarray(columns["Mannings n"], dtype=np.float64)
+    panel = np.asarray(columns["Panel"], dtype=bool)
+    rpl = np.asarray(columns["RPL"], dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    stages = np.asarray(stages, dtype=np.float64)
+    nrows = len(x)
+
+    # Segment i joins rows i and i+1, and is only valid if both rows belong to the same section
+    row_section = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    valid = np.zeros(nrows, dtype=bool)
+    valid[:-1] = row_section[:-1] == row_section[1:]
+    next_row = np.minimum(np.arange(nrows) + 1, max(nrows - 1, 0))
+    dx = np.where(valid, x[next_row] - x, 0.0)
+    dy = np.where(valid, y[next_row] - y, 0.0)
+    length = np.hypot(dx, dy)
+
+    # Depth of water at each end of each segment, for each stage of its section
+    segment_stages = stages[row_section] if nrows else np.zeros((0, stages.shape[1]))
+    depth1 = segment_stages - y[:, None]
+    depth2 = segment_stages - y[next_row][:, None]
+    deep = np.maximum(depth1, depth2)
+    shallow = np.minimum(depth1, depth2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Fraction of the segment below the stage
+        wet = np.where(
+            deep > 0, np.where(shallow >= 0, 1.0, deep / (deep - shallow)), 0.0
+        )
+    wet[~valid] = 0.0
+    area = np.where(shallow >= 0, 0.5 * (depth1 + depth2), 0.5 * deep * wet)
+    area *= dx[:, None]
+    perimeter = wet * length[:, None]
+    width = wet * dx[:, None]
+
+    # Panels begin at the start of each section and at each panel marker
+    section_start = np.zeros(nrows, dtype=bool)
+    section_start[offsets[:-1][offsets[:-1] < offsets[1:]]] = True
+    panel_starts = np.flatnonzero(section_start | panel)
+    panel_ends = np.append(panel_starts[1:], nrows)
+    panel_area = _sum_ranges(area, panel_starts, panel_ends)
+    panel_perimeter = _sum_ranges(perimeter, panel_starts, panel_ends)
+    panel_n = _sum_ranges(perimeter * n[:, None], panel_starts, panel_ends)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        panel_n = panel_n / panel_perimeter
+        conveyance = np.where(
+            (panel_perimeter > 0) & (panel_area > 0) & (panel_n > 0),
+            panel_area ** (5 / 3) / (panel_n * panel_perimeter ** (2 / 3)),
+            0.0,
+        )
+    panel_rpl = rpl[panel_starts]
+    conveyance /= np.sqrt(np.where(panel_rpl > 0, panel_rpl, 1.0))[:, None]
+
+    section_panels = np.searchsorted(panel_starts, offsets)
+    return np.stack(
+        [
+            _sum_ranges(area, offsets[:-1], offsets[1:]),
+            _sum_ranges(perimeter, offsets[:-1], offsets[1:]),
+            _sum_ranges(width, offsets[:-1], offsets[1:]),
+            _sum_ranges(conveyance, section_panels[:-1], section_panels[1:]),
+        ],
+        axis=-1,
+    )
@@ -19,7 +19,7 @@ import pandas as pd
 from ._base import Unit
 from .helpers import (join_10_char, join_12_char_ljust, join_n_char_ljust,
                       split_10_char, split_12_char, split_n_char, _to_str, _to_float, _to_int,
-                      _to_data_list)
+                      _to_data_list, format_10_char, join_10_char_columns)
 from floodmodeller_api.validation import _validate_unit
 
 
@@ -135,9 +135,12 @@ class QTBDY(Unit):
         )
 
         if self.timeunit == "DATES":
-            qtbdy_data = [join_10_char(q) + t for t, q in self.data.iteritems()]
+            qtbdy_data = [
+                q + t
+                for t, q in zip(self.data.index.tolist(), format_10_char(self.data))
+            ]
         else:
-            qtbdy_data = [join_10_char(q, t) for t, q in self.data.iteritems()]
+            qtbdy_data = join_10_char_columns(self.data, self.data.index)
         qtbdy_block = [header, name, qtbdy_params]
         qtbdy_block.extend(qtbdy_data)
 
@@ -223,9 +226,12 @@ class HTBDY(Unit):
             self.interpmethod,
         )
         if self.timeunit == "DATES":
-            htbdy_data = [join_10_char(h) + t for t, h in self.data.iteritems()]
+            htbdy_data = [
+                h + t
+                for t, h in zip(self.data.index.tolist(), format_10_char(self.data))
+            ]
         else:
-            htbdy_data = [join_10_char(h, t) for t, h in self.data.iteritems()]
+            htbdy_data = join_10_char_columns(self.data, self.data.index)
         htbdy_block = [header, name, htbdy_params]
         htbdy_block.extend(htbdy_data)
 
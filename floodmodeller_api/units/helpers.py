@@ -15,6 +15,7 @@ address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London
 """
 
 from typing import Optional
+import numpy as np
 import pandas as pd
 
 ### Helper Functions ###
@@ -49,6 +50,44 @@ def join_10_char(*itms, dp=3):
     return string
 
 
+def _format_each(fmt, values):
+    """Formats every value with a printf-style format in a single call, giving the same result as formatting
+    each value with the equivalent format spec"""
+    if len(values) == 0:
+        return []
+    return ((fmt + "\x00") * len(values) % tuple(values)).split("\x00")[:-1]
+
+
+def format_10_char(values, dp=3) -> list[str]:
+    """Formats a column of values as 10 character right-justified fields, giving the same result as calling
+    join_10_char on each value. Float columns are formatted in bulk rather than one value at a time.
+
+    Args:
+        values (pandas.Series, numpy.ndarray or list): Column of values
+        dp (int, optional): Number of decimal places for float values. Defaults to 3.
+
+    Returns:
+        list[str]: 10 character field for each value
+    """
+    dtype = getattr(values, "dtype", None)
+    items = values.tolist() if hasattr(values, "tolist") else list(values)
+    if dtype != np.float64:
+        return [join_10_char(itm, dp=dp) for itm in items]
+
+    fields = _format_each(f"%10.{dp}f", items)
+    for idx, field in enumerate(fields):
+        if len(field) > 10:
+            # Use scientific notation if number greater than 10 characters
+            fields[idx] = join_10_char(items[idx], dp=dp)
+    return fields
+
+
+def join_10_char_columns(*columns, dp=3) -> list[str]:
+    """Joins columns of values into rows of 10 character right-justified fields, giving the same rows as calling
+    join_10_char on the values of each row"""
+    return list(map("".join, zip(*[format_10_char(column, dp=dp) for column in columns])))
+
+
 def join_12_char_ljust(*itms, dp=3):
     """Joins a set of values with a 12 character buffer and left-justified"""
     string = ""
@@ -109,32 +148,98 @@ def _to_str(itm, default, check_float=False):
         return itm
 
 
+def _to_array(strings, blank, dtype, default):
+    """Converts an array of strings to the given type in one call, using the default for any blank field or
+    any field which cannot be converted, in the same way as _to_float and _to_int"""
+    try:
+        values = np.where(blank, "0", strings).astype(dtype)
+    except ValueError:
+        # Only happens if a field is invalid, in which case fields are converted one at a time
+        convert = _to_float if dtype == np.float64 else _to_int
+        defaults = np.broadcast_to(default, strings.shape)
+        values = np.array(
+            [
+                convert(itm, itm_default)
+                for itm, itm_default in zip(
+                    strings.ravel().tolist(), defaults.ravel().tolist()
+                )
+            ],
+            dtype=dtype,
+        ).reshape(strings.shape)
+    return np.where(blank, default, values)
+
+
+def decode_fixed_width(block: list[str], columns: list, width: int = 10) -> list:
+    """Decodes a block of fixed width rows into one array per column, in a single pass over the block
+
+    Args:
+        block (list[str]): Rows of the block
+        columns (list): Type of each field in the row, in order. This can be float, int or str, or a tuple of
+            (type, default) where the default is used for blank fields. The defaults are 0.0 for float, 0 for int
+            and '' for str, matching _to_float and _to_int. Fields given as None are skipped.
+        width (int, optional): Width of each field. Defaults to 10.
+
+    Returns:
+        list: Array of values for each column which isn't skipped. Str columns are object arrays of stripped strings.
+    """
+    n_rows, n_fields = len(block), len(columns)
+    # Rows are padded (or cut) to the same length, then each field is a fixed slice of every row
+    rows = np.array(block, dtype=f"U{n_fields * width}").reshape(n_rows)
+    chars = rows.view(np.uint32).reshape(n_rows, n_fields, width)
+    blank = ((chars == 32) | (chars == 0)).all(axis=2)
+    fields = rows.view(f"U{width}").reshape(n_rows, n_fields)
+
+    specs = [
+        None if column is None else column if isinstance(column, tuple) else (column, None)
+        for column in columns
+    ]
+    arrays = {}
+    # Numeric fields of the same type are converted together
+    for dtype, default_value, np_dtype in ((float, 0.0, np.float64), (int, 0, np.int64)):
+        idx = [i for i, spec in enumerate(specs) if spec is not None and spec[0] is dtype]
+        if not idx:
+            continue
+        defaults = np.array(
+            [default_value if specs[i][1] is None else specs[i][1] for i in idx],
+            dtype=np_dtype,
+        )
+        values = _to_array(fields[:, idx], blank[:, idx], np_dtype, defaults)
+        for col, i in enumerate(idx):
+            arrays[i] = values[:, col]
+    for i, spec in enumerate(specs):
+        if spec is not None and spec[0] is str:
+            strings = [itm.strip() for itm in fields[:, i].tolist()]
+            if spec[1] is not None:
+                strings = [_to_str(itm, spec[1]) for itm in strings]
+            arrays[i] = np.array(strings, dtype=object)
+
+    return [arrays[i] for i in sorted(arrays)]
+
+
+def _read_table(block: list[str], columns: list, names: list[str]) -> pd.DataFrame:
+    """Decodes a block of fixed width rows into a dataframe with the given column names"""
+    return pd.DataFrame(dict(zip(names, decode_fixed_width(block, columns))), columns=names)
+
+
 def _to_data_list(
     block: list[str], num_cols: Optional[int] = None, date_col: Optional[int] = None
 ):
-    if num_cols is not None:
+    # Each row only has the fields it contains, so rows of different lengths are not padded
+    row_lengths = [-(-len(row) // 10) for row in block]
+    if num_cols is None:
+        num_cols = max(row_lengths, default=0)
+    else:
         num_cols += 1 if date_col is not None else 0
+        row_lengths = [min(length, num_cols) for length in row_lengths]
+    columns = [float] * num_cols
+    if date_col is not None and num_cols > date_col:
+        # Date and time are read as separate fields and then joined
+        columns[date_col : date_col + 2] = [str, str]
+    columns = [column.tolist() for column in decode_fixed_width(block, columns)]
     data_list = []
-    for row in block:
-        row_split = (
-            split_10_char(row) if num_cols is None else split_10_char(row)[:num_cols]
-        )
+    for row, length in zip(zip(*columns), row_lengths):
+        row = list(row[:length])
         if date_col is not None:
-            date_time = " ".join(row_split[date_col : date_col + 2])
-            row_split = [
-                _to_float(itm)
-                for idx, itm in enumerate(row_split)
-                if idx != date_col and idx != date_col + 1
-            ]
-            row_split.insert(date_col, date_time)
-        else:
-            row_split = [_to_float(itm) for itm in row_split]
-
-        row = []
-        for var in row_split:
-            row.append(var)
+            row[date_col : date_col + 2] = [" ".join(row[date_col : date_col + 2])]
         data_list.append(row)
     return data_list
-
-
-
@@ -16,8 +16,8 @@ address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London
 
 import pandas as pd
 
-from .helpers import join_10_char, split_10_char
-from ..diff import check_item_with_dataframe_equal
+from .helpers import decode_fixed_width, join_10_char, join_10_char_columns
+from ..diff import check_item_with_dataframe_equal, get_block_hash, get_item_hash
 ### Initial Conditions Class ###
 
 
@@ -27,6 +27,8 @@ class IIC:
     def __init__(self, ic_block, n=12):
         self._label_len = n
         self._read(ic_block)
+        self._read_state = (get_item_hash(self._get_state()), ic_block)
+        self._write_state = (None, None)
 
     def __repr__(self):
         return f"<floodmodeller_api Initial Conditions Class: IIC()>"
@@ -43,26 +45,17 @@ class IIC:
             "ustate",
             "z",
         ]
-        data_list = []
-        for line in ic_block[2:]:
-            lbl = line[: self._label_len + 1].strip()
-            incl = line[self._label_len + 1 : self._label_len + 3].strip()
-            q, h, fr, v, um, us, z = split_10_char(line[self._label_len + 3 :])
-            data_list.append(
-                [
-                    lbl,
-                    incl,
-                    float(q),
-                    float(h),
-                    float(fr),
-                    float(v),
-                    float(um),
-                    float(us),
-                    float(z),
-                ]
-            )
+        rows = ic_block[2:]
+        n = self._label_len
+        # Flow, stage, froude no, velocity, umode, ustate and z are decoded for all rows at once
+        columns = decode_fixed_width([line[n + 3 :] for line in rows], [float] * 7)
+        data = {
+            "label": [line[: n + 1].strip() for line in rows],
+            "?": [line[n + 1 : n + 3].strip() for line in rows],
+            **dict(zip(header[2:], columns)),
+        }
         # AL is this storing the values as strings?
-        self.data = pd.DataFrame(data_list, columns=header)
+        self.data = pd.DataFrame(data, columns=header)
         # JP Yes
         # AL If it does, would it worth making it store the values instead?
         # JP Yes I'll do that, only downside is that the updated values may not match notation
@@ -75,11 +68,17 @@ class IIC:
             "INITIAL CONDITIONS",
             " label   ?      flow     stage froude no  velocity     umode    ustate         z",
         ]
-        rows = []
-        for _, lbl, incl, q, h, fr, v, um, us, z in self.data.itertuples():
-            string = f"{lbl:<{self._label_len}}{incl:>2}"
-            string += join_10_char(q, h, fr, v, um, us, z)
-            rows.append(string)
+        lbl, incl, q, h, fr, v, um, us, z = (column for _, column in self.data.items())
+        labels = [
+            f"{itm_lbl:<{self._label_len}}{itm_incl:>2}"
+            for itm_lbl, itm_incl in zip(lbl.tolist(), incl.tolist())
+        ]
+        rows = list(
+            map(
+                "".join,
+                zip(labels, join_10_char_columns(q, h, fr, v, um, us, z)),
+            )
+        )
 
         ic_block.extend(rows)
 
@@ -88,6 +87,62 @@ class IIC:
     def update_label(self, old, new):
         self.data.loc[self.data["label"] == old, "label"] = new
 
+    def add_labels(self, labels):
+        """Adds a row with default values for each label not already in the initial conditions"""
+        existing = set(self.data["label"].tolist())
+        labels = [label for label in dict.fromkeys(labels) if label not in existing]
+        if labels:
+            new_rows = pd.DataFrame(
+                {
+                    "label": labels,
+                    "?": "y",
+                    "flow": 0.0,
+                    "stage": 0.0,
+                    "froude no": 0.0,
+                    "velocity": 0.0,
+                    "umode": 0.0,
+                    "ustate": 0.0,
+                    "z": 0.0,
+                },
+                columns=self.data.columns,
+            )
+            self.data = pd.concat([self.data, new_rows], ignore_index=True)
+
+    def remove_labels(self, labels):
+        """Removes the rows of the given labels"""
+        if labels:
+            self.data = self.data[~self.data["label"].isin(labels)].reset_index(drop=True)
+
+    def update_labels(self, renames):
+        """Updates many labels at once, given a dictionary of old label to new label"""
+        if renames:
+            self.data["label"] = [
+                renames.get(label, label) for label in self.data["label"].tolist()
+            ]
+
+    def _get_state(self):
+        return {
+            key: item
+            for key, item in self.__dict__.items()
+            if key not in ("_read_state", "_write_state")
+        }
+
+    def _get_block(self):
+        """Returns the initial conditions block, only writing it again if the data has changed"""
+        ic_hash = get_item_hash(self._get_state())
+        for state_hash, block in (self._write_state, self._read_state):
+            if block is not None and state_hash == ic_hash:
+                return block
+
+        block = self._write()
+        self._write_state = (ic_hash, block)
+        return block
+
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the initial conditions block as it would be written"""
+        return get_block_hash(self._get_block())
+
     def _get_diff(self, other):
         return self.__eq__(other, return_diff=True)
     
@@ -95,8 +150,8 @@ class IIC:
         result = True
         diff = []
         result, diff = check_item_with_dataframe_equal(
-            self.__dict__, 
-            other.__dict__, 
+            self._get_state(),
+            other._get_state(),
             name=f"Initial Conditions",
             diff=diff
         )
@@ -17,9 +17,12 @@ address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London
 import pandas as pd
 
 from ._base import Unit
+from ._section_store import SECTION_COLUMNS, SectionStore, column_arrays
 from .helpers import (join_10_char, join_12_char_ljust, join_n_char_ljust,
-                      split_10_char, split_12_char, split_n_char, _to_float, _to_int)
+                      split_10_char, split_12_char, split_n_char, _to_float, _to_int,
+                      format_10_char, _format_each)
 from floodmodeller_api.validation import _validate_unit
+from ..diff import get_item_hash
 
 
 class RIVER(Unit):
@@ -50,8 +53,9 @@ class RIVER(Unit):
 
     _unit = "RIVER"
 
-    def _read(self, riv_block):
-        """Function to read a given RIVER block and store data as class attributes."""
+    def _read(self, riv_block, section_store=None, section_idx=0):
+        """Function to read a given RIVER block and store data as class attributes. If the section data of the block
+        has already been decoded into a section store, it can be given along with the index of the section."""
         self._subtype = riv_block[1].split(" ")[0].strip()
         # Only supporting 'SECTION' subtype for now
         if self.subtype == "SECTION":
@@ -73,58 +77,12 @@ class RIVER(Unit):
             self.slope = _to_float(params[2], 0.0001)
             self.density = _to_float(params[3], 1000.0)
             self.nrows = int(split_10_char(riv_block[4])[0])
-            data_list = []
-            for row in riv_block[5:]:
-                row_split = split_10_char(f"{row:<100}")
-                x = _to_float(row_split[0])  # chainage
-                y = _to_float(row_split[1])  # elevation
-                n = _to_float(row_split[2])  # Mannings
-                try:
-                    # panel marker
-                    panel = True if row_split[3][0] == "*" else False
-                except IndexError:
-                    panel = False
-
-                try:
-                    # relative path length
-                    rpl = _to_float(row_split[3][1 if panel else 0 :].strip())
-                except IndexError:
-                    rpl = 0.000
-                marker = row_split[4]  # Marker
-                easting = _to_float(row_split[5])  # easting
-                northing = _to_float(row_split[6])  # northing
-
-                deactivation = row_split[7]  # deactivation marker
-                sp_marker = _to_int(row_split[8])  # special marker
-                data_list.append(
-                    [
-                        x,
-                        y,
-                        n,
-                        panel,
-                        rpl,
-                        marker,
-                        easting,
-                        northing,
-                        deactivation,
-                        sp_marker,
-                    ]
-                )
-            self.data = pd.DataFrame(
-                data_list,
-                columns=[
-                    "X",
-                    "Y",
-                    "Mannings n",
-                    "Panel",
-                    "RPL",
-                    "Marker",
-                    "Easting",
-                    "Northing",
-                    "Deactivation",
-                    "SP. Marker",
-                ],
-            )
+            if section_store is None:
+                # Section data is held in a columnar store, which is shared by all sections once read into a DAT
+                section_store = SectionStore.from_rows([riv_block[5:]], [self.name])
+            self._section_store = section_store
+            self._section_idx = section_idx
+            self._data = None
 
         else:
             # This else block is triggered for river subtypes which aren't yet supported, and just keeps the 'riv_block' in it's raw state to write back.
@@ -134,6 +92,52 @@ class RIVER(Unit):
             self._raw_block = riv_block
             self.name = riv_block[2][: self._label_len].strip()
 
+    @property
+    def data(self):
+        if self._data is None:
+            # Section data is a view of the rows in the columnar store
+            self._data = self._section_store.view(self._section_idx)
+        return self._data
+
+    @data.setter
+    def data(self, new_data):
+        self._data = new_data
+
+    def _get_data_columns(self):
+        """Returns the section data as a dictionary of column name to array, without creating a dataframe
+        if the data has not been accessed"""
+        if self._data is None:
+            return self._section_store.get_columns(self._section_idx)
+        return dict(zip(self._data.columns, column_arrays(self._data)))
+
+    def _get_state(self, data_as_columns=False):
+        state = super()._get_state()
+        if self.subtype == "SECTION":
+            for key in ("_data", "_section_store", "_section_idx"):
+                del state[key]
+            state["data"] = self._get_data_columns() if data_as_columns else self.data
+        return state
+
+    def _get_hash(self):
+        # Hashing the section data as arrays avoids creating a dataframe for sections which have not been accessed
+        return get_item_hash(self._get_state(data_as_columns=True))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.subtype == "SECTION":
+            if self._data is not None and self._section_store._is_view(
+                self._section_idx, self._data
+            ):
+                state["_data"] = None  # View is recreated from the store when next accessed
+            # Only the rows of this section are sent, rather than the store shared by every section in the DAT
+            state["_section_store"] = self._section_store.section(self._section_idx)
+            state["_section_idx"] = 0
+        return state
+
+    def _validate(self):
+        if self.subtype == "SECTION":
+            _validate_unit(self)
+
     def _write(self):
         """Function to write a valid RIVER block"""
 
@@ -153,12 +157,13 @@ class RIVER(Unit):
             )
             # Manual so slope can have more sf
             params = f'{self.dist_to_next:>10.3f}{"":>10}{self.slope:>10.6f}{self.density:>10.3f}'
-            self.nrows = len(self.data)
+            # Columns are taken as arrays, so no dataframe is created for sections which have not been accessed
+            data_columns = self._get_data_columns()
+            self.nrows = len(next(iter(data_columns.values()), []))
             riv_block = [header, self.subtype, labels, params, f"{str(self.nrows):>10}"]
 
-            riv_data = []
-            for (
-                _,
+            # Each column is formatted in bulk, then the fields of each row are joined
+            (
                 x,
                 y,
                 n,
@@ -169,14 +174,22 @@ class RIVER(Unit):
                 northing,
                 deactivation,
                 sp_marker,
-            ) in self.data.itertuples():
-                row = join_10_char(x, y, n)
-                if panel:
-                    row += "*"
-                else:
-                    row += " "
-                row += f"{rpl:>9.3f}{join_10_char(marker, easting, northing, deactivation, str(sp_marker))}"
-                riv_data.append(row)
+            ) = data_columns.values()
+            riv_data = list(
+                map(
+                    "".join,
+                    zip(
+                        *[format_10_char(column) for column in (x, y, n)],
+                        ["*" if itm else " " for itm in panel.tolist()],
+                        _format_each("%9.3f", rpl.tolist()),
+                        *[
+                            format_10_char(column)
+                            for column in (marker, easting, northing, deactivation)
+                        ],
+                        format_10_char([str(itm) for itm in sp_marker.tolist()]),
+                    ),
+                )
+            )
 
             riv_block.extend(riv_data)
 
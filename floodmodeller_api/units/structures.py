@@ -29,6 +29,7 @@ from .helpers import (
     _to_str,
     _to_int,
     _to_data_list,
+    _read_table,
 )
 from floodmodeller_api.validation import _validate_unit
 
@@ -154,31 +155,19 @@ class BRIDGE(Unit):
 
             # Read cross section data
             self.section_nrows = int(split_10_char(br_block[5])[0])
-            data_list = []
-            for row in br_block[6 : 6 + self.section_nrows]:
-                row_split = split_10_char(f"{row:<50}")
-                x = _to_float(row_split[0])  # chainage
-                y = _to_float(row_split[1])  # elevation
-                n = _to_float(row_split[2])  # Mannings
-                embankment = row_split[4]  # Embankment flag
-                data_list.append([x, y, n, embankment])
-            self.section_data = pd.DataFrame(
-                data_list, columns=["X", "Y", "Mannings n", "Embankments"]
+            self.section_data = _read_table(
+                br_block[6 : 6 + self.section_nrows],
+                # chainage, elevation, Mannings, (blank), Embankment flag
+                [float, float, float, None, str],
+                ["X", "Y", "Mannings n", "Embankments"],
             )
 
             # Read bridge opening data
             self.opening_nrows = int(split_10_char(br_block[6 + self.section_nrows])[0])
-            data_list = []
-            for row in br_block[6 + self.section_nrows + 1 :]:
-                row_split = split_10_char(f"{row:<40}")
-                start = _to_float(row_split[0])  # Start (m)
-                finish = _to_float(row_split[1])  # Finish (m)
-                spring = _to_float(row_split[2])  # Springing Level
-                soffit = _to_float(row_split[3])  # Soffit Level
-                data_list.append([start, finish, spring, soffit])
-            self.opening_data = pd.DataFrame(
-                data_list,
-                columns=["Start", "Finish", "Springing Level", "Soffit Level"],
+            self.opening_data = _read_table(
+                br_block[6 + self.section_nrows + 1 :],
+                [float, float, float, float],
+                ["Start", "Finish", "Springing Level", "Soffit Level"],
             )
 
         # Read USBPR type unit
@@ -218,33 +207,21 @@ class BRIDGE(Unit):
 
             # Read cross section data
             self.section_nrows = int(split_10_char(br_block[8])[0])
-            data_list = []
-            for row in br_block[9 : 9 + self.section_nrows]:
-                row_split = split_10_char(f"{row:<50}")
-                x = _to_float(row_split[0])  # chainage
-                y = _to_float(row_split[1])  # elevation
-                n = _to_float(row_split[2])  # Mannings
-                embankment = row_split[4]  # Embankment flag
-                data_list.append([x, y, n, embankment])
-            self.section_data = pd.DataFrame(
-                data_list, columns=["X", "Y", "Mannings n", "Embankments"]
+            self.section_data = _read_table(
+                br_block[9 : 9 + self.section_nrows],
+                # chainage, elevation, Mannings, (blank), Embankment flag
+                [float, float, float, None, str],
+                ["X", "Y", "Mannings n", "Embankments"],
             )
 
             # Read bridge opening data
             self.opening_nrows = int(split_10_char(br_block[9 + self.section_nrows])[0])
-            data_list = []
             start_row = 9 + self.section_nrows + 1
             end_row = start_row + self.opening_nrows
-            for row in br_block[start_row:end_row]:
-                row_split = split_10_char(f"{row:<40}")
-                start = _to_float(row_split[0])  # Start (m)
-                finish = _to_float(row_split[1])  # Finish (m)
-                spring = _to_float(row_split[2])  # Springing Level
-                soffit = _to_float(row_split[3])  # Soffit Level
-                data_list.append([start, finish, spring, soffit])
-            self.opening_data = pd.DataFrame(
-                data_list,
-                columns=["Start", "Finish", "Springing Level", "Soffit Level"],
+            self.opening_data = _read_table(
+                br_block[start_row:end_row],
+                [float, float, float, float],
+                ["Start", "Finish", "Springing Level", "Soffit Level"],
             )
 
             # Read flood relief culvert data
@@ -253,21 +230,12 @@ class BRIDGE(Unit):
                     br_block[9 + self.section_nrows + self.opening_nrows + 1]
                 )[0]
             )
-            data_list = []
             start_row = 9 + self.section_nrows + self.opening_nrows + 2
             end_row = start_row + self.culvert_nrows
-            for row in br_block[start_row:end_row]:
-                row_split = split_10_char(f"{row:<60}")
-                invert = _to_float(row_split[0])  # Invert
-                soffit = _to_float(row_split[1])  # Soffit
-                area = _to_float(row_split[2])  # Section Area
-                cd_part = _to_float(row_split[3])  # Cd Part Full
-                cd_full = _to_float(row_split[4])  # Cd Full
-                drown = _to_float(row_split[5])  # Drowning Coefficient
-                data_list.append([invert, soffit, area, cd_part, cd_full, drown])
-            self.culvert_data = pd.DataFrame(
-                data_list,
-                columns=[
+            self.culvert_data = _read_table(
+                br_block[start_row:end_row],
+                [float] * 6,
+                [
                     "Invert",
                     "Soffit",
                     "Section Area",
@@ -295,49 +263,30 @@ class BRIDGE(Unit):
 
             # Read US cross section data
             self.us_section_nrows = int(split_10_char(br_block[6])[0])
-            data_list = []
-            for row in br_block[7 : 7 + self.us_section_nrows]:
-                row_split = split_10_char(f"{row:<60}")
-                x = _to_float(row_split[0])  # chainage
-                y = _to_float(row_split[1])  # elevation
-                n = _to_float(row_split[2])  # Mannings
-                embankment = row_split[4]  # Embankment flag
-                top_level = row_split[5]  # Top Level (m)
-                data_list.append([x, y, n, embankment, top_level])
-            self.us_section_data = pd.DataFrame(
-                data_list, columns=["X", "Y", "Mannings n", "Embankments", "Top Level"]
+            self.us_section_data = _read_table(
+                br_block[7 : 7 + self.us_section_nrows],
+                # chainage, elevation, Mannings, (blank), Embankment flag, Top Level (m)
+                [float, float, float, None, str, str],
+                ["X", "Y", "Mannings n", "Embankments", "Top Level"],
             )
 
             # Read DS cross section data
             new_idx = 6 + 1 + self.us_section_nrows
             self.ds_section_nrows = int(split_10_char(br_block[new_idx])[0])
-            data_list = []
-            for row in br_block[new_idx + 1 : new_idx + 1 + self.ds_section_nrows]:
-                row_split = split_10_char(f"{row:<60}")
-                x = _to_float(row_split[0])  # chainage
-                y = _to_float(row_split[1])  # elevation
-                n = _to_float(row_split[2])  # Mannings
-                embankment = row_split[4]  # Embankment flag
-                top_level = row_split[5]  # Top Level (m)
-                data_list.append([x, y, n, embankment, top_level])
-            self.ds_section_data = pd.DataFrame(
-                data_list, columns=["X", "Y", "Mannings n", "Embankments", "Top Level"]
+            self.ds_section_data = _read_table(
+                br_block[new_idx + 1 : new_idx + 1 + self.ds_section_nrows],
+                # chainage, elevation, Mannings, (blank), Embankment flag, Top Level (m)
+                [float, float, float, None, str, str],
+                ["X", "Y", "Mannings n", "Embankments", "Top Level"],
             )
 
             # Read pier locations
             new_idx += 1 + self.ds_section_nrows
             self.pier_locs_nrows = int(split_10_char(br_block[new_idx])[0])
-            data_list = []
-            for row in br_block[new_idx + 1 : new_idx + 1 + self.pier_locs_nrows]:
-                row_split = split_10_char(f"{row:<40}")
-                l_x = _to_float(row_split[0])  # chainage
-                l_top_level = _to_float(row_split[1])  # Top Level (m)
-                r_x = _to_float(row_split[2])  # chainage
-                r_top_level = _to_float(row_split[3])  # Top Level (m)
-                data_list.append([l_x, l_top_level, r_x, r_top_level])
-            self.pier_locs_data = pd.DataFrame(
-                data_list,
-                columns=["Left X", "Left Top Level", "Right X", "Right Top Level"],
+            self.pier_locs_data = _read_table(
+                br_block[new_idx + 1 : new_idx + 1 + self.pier_locs_nrows],
+                [float, float, float, float],
+                ["Left X", "Left Top Level", "Right X", "Right Top Level"],
             )
 
         else:
@@ -806,14 +755,11 @@ class SLUICE(Unit):
         if self.control_method == "TIME":
             for gate in range(ngates):
                 nrows = int(split_10_char(block[gate_row + 1])[0])
-                data_list = []
-                for row in block[gate_row + 2 : gate_row + 2 + nrows]:
-                    row_split = split_10_char(f"{row:<20}")
-                    x = _to_float(row_split[0])  # time
-                    y = _to_float(row_split[1])  # opening
-                    data_list.append([x, y])
-
-                gate_data = pd.DataFrame(data_list, columns=["Time", "Opening"])
+                gate_data = _read_table(
+                    block[gate_row + 2 : gate_row + 2 + nrows],
+                    [float, float],  # time, opening
+                    ["Time", "Opening"],
+                )
                 gate_data = gate_data.set_index("Time")
                 gate_data = gate_data["Opening"]
 
@@ -828,15 +774,11 @@ class SLUICE(Unit):
         elif self.control_method == "LOGICAL":
             for gate in range(ngates):
                 nrows = int(split_10_char(block[gate_row + 1])[0])
-                data_list = []
-                for row in block[gate_row + 2 : gate_row + 2 + nrows]:
-                    row_split = split_10_char(f"{row:<30}")
-                    x = _to_float(row_split[0])  # time
-                    y = row_split[1]  # mode
-                    z = _to_float(row_split[2])  # opening
-                    data_list.append([x, y, z])
-
-                gate_data = pd.DataFrame(data_list, columns=["Time", "Mode", "Opening"])
+                gate_data = _read_table(
+                    block[gate_row + 2 : gate_row + 2 + nrows],
+                    [float, str, float],  # time, mode, opening
+                    ["Time", "Mode", "Opening"],
+                )
                 gate_data = gate_data.set_index("Time")
 
                 gates.append(gate_data)
@@ -21,6 +21,8 @@ from .sections import RIVER
 from .structures import BRIDGE, SLUICE, ORIFICE, SPILL, RNWEIR
 from .losses import BLOCKAGE, CULVERT
 from .conduits import CONDUIT
+from ._lazy import LazyUnitGroup
+from ._section_store import SectionStore
 
 ### UNIT TYPES AND SUPPORT ###
 SUPPORTED_UNIT_TYPES = {
@@ -17,6 +17,7 @@ address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London
 """ Holds the base unit class for all FM 1D units Units """
 
 from ..diff import check_item_with_dataframe_equal
+from ..validation import _validate_unit
 
 
 class UrbanUnit:
@@ -60,6 +61,10 @@ class UrbanUnit:
     def _write(self):
         raise NotImplementedError
 
+    def _validate(self):
+        """Checks the parameters of the unit are valid, as done when the unit is written"""
+        _validate_unit(self, urban=True)
+
     def _diff(self, other):
         diff = self._get_diff(other)
         if diff[0]:
@@ -14,9 +14,86 @@ If you have any query about this program or this License, please contact us at s
 address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
 """
 
+import gc
+import os
+import pickle
+import time
 import webbrowser
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional, Union
+
+from .dat import DAT
+from .ied import IED
+from .ief import IEF
+from .inp import INP
+
+# File classes which can be loaded with load_many(), keyed by file suffix
+_FILE_CLASSES = {".dat": DAT, ".ied": IED, ".inp": INP, ".ief": IEF}
 
 
 def open_docs():
     webbrowser.open_new_tab("https://help.floodmodeller.com/api/")
+
+
+def load_many(
+    paths: list, workers: Optional[int] = None, return_times: bool = False
+) -> Union[list, tuple]:
+    """Loads many DAT, IED, INP and IEF files at once, reading the files in parallel using a pool of processes. Each
+    file is read into its API class within a worker process, then passed back in its compact pickled form, so the
+    time taken to start a job that reads many files reduces with the number of processor cores available.
+
+    Args:
+        paths (list): Full filepaths of the files to load, the API class used is chosen from the file suffix
+        workers (int, optional): Number of worker processes. Defaults to the number of processor cores. If 1,
+            the files are read one at a time without starting any worker processes.
+        return_times (bool, optional): If True, the time taken to read each file is also returned. Defaults to False.
+
+    Returns:
+        list: API class instance for each file, in the same order as paths. If return_times is True, a tuple of this
+            list and a list of the time taken in seconds to read each file is returned.
+
+    Raises:
+        TypeError: Raised if any path is not a .dat, .ied, .inp or .ief file
+    """
+    paths = [Path(path) for path in paths]
+    for path in paths:
+        if path.suffix.lower() not in _FILE_CLASSES:
+            raise TypeError(
+                f"Cannot load {path}, only {', '.join(_FILE_CLASSES)} files are supported"
+            )
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(paths))
+
+    if workers <= 1:
+        results = [_load_file(path, serialize=False) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_load_file, paths))
+
+    files = []
+    # Unpickling creates many objects at once, which would otherwise trigger repeated garbage collection
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for file, _ in results:
+            files.append(pickle.loads(file) if isinstance(file, bytes) else file)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    if return_times:
+        return files, [load_time for _, load_time in results]
+    return files
+
+
+def _load_file(path, serialize=True):
+    """Reads a single file, returning the API class instance (pickled if serialize is True) and the time taken"""
+    start = time.perf_counter()
+    file = _FILE_CLASSES[path.suffix.lower()](path)
+    load_time = time.perf_counter() - start
+    if serialize:
+        file = pickle.dumps(file, protocol=pickle.HIGHEST_PROTOCOL)
+    return file, load_time
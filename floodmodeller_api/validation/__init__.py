@@ -1 +1 @@
-from .validation import _validate_unit
\ No newline at end of file
+from .validation import _validate_unit, _collect_validation_errors
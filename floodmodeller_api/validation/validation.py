@@ -14,9 +14,26 @@ If you have any query about this program or this License, please contact us at s
 address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
 """
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from .urban_parameters import urban_parameter_options
 from .parameters import parameter_options
 
+# List of error messages for invalid units, used to report every invalid unit together rather than stopping at the first
+_collected_errors = ContextVar("_collected_errors", default=None)
+
+
+@contextmanager
+def _collect_validation_errors():
+    """While active, invalid units are recorded in the returned list instead of raising an error"""
+    errors = []
+    token = _collected_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        _collected_errors.reset(token)
+
 
 def _validate_unit(unit, urban=False):
     """Validate parameters are the correct type for the unit"""
@@ -42,9 +59,12 @@ def _validate_unit(unit, urban=False):
                 if not value[0]
             ]
         )
-        raise ValueError(
-            f"One or more parameters in {unit.__repr__()} are invalid:\n     {errors}"
-        )
+        message = f"One or more parameters in {unit.__repr__()} are invalid:\n     {errors}"
+        collected_errors = _collected_errors.get()
+        if collected_errors is not None:
+            collected_errors.append(message)
+            return
+        raise ValueError(message)
 
 
 def _validate_parameter(param, value):
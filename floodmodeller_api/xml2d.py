@@ -204,7 +204,9 @@ class XML2D(FMFile):
                 self._multi_value_keys.append(elem.attrib["name"])
         self._multi_value_keys = set(self._multi_value_keys)
 
-    def diff(self, other: "XML2D", force_print: bool = False) -> None:
+    def diff(
+        self, other: "XML2D", force_print: bool = False, tolerance: float = 0.0
+    ) -> None:
         """Compares the XML2D class against another XML2D class to check whether they are
         equivalent, or if not, what the differences are. Two instances of a XML2D class are
         deemed equivalent if all of their attributes are equal except for the filepath and
@@ -220,8 +222,10 @@ class XML2D(FMFile):
             other (floodmodeller_api.XML2D): Other instance of a XML2D class
             force_print (bool): Forces the API to print every difference found, rather than
                 just the first 25 differences. Defaults to False.
+            tolerance (float): Numeric values which differ by no more than the tolerance are treated as equal,
+                e.g. 0.001 to ignore differences from values being rounded to 3 decimal places. Defaults to 0.0.
         """
-        self._diff(other, force_print=force_print)
+        self._diff(other, force_print=force_print, tolerance=tolerance)
 
     def update(self) -> None:
         """Updates the existing XML based on any altered attributes"""
@@ -14,7 +14,12 @@ If you have any query about this program or this License, please contact us at s
 address: Jacobs UK Limited, Flood Modeller, Cottons Centre, Cottons Lane, London, SE1 2QG, United Kingdom.
 """
 
-import ctypes as ct
+import copy
+import os
+import sys
+import threading
+import weakref
+from multiprocessing import resource_tracker, shared_memory
 from pathlib import Path
 from typing import Optional, Union
 
@@ -22,6 +27,7 @@ import pandas as pd
 import numpy as np
 
 from ._base import FMFile
+from ._zzn_read import LazyResults, read_zzl, select_results
 
 
 class ZZN(FMFile):
@@ -29,6 +35,13 @@ class ZZN(FMFile):
 
     Args:
         zzn_filepath (str): Full filepath to model zzn file
+        nodes (list, optional): Labels of the nodes to read results for. Defaults to None, to read all nodes.
+        variables (list, optional): Names of the variables to read, e.g. ``['Flow', 'Stage']``. Defaults to None,
+            to read all variables.
+        time_window (tuple, optional): First and last hour of the results to read. Defaults to None, to read the
+            results of the whole simulation.
+        stride (int, optional): Interval between the saved timesteps read, e.g. 2 to read every other saved
+            timestep. Defaults to 1.
 
     Output:
         Initiates 'ZZN' class object
@@ -36,17 +49,22 @@ class ZZN(FMFile):
 
     _filetype: str = "ZZN"
     _suffix: str = ".zzn"
+    _shared_memory: Optional[dict] = None
+    _node_index: Optional[dict] = None  # Column of each node label in the results, built when first needed
+    _time_index: Optional[pd.Index] = None
 
-    def __init__(self, zzn_filepath: Optional[Union[str, Path]]):
+    def __init__(
+        self,
+        zzn_filepath: Optional[Union[str, Path]],
+        nodes: Optional[list] = None,
+        variables: Optional[list] = None,
+        time_window: Optional[tuple] = None,
+        stride: int = 1,
+    ):
         try:
             self._filepath = zzn_filepath
             FMFile.__init__(self)
 
-            # Get zzn_dll path
-            zzn_dll = Path(Path(__file__).resolve().parent, "zzn_read.dll")
-            # Using str() method as CDLL doesn't seem to like accepting Path object
-            zzn_read = ct.CDLL(str(zzn_dll))
-
             # Get zzl path
             zzn = self._filepath
             zzl = zzn.with_suffix(".zzl")
@@ -55,124 +73,117 @@ class ZZN(FMFile):
                     "Error: Could not find associated .ZZL file. Ensure that the zzn results have an associated zzl file with matching name."
                 )
 
-            self.meta = {}  # Dict object to hold all metadata
-            self.data = {}  # Dict object to hold all data
-
-            # PROCESS_ZZL
-            self.meta["zzl_name"] = ct.create_string_buffer(
-                bytes(str(zzl), "utf-8"), 255
-            )
-            self.meta["zzn_name"] = ct.create_string_buffer(
-                bytes(str(zzn), "utf-8"), 255
-            )
-            self.meta["model_title"] = ct.create_string_buffer(b"", 128)
-            self.meta["nnodes"] = ct.c_int(0)
-            self.meta["label_length"] = ct.c_int(0)
-            self.meta["dt"] = ct.c_float(0.0)
-            self.meta["timestep0"] = ct.c_int(0)
-            self.meta["ltimestep"] = ct.c_int(0)
-            self.meta["save_int"] = ct.c_float(0.0)
-            self.meta["is_quality"] = ct.c_bool(False)
-            self.meta["nvars"] = ct.c_int(0)
-            self.meta["tzero"] = (ct.c_int * 5)()
-            self.meta["errstat"] = ct.c_int(0)
-            zzn_read.PROCESS_ZZL(
-                ct.byref(self.meta["zzl_name"]),
-                ct.byref(self.meta["model_title"]),
-                ct.byref(self.meta["nnodes"]),
-                ct.byref(self.meta["label_length"]),
-                ct.byref(self.meta["dt"]),
-                ct.byref(self.meta["timestep0"]),
-                ct.byref(self.meta["ltimestep"]),
-                ct.byref(self.meta["save_int"]),
-                ct.byref(self.meta["is_quality"]),
-                ct.byref(self.meta["nvars"]),
-                ct.byref(self.meta["tzero"]),
-                ct.byref(self.meta["errstat"]),
-            )
-            # PROCESS_LABELS
-            self.meta["labels"] = (
-                ct.c_char * self.meta["label_length"].value * self.meta["nnodes"].value
-            )()
-            zzn_read.PROCESS_LABELS(
-                ct.byref(self.meta["zzl_name"]),
-                ct.byref(self.meta["nnodes"]),
-                ct.byref(self.meta["labels"]),
-                ct.byref(self.meta["label_length"]),
-                ct.byref(self.meta["errstat"]),
-            )
-            # PREPROCESS_ZZN
-            last_hr = (
-                (self.meta["ltimestep"].value - self.meta["timestep0"].value)
-                * self.meta["dt"].value
-                / 3600
-            )
-            self.meta["output_hrs"] = (ct.c_float * 2)(0.0, last_hr)
-            self.meta["aitimestep"] = (ct.c_int * 2)(
-                self.meta["timestep0"].value, self.meta["ltimestep"].value
-            )
-            self.meta["isavint"] = (ct.c_int * 2)()
-            zzn_read.PREPROCESS_ZZN(
-                ct.byref(self.meta["output_hrs"]),
-                ct.byref(self.meta["aitimestep"]),
-                ct.byref(self.meta["dt"]),
-                ct.byref(self.meta["timestep0"]),
-                ct.byref(self.meta["ltimestep"]),
-                ct.byref(self.meta["save_int"]),
-                ct.byref(self.meta["isavint"]),
-            )
-            # PROCESS_ZZN
-            self.meta["node_ID"] = ct.c_int(-1)
-            self.meta["savint_skip"] = ct.c_int(1)
-            self.meta["savint_range"] = ct.c_int(
-                int(
-                    (
-                        (self.meta["isavint"][1] - self.meta["isavint"][0])
-                        / self.meta["savint_skip"].value
-                    )
-                )
-            )
-            nx = self.meta["nnodes"].value
-            ny = self.meta["nvars"].value
-            nz = self.meta["savint_range"].value + 1
-            self.data["all_results"] = (ct.c_float * nx * ny * nz)()
-            self.data["max_results"] = (ct.c_float * nx * ny)()
-            self.data["min_results"] = (ct.c_float * nx * ny)()
-            self.data["max_times"] = (ct.c_int * nx * ny)()
-            self.data["min_times"] = (ct.c_int * nx * ny)()
-            zzn_read.PROCESS_ZZN(
-                ct.byref(self.meta["zzn_name"]),
-                ct.byref(self.meta["node_ID"]),
-                ct.byref(self.meta["nnodes"]),
-                ct.byref(self.meta["is_quality"]),
-                ct.byref(self.meta["nvars"]),
-                ct.byref(self.meta["savint_range"]),
-                ct.byref(self.meta["savint_skip"]),
-                ct.byref(self.data["all_results"]),
-                ct.byref(self.data["max_results"]),
-                ct.byref(self.data["min_results"]),
-                ct.byref(self.data["max_times"]),
-                ct.byref(self.data["min_times"]),
-                ct.byref(self.meta["errstat"]),
-                ct.byref(self.meta["isavint"]),
+            # Dict object to hold all metadata, limited to the selected nodes, variables and saved timesteps
+            self.meta, selection = select_results(
+                read_zzl(zzl), nodes, variables, time_window, stride
             )
+            self.meta["zzn_name"] = str(zzn)
+            # Dict-like object to hold all data, with each array read from the zzn file when first used
+            self.data = LazyResults(zzn, self.meta, selection)
 
-            # Convert useful metadata from C types into python types
+        except Exception as e:
+            self._handle_exception(e, when="read")
 
-            self.meta["dt"] = self.meta["dt"].value
-            self.meta["nnodes"] = self.meta["nnodes"].value
-            self.meta["save_int"] = self.meta["save_int"].value
-            self.meta["nvars"] = self.meta["nvars"].value
-            self.meta["savint_range"] = self.meta["savint_range"].value
+    def __reduce__(self):
+        # Results arrays which have been read are moved into shared memory when the ZZN is pickled, so sending it
+        # to other processes only sends the names of the shared memory blocks rather than a copy of the results
+        selection = getattr(self.data, "_selection", None)
+        return (_load_shared_zzn, (self._filepath, self.meta, self._share_data(), selection))
+
+    def __deepcopy__(self, memo):
+        zzn = ZZN.__new__(ZZN)
+        state = {key: value for key, value in self.__dict__.items() if key != "_shared_memory"}
+        zzn.__dict__.update(copy.deepcopy(state, memo))
+        return zzn
+
+    def _share_data(self) -> dict:
+        """Moves the results arrays which have been read into shared memory, if not already done, returning the name,
+        shape and data type of the shared memory block holding each array"""
+        if self._shared_memory is None:
+            self._shared_memory = {}
+        created = {}
+        loaded = getattr(self.data, "_loaded_items", self.data.items)()
+        for key, values in loaded:
+            if key in self._shared_memory:
+                continue
+            arr = np.asarray(values)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            shared_arr = np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)
+            shared_arr[...] = arr
+            self.data[key] = shared_arr
+            created[key] = shm
+        if created:
+            self._shared_memory.update(created)
+            # Shared memory created here is released when this ZZN is deleted
+            weakref.finalize(self, _release_shared_memory, self.data, created, True)
+        return {
+            key: (shm.name, self.data[key].shape, self.data[key].dtype.str)
+            for key, shm in self._shared_memory.items()
+        }
+
+    def array(self, variable: str) -> np.ndarray:
+        """Returns the results of a single variable as a read-only view of the results read from the zzn file, so
+        that no results are copied however many times it is called
 
-            self.meta["zzn_name"] = self.meta["zzn_name"].value.decode()
-            self.meta["labels"] = [
-                label.value.decode().strip() for label in list(self.meta["labels"])
-            ]
-            self.meta["model_title"] = self.meta["model_title"].value.decode()
+        Args:
+            variable (str): 'Flow' | 'Stage' | 'Froude' | 'Velocity' | 'Mode' | 'State'
 
-        except Exception as e:
-            self._handle_exception(e, when="read")
+        Returns:
+            numpy.ndarray: Results of the variable, with one row for each saved timestep and one column for each node
+                in the order of ``meta['labels']``
+        """
+        return self._get_results_view()[:, self._get_variable_index(variable), :]
+
+    def get_series(self, label: str, variable: str, copy: Optional[bool] = True) -> pd.Series:
+        """Returns the results of a single variable at a single node as a series. This is much quicker than selecting
+        a column from the dataframe of all results, especially when getting the results of many nodes.
+
+        Args:
+            label (str): Label of the node
+            variable (str): 'Flow' | 'Stage' | 'Froude' | 'Velocity' | 'Mode' | 'State'
+            copy (bool, optional): If True, the series holds its own copy of the results and can be edited freely.
+                If False, the series is a read-only view of the results, which copies no results but raises an error
+                if edited. Defaults to True, so that series can be edited as with any other pandas series, which
+                means each call copies the results of the node.
+
+        Returns:
+            pandas.Series: Results of the variable at the node, indexed by time in hours
+        """
+        if self._node_index is None:
+            self._node_index = {}
+            for idx, node in enumerate(self.meta["labels"]):
+                self._node_index.setdefault(node, idx)
+        if label not in self._node_index:
+            raise ValueError(f"'{label}' is not a node label in the results")
+        if self._time_index is None:
+            self._time_index = pd.Index(self._get_time_index(), name="Time (hr)")
+
+        values = self.array(variable)[:, self._node_index[label]]
+        if copy:
+            values = values.copy()
+        return pd.Series(values, index=self._time_index, name=label)
+
+    def _get_variable_index(self, variable):
+        variable = variable.strip().capitalize()
+        if variable not in self.meta["variables"]:
+            raise ValueError(
+                f"'{variable}' is not a valid variable name. Valid arguments are: {self.meta['variables']}"
+            )
+        return self.meta["variables"].index(variable)
+
+    def _get_results_view(self) -> np.ndarray:
+        """Returns a read-only view of all results, so dataframes built on it cannot change the results"""
+        view = np.asarray(self.data["all_results"]).view()
+        view.flags.writeable = False
+        return view
+
+    def _get_time_index(self) -> np.ndarray:
+        """Returns the time in hours of each saved timestep read"""
+        nz = self.meta["savint_range"] + 1
+        first, skip = self.meta["isavint"][0], self.meta["savint_skip"]
+        last = first + (nz - 1) * skip
+        save_hrs = self.meta["save_int"] / 3600
+        return np.linspace(first * save_hrs, last * save_hrs, nz)
 
     def to_dataframe(
         self,
@@ -180,6 +191,7 @@ class ZZN(FMFile):
         variable: Optional[str] = "all",
         include_time: Optional[bool] = False,
         multilevel_header: Optional[bool] = True,
+        copy: Optional[bool] = True,
     ) -> pd.DataFrame:
         """Loads zzn results to pandas dataframe object.
 
@@ -193,6 +205,11 @@ class ZZN(FMFile):
             multilevel_header (bool, optional): If True, the returned dataframe will have multi-level column
                 headers with the variable as first level and node label as second header. If False, the column
                 names will be formatted "{node label}_{variable}". Defaults to True.
+            copy (bool, optional): If True, the dataframe holds its own copy of the results and can be edited freely.
+                If False, the dataframe is built on a read-only view of the results, which is quicker for large zzn
+                files but raises an error if edited. Defaults to True, so dataframes can still be edited as in
+                previous versions, but this copies the results on every call. Use ``copy=False``, or ``array()``
+                for the results of a single variable, to read results without copying them.
 
         Returns:
             pandas.DataFrame(): dataframe object of simulation results
@@ -204,11 +221,24 @@ class ZZN(FMFile):
 
         if result_type == "all":
 
-            arr = np.array(self.data["all_results"])
-            time_index = np.linspace(
-                self.meta["output_hrs"][0], self.meta["output_hrs"][1], nz
-            )
-            vars = ["Flow", "Stage", "Froude", "Velocity", "Mode", "State"]
+            arr = self._get_results_view()
+            if copy:
+                arr = arr.copy()
+            time_index = self._get_time_index()
+            vars = self.meta["variables"]
+            if not variable == "all":
+                # Single variable is taken as a view of the results, rather than selected from all results
+                var = vars[self._get_variable_index(variable)]
+                col_names = self.meta["labels"]
+                if not multilevel_header:
+                    col_names = [f"{node}_{var}" for node in col_names]
+                values = self.array(var)
+                if copy:
+                    values = values.copy()
+                df = pd.DataFrame(values, index=time_index, columns=col_names)
+                df.index.name = "Time (hr)"
+                return df
+
             if multilevel_header:
                 col_names = [vars, self.meta["labels"]]
                 df = pd.DataFrame(
@@ -217,8 +247,6 @@ class ZZN(FMFile):
                     columns=pd.MultiIndex.from_product(col_names),
                 )
                 df.index.name = "Time (hr)"
-                if not variable == "all":
-                    return df[variable.capitalize()]
 
             else:
                 col_names = [
@@ -228,34 +256,23 @@ class ZZN(FMFile):
                     arr.reshape(nz, nx * ny), index=time_index, columns=col_names
                 )
                 df.index.name = "Time (hr)"
-                if not variable == "all":
-                    use_cols = [
-                        col for col in df.columns if col.endswith(variable.capitalize())
-                    ]
-                    return df[use_cols]
             return df
 
         elif (result_type == "max") or (result_type == "min"):
-            arr = np.array(self.data[f"{result_type}_results"]).transpose()
+            arr = np.array(self.data[f"{result_type}_results"], copy=copy).transpose()
+            if not copy:
+                arr.flags.writeable = False
             node_index = self.meta["labels"]
             col_names = [
-                result_type.capitalize() + lbl
-                for lbl in [
-                    " Flow",
-                    " Stage",
-                    " Froude",
-                    " Velocity",
-                    " Mode",
-                    " State",
-                ]
+                f"{result_type.capitalize()} {var}" for var in self.meta["variables"]
             ]
             df = pd.DataFrame(arr, index=node_index, columns=col_names)
             df.index.name = "Node Label"
 
             if include_time:
                 times = np.array(self.data[f"{result_type}_times"]).transpose()
-                # transform timestep into hrs
-                times = ((times - self.meta["timestep0"]) * self.meta["dt"]) / 3600
+                # transform position of saved timestep into hrs
+                times = self._get_time_index()[times - 1]
                 time_col_names = [name + " Time(hrs)" for name in col_names]
                 time_df = pd.DataFrame(times, index=node_index, columns=time_col_names)
                 time_df.index.name = "Node Label"
@@ -330,18 +347,26 @@ class ZZN(FMFile):
             )
 
         df = self.to_dataframe(
-            result_type=result_type, variable=variable, include_time=include_time
+            result_type=result_type,
+            variable=variable,
+            include_time=include_time,
+            copy=False,
         )
         df.to_csv(save_location)
         print(f"CSV saved to {save_location}")
 
-    def to_dict_of_dataframes(self, variable: Optional[str] = "all") -> dict:
+    def to_dict_of_dataframes(
+        self, variable: Optional[str] = "all", copy: Optional[bool] = True
+    ) -> dict:
         """Loads zzn results to a dictionary of pandas dataframe objects.
 
         Args:
             variable (str, optional): {'all'} | 'Flow' | 'Stage' | 'Froude' | 'Velocity' | 'Mode' | 'State'
                 Specify a single output variable (e.g 'flow' or 'stage') or any combination passed as comma separated
                 variable names. Defaults to 'all'.
+            copy (bool, optional): If True, the dataframes hold their own copy of the results and can be edited freely.
+                If False, the dataframes are built on a read-only view of the results, which is quicker for large zzn
+                files but raises an error if edited. Defaults to True, which copies all results on every call.
 
         Returns:
             dict: dictionary of dataframe object of simulation results, keys corresponding to variables.
@@ -351,12 +376,12 @@ class ZZN(FMFile):
         nz = self.meta["savint_range"] + 1
         output = {}
 
-        arr = np.array(self.data["all_results"])
-        time_index = np.linspace(
-            self.meta["output_hrs"][0], self.meta["output_hrs"][1], nz
-        )
+        arr = self._get_results_view()
+        if copy:
+            arr = arr.copy()
+        time_index = self._get_time_index()
 
-        vars = ["Flow", "Stage", "Froude", "Velocity", "Mode", "State"]
+        vars = self.meta["variables"]
 
         col_names = self.meta["labels"]
         temp_arr = np.reshape(arr, (nz, ny, nx))
@@ -382,3 +407,71 @@ class ZZN(FMFile):
                 if not var in input_vars:
                     del output[var]
         return output
+
+
+def _load_shared_zzn(zzn_filepath, meta, shared, selection=None):
+    """Creates a ZZN from a pickled ZZN, with read-only results arrays held in the shared memory of the original.
+    Results which had not been read by the original are read from the file when first used."""
+    zzn = ZZN.__new__(ZZN)
+    zzn._filepath = zzn_filepath
+    zzn.meta = meta
+    zzn.data = LazyResults(zzn_filepath, meta, selection)
+    zzn._shared_memory = {}
+    try:
+        for key, (name, shape, dtype) in shared.items():
+            shm = _attach_shared_memory(name)
+            zzn._shared_memory[key] = shm
+            zzn.data[key] = np.ndarray(shape, dtype, buffer=shm.buf)
+            zzn.data[key].flags.writeable = False
+    except FileNotFoundError:
+        # Shared memory has already been released by the original ZZN, so the results are read again when used
+        _release_shared_memory(zzn.data, zzn._shared_memory, False)
+        zzn.data = LazyResults(zzn_filepath, meta, selection)
+        zzn._shared_memory = {}
+        return zzn
+    weakref.finalize(zzn, _release_shared_memory, zzn.data, zzn._shared_memory, False)
+    return zzn
+
+
+# Before Python 3.13, shared memory is registered with the resource tracker whenever it is attached on POSIX systems
+_ATTACH_REGISTERS = os.name == "posix" and sys.version_info < (3, 13)
+_attach_lock = threading.Lock()
+
+
+def _attach_shared_memory(name):
+    """Attaches to a shared memory block created by another ZZN without registering it with the resource tracker.
+    Only the process which created the block unlinks it, otherwise the resource tracker of the attaching process
+    would unlink it and warn of a leak when that process exits. Unregistering after attaching is not enough, as
+    processes sharing a resource tracker would unregister each other's blocks."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    if not _ATTACH_REGISTERS:
+        return shared_memory.SharedMemory(name=name)
+
+    register = resource_tracker.register
+
+    def register_unless_attached(resource_name, rtype):
+        if rtype != "shared_memory" or resource_name.lstrip("/") != name.lstrip("/"):
+            register(resource_name, rtype)
+
+    with _attach_lock:
+        resource_tracker.register = register_unless_attached
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _release_shared_memory(data, blocks, unlink):
+    data.clear()
+    for shm in blocks.values():
+        try:
+            shm.close()
+        except BufferError:
+            # Results arrays are still in use elsewhere, so the block stays mapped until they are deleted
+            pass
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -16,9 +16,7 @@ os.chdir(script_loc) # Set current working directory to this script location
 # Initialise ZZN class 
 zzn = ZZN('sample_data/ex3.zzn')
 
-# Export results to dataframe
-results_df = zzn.to_dataframe(result_type='all')
 node = 'm60' # node label for which we want the results
-series = results_df['Flow'][node] # Access series data for 'm60_Flow'
+series = zzn.get_series(node, 'Flow') # Access series data for 'm60_Flow'
 
 print(series) # print series to console
\ No newline at end of file
@@ -1,13 +1,44 @@
 import unittest
 import sys
 import os
+import copy
+import multiprocessing
+import pickle
+import subprocess
+import tempfile
+from unittest.mock import patch
 
 # sys.path.insert(0, os.getcwd())
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from floodmodeller_api import IEF, IED, DAT, ZZN, INP, XML2D, LF1
+from floodmodeller_api import (
+    IEF,
+    IED,
+    DAT,
+    ZZN,
+    INP,
+    XML2D,
+    LF1,
+    UnitIndex,
+    cache,
+    load_many,
+)
 from floodmodeller_api.units import QTBDY
+from floodmodeller_api.diff import _diff_options
+from floodmodeller_api.units.helpers import (
+    decode_fixed_width,
+    format_10_char,
+    join_10_char,
+    split_10_char,
+    _to_data_list,
+    _to_float,
+    _to_int,
+)
+from floodmodeller_api.dat import iter_units as iter_dat_units
+from floodmodeller_api.ied import iter_units as iter_ied_units
+from floodmodeller_api._tokenizer import BLOCK_TYPES, iter_blocks, tokenize
 
 test_workspace = os.path.join(os.path.dirname(__file__), "test_data")
 
@@ -43,13 +74,48 @@ class test_IED(unittest.TestCase):
         ied = IED(self.ied_fp)
         self.assertEqual(ied._write(), self.data_before)
 
+    def test_2(self):
+        """IED: Check streamed units match those read into the IED class"""
+        ied = IED(self.ied_fp)
+        streamed = list(iter_ied_units(self.ied_fp))
+        self.assertEqual(len(streamed), len(ied.boundaries))
+        for unit in streamed:
+            self.assertEqual(unit, ied.boundaries[unit.name])
+
+    def test_3(self):
+        """IED: Check saves within a batch of edits are written once the batch exits"""
+        ied = IED(self.ied_fp)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_fp = os.path.join(temp_dir, "batch.ied")
+            with ied.batch():
+                ied.boundaries["CS26"].name = "CS26x"
+                ied.save(temp_fp)
+                self.assertFalse(os.path.exists(temp_fp))
+            self.assertIn("CS26x", IED(temp_fp).boundaries)
+
+    def test_4(self):
+        """IED: Check the content hash of the IED only changes when a unit is edited"""
+        ied = IED(self.ied_fp)
+        other_ied = IED(self.ied_fp)
+        self.assertEqual(ied.hash_tree(), other_ied.hash_tree())
+        other_ied.boundaries["CS26"].flowmultiplier = 2.0
+        tree = other_ied.hash_tree()
+        self.assertNotEqual(tree["hash"], ied.hash_tree()["hash"])
+        self.assertNotEqual(
+            tree["groups"]["boundaries"]["units"]["CS26"],
+            ied.hash_tree()["groups"]["boundaries"]["units"]["CS26"],
+        )
+        result, diff = ied._get_diff(other_ied)
+        self.assertFalse(result)
+        self.assertEqual(len(diff), 1)
+
 
 class test_DAT(unittest.TestCase):
     """Basic benchmarking to test DAT class"""
 
     def setUp(self):
         """Used if there is repetative setup before each test"""
-        self.dat_fp = os.path.join(test_workspace, "network.DAT")
+        self.dat_fp = os.path.join(test_workspace, "network.dat")
         self.data_before = DAT(self.dat_fp)._write()
 
     def test_1(self):
@@ -98,6 +164,527 @@ class test_DAT(unittest.TestCase):
         except FileNotFoundError:
             pass
 
+    def test_5(self):
+        """DAT: Check lazy DAT only reads accessed units and matches a fully read DAT"""
+        dat = DAT(self.dat_fp)
+        lazy_dat = DAT(self.dat_fp, lazy=True)
+        self.assertEqual(lazy_dat.sections._loaded_items(), [])
+        self.assertEqual(
+            lazy_dat.sections["CSRD10"].dist_to_next,
+            dat.sections["CSRD10"].dist_to_next,
+        )
+        self.assertEqual(len(lazy_dat.sections._loaded_items()), 1)
+        self.assertEqual(dat, lazy_dat)
+
+    def test_6(self):
+        """DAT: Check only units which have been changed are written again"""
+        with open(self.dat_fp, "r") as dat_file:
+            raw_data = dat_file.read()
+        dat = DAT(self.dat_fp)
+        self.assertEqual(dat._write(), raw_data)
+
+        dat.sections["CSRD10"].dist_to_next = 0.0
+        self.assertNotEqual(dat._write(), raw_data)
+        for name, unit in dat.sections.items():
+            if name != "CSRD10":
+                self.assertIs(unit._get_block(), unit._read_state[1])
+
+        struct = [block.copy() for block in dat._dat_struct]
+        dat._update_dat_struct()
+        self.assertEqual(struct, dat._dat_struct)
+
+    def test_7(self):
+        """DAT: Check block tokenizer skips comments and treats GISINFO as the final block"""
+        lines = [
+            "general line",
+            "END GENERAL",
+            "COMMENT",
+            "2",
+            "RIVER",
+            "QTBDY",
+            "COMMENT",
+            "0",
+            "QH  CONTROL here",
+            "QTBDY",
+            "GISINFO",
+            "RIVER",
+        ]
+        self.assertEqual(
+            list(iter_blocks(lines, has_general=True)),
+            [
+                ("GENERAL", 0, 1),
+                ("COMMENT", 2, 5),
+                ("COMMENT", 6, 7),
+                ("QH CONTROL", 8, 8),
+                ("QTBDY", 9, 9),
+                ("GISINFO", 10, 11),
+            ],
+        )
+        dat = DAT(self.dat_fp)
+        struct = tokenize(dat._raw_data, has_general=True)
+        self.assertEqual(
+            [(BLOCK_TYPES[t], s, e) for t, s, e in struct.tolist()],
+            [(b["Type"], b["start"], b["end"]) for b in dat._dat_struct],
+        )
+
+    def test_8(self):
+        """DAT: Check streamed units match those read into the DAT class"""
+        dat = DAT(self.dat_fp)
+        rivers = list(iter_dat_units(self.dat_fp, types=["RIVER"]))
+        self.assertEqual(
+            [unit.name for unit in rivers],
+            [name for name, unit in dat.sections.items() if unit._unit == "RIVER"],
+        )
+        for unit in rivers:
+            self.assertEqual(unit, dat.sections[unit.name])
+        self.assertEqual(list(iter_dat_units(self.dat_fp))[-1], dat.initial_conditions)
+        with self.assertRaises(ValueError):
+            next(iter_dat_units(self.dat_fp, types=["COMMENT"]))
+
+    def test_9(self):
+        """DAT: Check units read using the byte offset index match those read into the DAT class"""
+        dat = DAT(self.dat_fp)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_fp = os.path.join(temp_dir, "network.dat.idx")
+            index = UnitIndex(self.dat_fp, index_fp)
+            self.assertTrue(os.path.exists(index_fp))
+            self.assertEqual(UnitIndex(self.dat_fp, index_fp)._units, index._units)
+            self.assertEqual(index.read_unit("CSRD10"), dat.sections["CSRD10"])
+            self.assertEqual(index.read_unit("CS26", "QTBDY"), dat.boundaries["CS26"])
+            with self.assertRaises(ValueError):
+                index.read_unit("CS26")
+
+    def test_10(self):
+        """DAT: Check DAT read from the parse cache matches the DAT read from file"""
+        cache_dir, max_size = cache.CACHE_DIR, cache.MAX_CACHE_SIZE
+        cache.CACHE_DIR = Path(test_workspace, "__temp_cache")
+        try:
+            dat = DAT(self.dat_fp, cache=True)
+            self.assertEqual(len(list(cache.CACHE_DIR.glob("*.fmcache"))), 1)
+            cached_dat = DAT(self.dat_fp, cache=True)
+            self.assertEqual(dat, cached_dat)
+            self.assertEqual(cached_dat._write(), self.data_before)
+
+            # Entries are evicted once the cache is too large
+            cache.MAX_CACHE_SIZE = 1
+            DAT(self.dat_fp, lazy=True, cache=True)
+            self.assertEqual(len(list(cache.CACHE_DIR.glob("*.fmcache"))), 0)
+            cache.MAX_CACHE_SIZE = max_size
+
+            # Editing the .gxy invalidates the cached DAT
+            with tempfile.TemporaryDirectory() as temp_dir:
+                dat_fp = Path(temp_dir, "EX1.DAT")
+                gxy_fp = dat_fp.with_suffix(".gxy")
+                dat_fp.write_bytes(Path(test_workspace, "EX1.DAT").read_bytes())
+                gxy_fp.write_bytes(Path(test_workspace, "EX1.gxy").read_bytes())
+                gxy_data = DAT(dat_fp, cache=True)._gxy_data
+                self.assertEqual(DAT(dat_fp, cache=True)._gxy_data, gxy_data)
+                with open(gxy_fp, "a") as gxy_file:
+                    gxy_file.write("\n[Extra]\n")
+                self.assertEqual(
+                    DAT(dat_fp, cache=True)._gxy_data, gxy_data + "\n[Extra]\n"
+                )
+                os.remove(gxy_fp)
+                self.assertIsNone(DAT(dat_fp, cache=True)._gxy_data)
+        finally:
+            cache.clear()
+            cache.CACHE_DIR.rmdir()
+            cache.CACHE_DIR, cache.MAX_CACHE_SIZE = cache_dir, max_size
+
+    def test_11(self):
+        """DAT: Check river section data is a view of the columnar section store"""
+        dat = DAT(self.dat_fp)
+        store = dat.cross_sections
+        rivers = [unit for unit in dat.sections.values() if unit._unit == "RIVER"]
+        self.assertEqual(store.labels, [unit.name for unit in rivers])
+        bed_levels = store.aggregate("Y", "min")
+        for unit in rivers:
+            self.assertEqual(bed_levels[unit.name], unit.data["Y"].min())
+
+        # Edits made to the store are seen by each section and vice versa
+        store.table.loc[:, "Mannings n"] = 0.05
+        self.assertTrue((dat.sections["CSRD10"].data["Mannings n"] == 0.05).all())
+        dat.sections["CSRD10"].data.loc[0, "Y"] = 100.0
+        self.assertEqual(store.aggregate("Y", "max")["CSRD10"], 100.0)
+
+        # Pickling or copying a section only copies its own rows
+        for section in (
+            pickle.loads(pickle.dumps(dat.sections["CSRD10"])),
+            copy.deepcopy(dat.sections["CSRD10"]),
+        ):
+            self.assertEqual(section._section_store.labels, ["CSRD10"])
+            self.assertEqual(section._section_store.offsets[-1], len(section.data))
+            pd.testing.assert_frame_equal(section.data, dat.sections["CSRD10"].data)
+        unpickled_dat = pickle.loads(pickle.dumps(dat))
+        self.assertEqual(unpickled_dat, dat)
+        pd.testing.assert_frame_equal(unpickled_dat.cross_sections.table, store.table)
+
+        # Store is rebuilt if the number of rows in a section changes
+        dat.sections["CSRD10"].data = dat.sections["CSRD10"].data.iloc[:3]
+        self.assertEqual(dat.cross_sections.aggregate("Y", "count")["CSRD10"], 3)
+        self.assertEqual(DAT(self.dat_fp, lazy=True), DAT(self.dat_fp))
+
+    def test_12(self):
+        """DAT: Check fixed width decoder matches reading each field with _to_float and _to_int"""
+        block = [
+            "     0.000    69.940     0.025*    1.000LEFT         123.4   -5.0E+1          0",
+            "",
+            "       abc              -0.000                                         x     7",
+            "  1234.567     1_000",
+        ]
+        x, y, marker, sp_marker = decode_fixed_width(
+            block, [float, (float, 1.0), None, None, str, None, None, None, int]
+        )
+        for idx, row in enumerate(block):
+            row_split = split_10_char(f"{row:<90}")
+            self.assertEqual(x[idx], _to_float(row_split[0]))
+            self.assertEqual(y[idx], _to_float(row_split[1], 1.0))
+            self.assertEqual(marker[idx], row_split[4])
+            self.assertEqual(sp_marker[idx], _to_int(row_split[8]))
+        self.assertEqual(decode_fixed_width([], [float, str])[0].shape, (0,))
+
+        # Rows of data tables only have the fields they contain, rather than being padded to the longest row
+        ragged = [
+            "     1.000     0.000",
+            "     2.000",
+            "",
+            "     3.000     2.000     9.000",
+        ]
+        self.assertEqual(
+            _to_data_list(ragged), [[1.0, 0.0], [2.0], [], [3.0, 2.0, 9.0]]
+        )
+        self.assertEqual(
+            _to_data_list(ragged, num_cols=2), [[1.0, 0.0], [2.0], [], [3.0, 2.0]]
+        )
+        dated = ["     1.00001/01/2000     12:00", "     2.00002/01/2000"]
+        self.assertEqual(
+            _to_data_list(dated, date_col=1),
+            [[1.0, "01/01/2000 12:00"], [2.0, "02/01/2000"]],
+        )
+
+    def test_13(self):
+        """DAT: Check columns formatted in bulk match join_10_char, including switching to scientific notation"""
+        values = pd.Series(
+            [
+                0.0,
+                -0.0,
+                1.2345,
+                999999.9994,
+                999999.9995,
+                -99999.9996,
+                1e100,
+                -1e-7,
+                float("nan"),
+            ]
+        )
+        self.assertEqual(format_10_char(values), [join_10_char(itm) for itm in values])
+        self.assertEqual(
+            format_10_char(values, dp=6), [join_10_char(itm, dp=6) for itm in values]
+        )
+        mixed = pd.Series(["LEFT", 2, 3.5, None], dtype=object)
+        self.assertEqual(format_10_char(mixed), [join_10_char(itm) for itm in mixed])
+
+    def test_14(self):
+        """DAT: Check network topology queries and incremental renaming"""
+        dat = DAT(self.dat_fp)
+        network = dat.network
+        self.assertEqual(network.neighbours("CSRD10", links=("reach",)), ["CSRD09"])
+        self.assertIn("CSRD10", network.upstream("CSRD09"))
+        self.assertNotIn("CSRD10", network.downstream("CSRD09"))
+        self.assertEqual(network.reach("CSRD10"), ["CSRD12d", "CSRD10", "CSRD09"])
+        # Spill labels link a river section to the spill in both directions
+        self.assertIn("RD25Su", network.neighbours("CSRD25"))
+        self.assertIn("RD25Su", network.neighbours("CSRD25", direction="upstream"))
+
+        # Building from a lazy DAT gives the same network without reading units
+        lazy_dat = DAT(self.dat_fp, lazy=True)
+        self.assertEqual(lazy_dat.network.labels, network.labels)
+        self.assertTrue((lazy_dat.network.links == network.links).all())
+        self.assertEqual(len(lazy_dat.sections._loaded_items()), 0)
+
+        # Renaming a unit renames its node in place
+        dat.sections["CSRD10"].name = "CSRD10x"
+        dat._write()
+        self.assertIs(dat.network, network)
+        self.assertEqual(network.reach("CSRD09"), ["CSRD12d", "CSRD10x", "CSRD09"])
+
+    def test_15(self):
+        """DAT: Check renaming many units at once, including swapping labels and labels sharing a prefix"""
+        dat = DAT(os.path.join(test_workspace, "EX1.DAT"))
+        dat.rename_units({"S1": "S10", "S10": "S1", "CC10": "S2"})
+        self.assertEqual(dat.sections["S1"].name, "S1")
+        self.assertEqual(list(dat.sections)[:3], ["S10", "S2", "S3"])
+        self.assertEqual(dat.boundaries["S1"].name, "S1")
+        self.assertIn("[RIVER_SECTION_S2]", dat._gxy_data)
+        self.assertIn("1=QTBDY__S10,RIVER_SECTION_S10", dat._gxy_data)
+        self.assertEqual(dat.initial_conditions.data["label"].iloc[0], "S10")
+
+        # Renaming back gives the original file
+        dat.rename_units({"S1": "S10", "S10": "S1", "S2": "CC10"})
+        original = DAT(os.path.join(test_workspace, "EX1.DAT"))
+        self.assertEqual(dat._write(), original._write())
+        self.assertEqual(dat._gxy_data, original._gxy_data)
+
+        with self.assertRaises(KeyError):
+            dat.rename_units({"not_a_unit": "S1"})
+        with self.assertRaises(Exception):
+            dat.rename_units({"CC10": "S3"})
+        self.assertEqual(dat.sections["CC10"].name, "CC10")
+
+    def test_16(self):
+        """DAT: Check inserting and removing units, including into a lazy and a blank DAT"""
+        for lazy in [False, True]:
+            dat = DAT(self.dat_fp, lazy=lazy)
+            node_count = dat.general_parameters["Node Count"]
+            section = dat.sections["CS25"]
+            new_section = copy.deepcopy(section)
+            new_section.name = "CS25a"
+            dat.insert_unit(new_section, add_after=section)
+            another_section = copy.deepcopy(section)
+            another_section.name = "CS25b"
+            dat.insert_unit(another_section, add_before=new_section)
+            dat.remove_unit(dat.sections["CS24"])
+            with self.assertRaises(Exception):
+                dat.insert_unit(copy.deepcopy(section))  # Label already exists
+
+            self.assertEqual(
+                dat.network.reach("CS25")[:4], ["CS26", "CS25", "CS25b", "CS25a"]
+            )
+            dat_str = dat._write()
+            self.assertEqual(dat.general_parameters["Node Count"], node_count + 1)
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                temp_fp = os.path.join(temp_dir, "inserted.dat")
+                with open(temp_fp, "w") as dat_file:
+                    dat_file.write(dat_str)
+                new_dat = DAT(temp_fp)
+            self.assertEqual(list(new_dat.sections)[1:4], ["CS25", "CS25b", "CS25a"])
+            self.assertNotIn("CS24", new_dat.sections)
+            self.assertEqual(new_dat.sections["CS25a"], new_section)
+            self.assertEqual(
+                new_dat.initial_conditions.data["label"].tolist()[-2:],
+                ["CS25a", "CS25b"],
+            )
+            self.assertEqual(new_dat._write(), dat_str)
+
+        blank_dat = DAT()
+        blank_dat.insert_unit(copy.deepcopy(section))
+        blank_dat.insert_unit(
+            copy.deepcopy(dat.boundaries["CS26"]), add_before=blank_dat.sections["CS25"]
+        )
+        blank_dat._write()
+        self.assertEqual(
+            [block["Type"] for block in blank_dat._dat_struct],
+            ["GENERAL", "QTBDY", "RIVER", "INITIAL CONDITIONS"],
+        )
+
+    def test_17(self):
+        """DAT: Check a batch of edits is written once when it exits, with every error reported together"""
+        dat = DAT(self.dat_fp)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_fp = os.path.join(temp_dir, "batch.dat")
+            with dat.batch():
+                for section in dat.sections.values():
+                    section.dist_to_next += 1.0
+                    dat.save(temp_fp)
+                dat.rename_units({"CS25": "CS25x"})
+                self.assertIn(
+                    "CS25", dat.sections
+                )  # Labels are updated when the batch exits
+                self.assertFalse(os.path.exists(temp_fp))
+            self.assertIn("CS25x", dat.sections)
+            saved_dat = DAT(temp_fp)
+            self.assertEqual(
+                saved_dat.sections["CS25x"].dist_to_next,
+                dat.sections["CS25x"].dist_to_next,
+            )
+            self.assertEqual(saved_dat._write(), dat._write())
+
+            dat.sections["CS24"].dist_to_next = "a"
+            dat.sections["CS23"].dist_to_next = "b"
+            dat.sections["CS22"].name = "CS21"
+            with self.assertRaises(ValueError) as error:
+                with dat.batch():
+                    dat.update()
+            self.assertIn("3 error(s)", str(error.exception))
+            self.assertEqual(saved_dat._write(), DAT(temp_fp)._write())
+
+    def test_18(self):
+        """DAT: Check loading many files in parallel gives the same classes as loading each file"""
+        paths = [
+            self.dat_fp,
+            os.path.join(test_workspace, "EX1.DAT"),
+            os.path.join(test_workspace, "network.ied"),
+            os.path.join(test_workspace, "network.inp"),
+            os.path.join(test_workspace, "ex3.ief"),
+        ]
+        files, load_times = load_many(paths, workers=2, return_times=True)
+        self.assertEqual(len(load_times), len(paths))
+        for path, file in zip(paths, files):
+            expected = type(file)(path)
+            self.assertEqual(file, expected)
+            self.assertEqual(file._write(), expected._write())
+        self.assertEqual(
+            [type(file) for file in load_many(paths[:3], workers=1)], [DAT, DAT, IED]
+        )
+        with self.assertRaises(TypeError):
+            load_many([os.path.join(test_workspace, "ex3.lf1")])
+
+    def test_19(self):
+        """DAT: Check edits to a clone are written without affecting the original, or other clones"""
+        dat = DAT(self.dat_fp)
+        original = dat._write()
+        base = dat.clone()
+        self.assertEqual(base, dat)
+        self.assertEqual(base._write(), original)
+
+        variant = base.clone()
+        variant.sections["CS25"].data["Mannings n"] *= 2
+        variant.sections["CS24"].dist_to_next += 1.0
+        self.assertNotEqual(variant, dat)
+        self.assertEqual(dat._write(), original)
+        self.assertEqual(base._write(), original)
+        self.assertEqual(variant.sections["CS23"], dat.sections["CS23"])
+        self.assertEqual(
+            variant.sections["CS25"].data["Mannings n"].tolist(),
+            (dat.sections["CS25"].data["Mannings n"] * 2).tolist(),
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_fp = os.path.join(temp_dir, "variant.dat")
+            variant.save(temp_fp)
+            self.assertEqual(DAT(temp_fp), variant)
+            self.assertEqual(dat._write(), original)
+
+    def test_20(self):
+        """DAT: Check section properties against a rectangular channel, and that only edited sections are recomputed"""
+        dat = DAT(self.dat_fp)
+        section = dat.sections["CS25"]
+        section.data = pd.DataFrame(
+            {
+                "X": [0.0, 0.0, 5.0, 10.0, 10.0],
+                "Y": [10.0, 0.0, 0.0, 0.0, 10.0],
+                "Mannings n": [0.03] * 5,
+                "Panel": [False] * 5,
+                "RPL": [0.0] * 5,
+                "Marker": [""] * 5,
+                "Easting": [0.0] * 5,
+                "Northing": [0.0] * 5,
+                "Deactivation": [""] * 5,
+                "SP. Marker": [0] * 5,
+            }
+        )
+        properties = dat.section_properties(stages=[0.0, 2.0])
+        self.assertEqual(len(properties), 2 * len(dat.cross_sections))
+        rectangle = properties.loc[("CS25", 2.0)]
+        self.assertAlmostEqual(rectangle["Area"], 20.0)
+        self.assertAlmostEqual(rectangle["Wetted Perimeter"], 14.0)
+        self.assertAlmostEqual(rectangle["Top Width"], 10.0)
+        self.assertAlmostEqual(
+            rectangle["Conveyance"], 20.0 ** (5 / 3) / (0.03 * 14.0 ** (2 / 3))
+        )
+        self.assertTrue((properties.loc[("CS25", 0.0)] == 0).all())
+
+        # Splitting the channel into two panels, where the right panel has a relative path length of 4
+        section.data.loc[2, "Panel"] = True
+        section.data.loc[2, "RPL"] = 4.0
+        cached = dat._section_properties["CS24"]
+        properties = dat.section_properties(stages=[0.0, 2.0])
+        self.assertIs(dat._section_properties["CS24"], cached)
+        self.assertAlmostEqual(properties.loc[("CS25", 2.0)]["Area"], 20.0)
+        panel_conveyance = 10.0 ** (5 / 3) / (0.03 * 7.0 ** (2 / 3))
+        self.assertAlmostEqual(
+            properties.loc[("CS25", 2.0)]["Conveyance"], panel_conveyance * 1.5
+        )
+
+        properties = dat.section_properties(stages=5)
+        self.assertEqual(len(properties.loc["CS24"]), 5)
+        self.assertEqual(
+            properties.loc["CS24"].index[0], dat.sections["CS24"].data["Y"].min()
+        )
+
+    def test_21(self):
+        """DAT: Check content hashes only change for edited units, and that only those units are compared in detail"""
+        dat = DAT(self.dat_fp)
+        lazy_dat = DAT(self.dat_fp, lazy=True)
+        tree = dat.hash_tree()
+        self.assertEqual(tree, lazy_dat.hash_tree())
+        self.assertFalse(lazy_dat.sections._is_loaded("CS25"))
+
+        lazy_dat.sections["CS25"].dist_to_next += 1.0
+        edited_tree = lazy_dat.hash_tree()
+        self.assertNotEqual(edited_tree["hash"], tree["hash"])
+        self.assertEqual(edited_tree["attributes"], tree["attributes"])
+        self.assertEqual(
+            edited_tree["groups"]["structures"], tree["groups"]["structures"]
+        )
+        changed = [
+            label
+            for label, unit_hash in edited_tree["groups"]["sections"]["units"].items()
+            if tree["groups"]["sections"]["units"][label] != unit_hash
+        ]
+        self.assertEqual(changed, ["CS25"])
+
+        result, diff = lazy_dat._get_diff(dat)
+        self.assertFalse(result)
+        self.assertEqual(len(diff), 1)
+        self.assertIn("CS25", diff[0][0])
+        self.assertFalse(lazy_dat.sections._is_loaded("CS24"))
+
+    def test_22(self):
+        """DAT: Check differing section data is reported value by value, within a tolerance"""
+        dat = DAT(self.dat_fp)
+        other_dat = DAT(self.dat_fp)
+        other_dat.sections["CS25"].data.loc[1, "Y"] += 0.0004
+        other_dat.sections["CS25"].data.loc[3, "Mannings n"] += 0.01
+        result, diff = dat._get_diff(other_dat)
+        self.assertFalse(result)
+        self.assertEqual(len(diff), 1)
+        self.assertTrue(diff[0][1].startswith("2 row(s) not equal:"))
+        self.assertIn("Row: 1, Col: 'Y'", diff[0][1])
+        self.assertIn("Row: 3, Col: 'Mannings n'", diff[0][1])
+
+        with _diff_options(tolerance=0.001, max_differences=0):
+            result, diff = dat._get_diff(other_dat)
+        self.assertEqual(
+            diff[0][1].splitlines(),
+            ["1 row(s) not equal:", "    ...1 more value(s) not equal"],
+        )
+        other_dat.sections["CS25"].data.loc[3, "Mannings n"] -= 0.01
+        with _diff_options(tolerance=0.001):
+            self.assertTrue(dat == other_dat)
+        self.assertFalse(dat == other_dat)
+
+    def test_23(self):
+        """DAT: Check nearest node, bounding box and polygon queries on the .gxy and GISINFO coordinates"""
+        dat = DAT(os.path.join(test_workspace, "EX1.DAT"))
+        index = dat.spatial_index()
+        self.assertIs(dat.spatial_index(), index)
+        self.assertEqual(len(index), 12)
+
+        nearest = index.nearest([-38200.0, -38200.0], [61000.0, 92000.0])
+        self.assertEqual(nearest["Label"].tolist(), ["S1", "CC10"])
+        self.assertEqual(nearest["Type"].tolist(), ["RIVER SECTION", "RIVER SECTION"])
+        within = index.within_bbox(-40000.0, 60000.0, -30000.0, 100000.0)
+        self.assertEqual(within["Label"].tolist(), ["S1", "CC10"])
+        within = index.within_polygon(
+            [(-40000.0, 60000.0), (-30000.0, 60000.0), (-30000.0, 100000.0)]
+        )
+        self.assertEqual(within["Label"].tolist(), ["S1"])
+
+        # Index is built again once renames are applied to the gxy data
+        dat.rename_units({"CC10": "S2"})
+        self.assertEqual(
+            dat.spatial_index().nearest(-38200.0, 92000.0)["Label"].tolist(), ["S2"]
+        )
+
+        gisinfo = dat.spatial_index("gisinfo")
+        self.assertEqual(
+            gisinfo.within_bbox(440, 970, 450, 980)[["Label", "Type"]].values.tolist(),
+            [["S1", "QTBDY"]],
+        )
+        with self.assertRaises(ValueError):
+            DAT(self.dat_fp).spatial_index("gxy")
+
 
 class test_INP(unittest.TestCase):
     """Basic benchmarking to test INP class"""
@@ -137,6 +724,19 @@ class test_INP(unittest.TestCase):
             self.assertEqual(first_output, second_output)
             os.remove("__temp.inp")
 
+    def test_5(self):
+        """INP: Check invalid units within a batch of edits are reported together and nothing is written"""
+        inp = INP(self.inp_fp)
+        inp.raingauges["1"].snow_catch_factor = "a"
+        inp.options["flow_units"] = "b"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_fp = os.path.join(temp_dir, "batch.inp")
+            with self.assertRaises(ValueError) as error:
+                with inp.batch():
+                    inp.save(temp_fp)
+            self.assertIn("2 error(s)", str(error.exception))
+            self.assertFalse(os.path.exists(temp_fp))
+
 
 class test_ZZN(unittest.TestCase):
     """Basic benchmarking to test ZZN class"""
@@ -152,7 +752,7 @@ class test_ZZN(unittest.TestCase):
         )
 
     def test_1(self):
-        """ZZN: Check loading zzn okay using dll"""
+        """ZZN: Check max results read by the NumPy reader and exported to test_output.csv match the tabular CSV output"""
         zzn = ZZN(self.zzn_fp)
         zzn.export_to_csv(
             result_type="max",
@@ -163,6 +763,234 @@ class test_ZZN(unittest.TestCase):
 
         pd.testing.assert_frame_equal(output, self.tabCSV_output, rtol=0.0001)
 
+    def test_2(self):
+        """ZZN: Check pickled zzn shares its results arrays through shared memory"""
+        zzn = ZZN(self.zzn_fp)
+        zzn.data[
+            "all_results"
+        ]  # Results are read so they are moved into shared memory when pickled
+
+        loaded = pickle.loads(pickle.dumps(zzn))
+        self.assertEqual(loaded.meta, zzn.meta)
+        self.assertIn("all_results", loaded._shared_memory)
+        pd.testing.assert_frame_equal(loaded.to_dataframe(), zzn.to_dataframe())
+
+        # Both hold the same memory, which is read-only in the loaded zzn
+        zzn.data["all_results"][1, 2, 0] = -1.0
+        self.assertEqual(loaded.data["all_results"][1, 2, 0], -1.0)
+        self.assertFalse(loaded.data["all_results"].flags.writeable)
+
+        # Deep copies hold their own results
+        copied = copy.deepcopy(zzn)
+        copied.data["all_results"][1, 2, 0] = 5.0
+        self.assertEqual(zzn.data["all_results"][1, 2, 0], -1.0)
+
+    def test_3(self):
+        """ZZN: Check metadata and results read from the zzl and zzn files"""
+        zzn = ZZN(self.zzn_fp)
+        self.assertEqual(zzn.meta["nnodes"], 86)
+        self.assertEqual(zzn.meta["dt"], 20.0)
+        self.assertEqual(zzn.meta["save_int"], 300.0)
+        self.assertEqual(zzn.meta["timestep0"], 1)
+        self.assertEqual(zzn.meta["ltimestep"], 2701)
+        self.assertEqual(zzn.meta["tzero"], [0, 0, 1, 1, 2000])
+        self.assertEqual(zzn.meta["output_hrs"], [0.0, 15.0])
+        self.assertEqual(zzn.meta["isavint"], [0, 180])
+        self.assertEqual(zzn.meta["savint_range"], 180)
+        self.assertTrue(zzn.meta["model_title"].startswith("network"))
+        self.assertEqual(zzn.meta["labels"][:3], ["resin", "CS26", "CS25"])
+        self.assertEqual(zzn.meta["labels"], list(self.tabCSV_output["Node Label"]))
+
+        # Zzn file holds each saved timestep by node, then variable
+        raw = np.fromfile(self.zzn_fp, dtype="<f4").reshape(181, 86, 6)
+        self.assertEqual(zzn.data["all_results"].shape, (181, 6, 86))
+        np.testing.assert_array_equal(zzn.data["all_results"][50, 1], raw[50, :, 1])
+        np.testing.assert_array_equal(zzn.data["max_results"], raw.max(axis=0).T)
+        times = zzn.data["max_times"]
+        self.assertEqual(times.dtype, np.int32)
+        np.testing.assert_array_equal(
+            np.take_along_axis(zzn.data["all_results"], times[None] - 1, axis=0)[0],
+            zzn.data["max_results"],
+        )
+
+    def test_4(self):
+        """ZZN: Check results arrays are only read from the zzn file when first used"""
+        zzn = ZZN(self.zzn_fp)
+        self.assertEqual(len(zzn.meta["labels"]), 86)
+        self.assertFalse(zzn.data._is_loaded("max_results"))
+        self.assertIn("all_results", zzn.data)
+        self.assertFalse(zzn.data._is_loaded("all_results"))
+
+        # Max and min results are found without reading the full results into memory, a few timesteps at a time
+        with patch("floodmodeller_api._zzn_read._CHUNK_BYTES", 86 * 6 * 4 * 7):
+            max_df = zzn.to_dataframe(result_type="max", include_time=True)
+            self.assertFalse(zzn.data._is_loaded("all_results"))
+            self.assertTrue(zzn.data._is_loaded("min_times"))
+
+            eager = ZZN(self.zzn_fp)
+            eager.data["all_results"]
+            pd.testing.assert_frame_equal(
+                max_df, eager.to_dataframe(result_type="max", include_time=True)
+            )
+        all_results = zzn.data["all_results"]
+        np.testing.assert_array_equal(
+            zzn.data["max_times"], all_results.argmax(axis=0) + 1
+        )
+        np.testing.assert_array_equal(
+            zzn.data["min_times"], all_results.argmin(axis=0) + 1
+        )
+        np.testing.assert_array_equal(zzn.data["min_results"], all_results.min(axis=0))
+
+    def test_5(self):
+        """ZZN: Check reading a subset of the nodes, variables and saved timesteps"""
+        all_results = ZZN(self.zzn_fp).data["all_results"]
+        zzn = ZZN(
+            self.zzn_fp,
+            nodes=["CS25", "resin"],
+            variables=["stage", "Flow"],
+            time_window=(1, 2),
+            stride=3,
+        )
+        self.assertEqual(zzn.meta["labels"], ["CS25", "resin"])
+        self.assertEqual(zzn.meta["variables"], ["Stage", "Flow"])
+        self.assertEqual(zzn.meta["isavint"], [12, 24])
+        self.assertEqual(zzn.meta["savint_range"], 4)
+
+        # Saved timesteps 12, 15, ..., 24 are 1 to 2 hours at a 300s save interval
+        expected = all_results[12:25:3][:, [1, 0]][:, :, [2, 0]]
+        np.testing.assert_array_equal(zzn.data["all_results"], expected)
+        df = zzn.to_dataframe()
+        self.assertEqual(list(df.index), [1.0, 1.25, 1.5, 1.75, 2.0])
+        self.assertEqual(df[("Flow", "resin")].tolist(), expected[:, 1, 1].tolist())
+        max_df = zzn.to_dataframe(result_type="max", include_time=True)
+        self.assertEqual(
+            list(max_df.columns),
+            ["Max Stage", "Max Stage Time(hrs)", "Max Flow", "Max Flow Time(hrs)"],
+        )
+        self.assertEqual(max_df.loc["CS25", "Max Flow"], expected[:, 1, 0].max())
+        self.assertEqual(
+            max_df.loc["CS25", "Max Flow Time(hrs)"],
+            df.index[expected[:, 1, 0].argmax()],
+        )
+
+        for kwargs in [
+            {"nodes": ["not a node"]},
+            {"variables": ["Depth"]},
+            {"time_window": (20, 30)},
+            {"stride": 0},
+        ]:
+            with self.assertRaises(Exception):
+                ZZN(self.zzn_fp, **kwargs)
+
+    def test_6(self):
+        """ZZN: Check results are read-only views unless copied into writable dataframes"""
+        zzn = ZZN(self.zzn_fp)
+        all_results = zzn.data["all_results"]
+        flow = zzn.array("Flow")
+        self.assertEqual(flow.shape, (181, 86))
+        self.assertTrue(np.shares_memory(flow, all_results))
+        self.assertFalse(flow.flags.writeable)
+        np.testing.assert_array_equal(zzn.array("stage"), all_results[:, 1, :])
+        with self.assertRaises(ValueError):
+            zzn.array("Depth")
+
+        # Dataframes are built on a copy of the results by default, so can be edited
+        df = zzn.to_dataframe()
+        self.assertFalse(np.shares_memory(df.values, all_results))
+        first_flow = all_results[0, 0, 0]
+        df.iloc[0, 0] = first_flow + 1.0
+        self.assertEqual(df.iloc[0, 0], first_flow + 1.0)
+        self.assertEqual(all_results[0, 0, 0], first_flow)
+        flow_df = zzn.to_dataframe(variable="Flow")
+        self.assertEqual(list(flow_df.columns), zzn.meta["labels"])
+        np.testing.assert_array_equal(flow_df.values, flow)
+        flow_df.iloc[0, 0] = first_flow + 1.0
+        mode_df = zzn.to_dict_of_dataframes()["Mode"]
+        mode_df.iloc[0, 0] = 1.0
+        self.assertFalse(np.shares_memory(mode_df.values, all_results))
+        max_df = zzn.to_dataframe(result_type="max")
+        max_df.iloc[0, 0] = 1.0
+        self.assertNotEqual(zzn.data["max_results"][0, 0], 1.0)
+
+        # With copy=False, dataframes are read-only views of the results
+        df = zzn.to_dataframe(copy=False)
+        self.assertTrue(np.shares_memory(df.values, all_results))
+        with self.assertRaises(ValueError):
+            df.iloc[0, 0] = 1.0
+        self.assertTrue(
+            np.shares_memory(
+                zzn.to_dataframe(variable="Flow", copy=False).values, all_results
+            )
+        )
+        self.assertTrue(
+            np.shares_memory(
+                zzn.to_dict_of_dataframes(copy=False)["Mode"].values, all_results
+            )
+        )
+        for view in (
+            zzn.to_dataframe(variable="Flow", copy=False).values,
+            zzn.to_dict_of_dataframes(copy=False)["Flow"].values,
+            zzn.get_series("CS25", "Flow", copy=False).values,
+        ):
+            self.assertFalse(view.flags.writeable)
+            self.assertTrue(np.shares_memory(view, zzn.array("Flow")))
+        self.assertTrue(all_results.flags.writeable)
+
+    def test_7(self):
+        """ZZN: Check getting the results of a single node and variable as a series"""
+        zzn = ZZN(self.zzn_fp)
+        df = zzn.to_dataframe()
+        for label in ["resin", "CS25", "RD25Sd"]:
+            for variable in ["Flow", "stage"]:
+                series = zzn.get_series(label, variable)
+                pd.testing.assert_series_equal(series, df[variable.capitalize()][label])
+        self.assertFalse(np.shares_memory(series.values, zzn.data["all_results"]))
+        first_stage = series.iloc[0]
+        series.iloc[0] = first_stage + 1.0
+        self.assertEqual(zzn.get_series(label, variable).iloc[0], first_stage)
+
+        # With copy=False, the series is a read-only view of the results
+        view = zzn.get_series(label, variable, copy=False)
+        self.assertTrue(np.shares_memory(view.values, zzn.data["all_results"]))
+        with self.assertRaises(ValueError):
+            view.iloc[0] = 1.0
+        with self.assertRaises(ValueError):
+            zzn.get_series("not a node", "Flow")
+
+        subset = ZZN(self.zzn_fp, nodes=["CS25"], time_window=(1, 2))
+        pd.testing.assert_series_equal(
+            subset.get_series("CS25", "Stage"), df["Stage"]["CS25"].loc[1:2]
+        )
+
+    def test_8(self):
+        """ZZN: Check sending a ZZN to worker processes leaves no shared memory for them to clean up"""
+        script = "\n".join(
+            [
+                "import multiprocessing, operator, sys",
+                "from concurrent.futures import ProcessPoolExecutor",
+                "from floodmodeller_api import ZZN",
+                "if __name__ == '__main__':",
+                "    zzn = ZZN(sys.argv[1])",
+                "    flow = zzn.array('Flow')",
+                "    context = multiprocessing.get_context(sys.argv[2])",
+                "    with ProcessPoolExecutor(2, mp_context=context) as executor:",
+                "        get_flow = operator.methodcaller('array', 'Flow')",
+                "        for result in executor.map(get_flow, [zzn] * 4):",
+                "            assert (result == flow).all()",
+            ]
+        )
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(__file__)))
+        for method in multiprocessing.get_all_start_methods():
+            result = subprocess.run(
+                [sys.executable, "-c", script, self.zzn_fp, method],
+                capture_output=True,
+                text=True,
+                env=env,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stderr, "", method)
+
+
 class test_LF1(unittest.TestCase):
     """Basic benchmarking to test LF1 class"""
 
@@ -187,9 +1015,9 @@ class test_LF1(unittest.TestCase):
         """LF1: Check to_dataframe()"""
         lf1 = LF1(self.lf1_fp)
         df = lf1.to_dataframe()
-        self.assertEqual(df.iloc[0,3], 6)
-        self.assertEqual(df.iloc[-1,-1], 21.06)
-        self.assertEqual(df.iloc[4,0], -0.07)
+        self.assertEqual(df.iloc[0, 3], 6)
+        self.assertEqual(df.iloc[-1, -1], 21.06)
+        self.assertEqual(df.iloc[4, 0], -0.07)
 
     def test_4(self):
         """LF1: Check IEF.get_lf1()"""
@@ -203,6 +1031,7 @@ class test_LF1(unittest.TestCase):
         self.assertDictEqual(lf1.info, lf1_from_ief.info)
         pd.testing.assert_frame_equal(lf1.to_dataframe(), lf1_from_ief.to_dataframe())
 
+
 class test_XML2D(unittest.TestCase):
     """Basic benchmarking to test XML2D class"""
 